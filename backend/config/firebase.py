@@ -1,17 +1,19 @@
 import firebase_admin
 from firebase_admin import credentials, firestore, storage
 import os
-from typing import Optional, Any
-from datetime import datetime, timedelta
+import asyncio
+from typing import Optional, Any, List
+from datetime import datetime
+from utils.cache import get_cache
+from utils.singleflight import SingleFlight
 
 # 지연 초기화를 위한 변수들
 _db: Optional[firestore.Client] = None
 _bucket: Optional[Any] = None
 _initialized_at: Optional[datetime] = None
 
-# 간단한 인메모리 캐시 (자주 접근하는 데이터용)
-_data_cache: dict = {}
-_cache_expiry: dict = {}
+# 동일 문서 동시 조회 병합
+_doc_flight = SingleFlight()
 
 def _initialize_firebase():
     """Firebase Admin SDK 지연 초기화"""
@@ -81,36 +83,19 @@ db = property(lambda self: get_db())
 bucket = property(lambda self: get_bucket())
 
 
-# ==================== 캐싱 유틸리티 ====================
-def cache_data(key: str, data: Any, ttl_seconds: int = 300):
+# ==================== 문서 조회 ====================
+async def get_document(collection: str, doc_id: str, field_paths: Optional[List[str]] = None):
     """
-    데이터를 캐시에 저장 (기본 5분 TTL)
-    자주 조회하는 사용자 정보, 설정 등에 사용
+    ID로 Firestore 문서를 조회합니다 (스레드풀에서 실행).
+    같은 문서에 대한 동시 요청은 한 번의 읽기를 공유합니다.
     """
-    _data_cache[key] = data
-    _cache_expiry[key] = datetime.now() + timedelta(seconds=ttl_seconds)
+    key = (collection, doc_id, tuple(field_paths) if field_paths else None)
 
+    def _read():
+        doc_ref = get_db().collection(collection).document(doc_id)
+        return doc_ref.get(field_paths=field_paths) if field_paths else doc_ref.get()
 
-def get_cached_data(key: str) -> Optional[Any]:
-    """캐시에서 데이터 조회 (만료된 경우 None 반환)"""
-    if key in _data_cache:
-        if datetime.now() < _cache_expiry.get(key, datetime.now()):
-            return _data_cache[key]
-        else:
-            # 만료된 캐시 제거
-            del _data_cache[key]
-            del _cache_expiry[key]
-    return None
-
-
-def clear_cache(key: Optional[str] = None):
-    """캐시 삭제 (key가 None이면 전체 캐시 삭제)"""
-    if key:
-        _data_cache.pop(key, None)
-        _cache_expiry.pop(key, None)
-    else:
-        _data_cache.clear()
-        _cache_expiry.clear()
+    return await _doc_flight.do(key, lambda: asyncio.to_thread(_read))
 
 
 def get_connection_info() -> dict:
@@ -120,5 +105,7 @@ def get_connection_info() -> dict:
         "initialized_at": _initialized_at.isoformat() if _initialized_at else None,
         "db_connected": _db is not None,
         "bucket_connected": _bucket is not None,
-        "cache_size": len(_data_cache)
+        "cache_size": len(get_cache()),
+        "cache": get_cache().stats(),
+        "document_reads": _doc_flight.stats()
     }
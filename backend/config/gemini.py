@@ -1,6 +1,53 @@
+import asyncio
+import hashlib
+import json
 import os
+import random
+import time
+from datetime import timedelta
 import google.generativeai as genai
-from typing import Optional
+from google.api_core import exceptions as google_exceptions
+from google.generativeai import caching
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from config.gemini_backends import create_backend
+from utils.metrics import get_llm_metrics
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+# 고정 system instruction을 Gemini 컨텍스트 캐시에 올려 매 턴 재전송/재과금하지 않음
+CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE", "true").lower() == "true"
+CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+_CONTEXT_CACHE_REFRESH_MARGIN = 300   # 만료 5분 전이면 새 캐시 생성
+_CONTEXT_CACHE_RETRY_BACKOFF = 60     # 일시적 오류로 캐시 생성 실패 시 재시도까지 대기
+
+# 캐시 생성이 영구적으로 불가능한 경우 (최소 토큰 수 미달, 모델 미지원 등)
+CONTEXT_CACHE_PERMANENT_ERRORS = (
+    google_exceptions.InvalidArgument,
+    google_exceptions.FailedPrecondition,
+    google_exceptions.NotFound,
+    google_exceptions.MethodNotImplemented,
+)
+
+# 장애 대응: 재시도 / 서킷 브레이커 / 호출 기한 / 채팅 폴백 모델
+CHAT_FALLBACK_MODEL = os.getenv("GEMINI_FALLBACK_MODEL", "gemini-2.5-flash-lite")
+CALL_TIMEOUT = float(os.getenv("GEMINI_CALL_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 8.0
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+
+# 일시적 장애로 보고 재시도하는 오류 (429/500/502/503/504, 호출 기한 초과)
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    asyncio.TimeoutError,
+)
 
 _initialized = False
 
@@ -17,7 +64,7 @@ def _ensure_gemini_configured():
             print("⚠️ Warning: GEMINI_API_KEY not found in environment variables")
             raise ValueError("GEMINI_API_KEY not found")
 
-def get_gemini_model(model_name: str = "gemini-2.5-flash"):
+def get_gemini_model(model_name: str = DEFAULT_MODEL):
     """지연 초기화된 Gemini 모델 반환"""
     _ensure_gemini_configured()
     return genai.GenerativeModel(model_name)
@@ -26,3 +73,408 @@ def get_gemini_model(model_name: str = "gemini-2.5-flash"):
 def configure_gemini():
     """필요시 수동으로 Gemini 설정"""
     _ensure_gemini_configured()
+
+
+# ==================== 장애 대응 ====================
+class GeminiUnavailable(Exception):
+    """Gemini가 일시적으로 사용 불가 (재시도 소진 또는 서킷 오픈). 라우트에서 503 + Retry-After로 변환"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold에 도달하면 reset_timeout 동안 호출을 즉시 거부(open)하고,
+    이후 한 번의 시험 호출(half-open)이 성공하면 다시 닫습니다.
+    """
+
+    def __init__(self, threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return 1
+        return max(1, int(self.reset_timeout - (time.monotonic() - self.opened_at)) + 1)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self):
+        """시험 호출이 취소되었거나 장애와 무관한 오류로 끝난 경우 (상태 유지)"""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+def _retry_delay(attempt: int) -> float:
+    """Full jitter 지수 백오프"""
+    return random.uniform(0, min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+# ==================== 비동기 클라이언트 ====================
+class GeminiClient:
+    """
+    모든 AI 라우트가 사용하는 Gemini 호출 래퍼.
+
+    generate_content_async / send_message_async를 사용하고, 동기 전용 API
+    (Files API, Caching API)는 스레드에서 실행하므로 LLM 호출이 이벤트 루프를 막지 않습니다.
+
+    - GenerativeModel은 (모델, system instruction, generation config)별로 한 번만 생성해 재사용
+    - system instruction은 지원되는 경우 컨텍스트 캐시(CachedContent)로 올려
+      각 턴에서는 새 토큰만 처리/과금되도록 함 (실패 시 일반 모델로 폴백)
+    - 모든 호출의 토큰 수(usage_metadata), 지연 시간, TTFT, 모델, 결과를
+      utils.metrics에 기록 (캐시 토큰 수 = 컨텍스트 캐시 절감량)
+    - 429/5xx는 지터 지수 백오프로 재시도, 모델별 서킷 브레이커, 호출별 기한(timeout),
+      fallback_model이 주어지면 주 모델 장애 시 한 번 더 시도
+    - GEMINI_BACKEND(record/replay/synthetic)로 모델 호출만 녹화·재생·합성 응답으로 교체
+      (config.gemini_backends 참고, 재시도/지표 경로는 동일)
+
+    Usage:
+        from config.gemini import get_gemini_client
+
+        client = get_gemini_client()
+        text = await client.generate_text(prompt)
+    """
+
+    def __init__(self):
+        self._models: Dict[tuple, genai.GenerativeModel] = {}
+        self._context_caches: Dict[tuple, Tuple[caching.CachedContent, float]] = {}
+        self._context_cache_unsupported: set = set()
+        self._context_cache_retry_at: Dict[tuple, float] = {}
+        self._context_cache_lock = asyncio.Lock()
+        self._context_caches_created = 0
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._backend = create_backend()
+        if self._backend is not None:
+            print(f"⚠️ Gemini backend: {self._backend.name}")
+
+    @staticmethod
+    def _instruction_key(model_name: str, system_instruction: str) -> tuple:
+        return (model_name, hashlib.sha256(system_instruction.encode('utf-8')).hexdigest())
+
+    def model(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        system_instruction: Optional[str] = None,
+        generation_config: Optional[Dict[str, Any]] = None,
+        cached_content: Optional[caching.CachedContent] = None,
+    ) -> genai.GenerativeModel:
+        """설정별로 재사용되는 GenerativeModel 반환"""
+        _ensure_gemini_configured()
+        key = (
+            model_name,
+            system_instruction,
+            json.dumps(generation_config, sort_keys=True) if generation_config else None,
+            cached_content.name if cached_content is not None else None,
+        )
+        model = self._models.get(key)
+        if model is None:
+            if cached_content is not None:
+                model = genai.GenerativeModel.from_cached_content(
+                    cached_content, generation_config=generation_config
+                )
+            else:
+                model = genai.GenerativeModel(
+                    model_name,
+                    system_instruction=system_instruction,
+                    generation_config=generation_config,
+                )
+            self._models[key] = model
+        return model
+
+    async def _context_cache(self, model_name: str, system_instruction: str) -> Optional[caching.CachedContent]:
+        """system instruction의 컨텍스트 캐시 반환 (없거나 곧 만료되면 생성)"""
+        key = self._instruction_key(model_name, system_instruction)
+        if not CONTEXT_CACHE_ENABLED or key in self._context_cache_unsupported:
+            return None
+        if time.monotonic() < self._context_cache_retry_at.get(key, 0):
+            return None
+
+        entry = self._context_caches.get(key)
+        if entry is not None and time.time() < entry[1] - _CONTEXT_CACHE_REFRESH_MARGIN:
+            return entry[0]
+
+        async with self._context_cache_lock:
+            entry = self._context_caches.get(key)
+            if entry is not None and time.time() < entry[1] - _CONTEXT_CACHE_REFRESH_MARGIN:
+                return entry[0]
+            if time.monotonic() < self._context_cache_retry_at.get(key, 0):
+                return None
+            try:
+                cached = await asyncio.to_thread(
+                    caching.CachedContent.create,
+                    model=f"models/{model_name}",
+                    display_name=f"winnow-{key[1][:12]}",
+                    system_instruction=system_instruction,
+                    ttl=timedelta(seconds=CONTEXT_CACHE_TTL),
+                )
+            except CONTEXT_CACHE_PERMANENT_ERRORS as e:
+                # 모델 미지원, 최소 토큰 수 미달 등 → 이 instruction은 일반 모델로 처리
+                print(f"⚠️ Gemini context cache unavailable for {model_name}: {str(e)}")
+                self._context_cache_unsupported.add(key)
+                return None
+            except Exception as e:
+                # 429/5xx/타임아웃 등 일시적 오류 → 잠시 일반 모델로 처리하고 나중에 다시 시도
+                print(f"⚠️ Gemini context cache creation failed for {model_name}, "
+                      f"retrying in {_CONTEXT_CACHE_RETRY_BACKOFF}s: {type(e).__name__} {str(e)}")
+                self._context_cache_retry_at[key] = time.monotonic() + _CONTEXT_CACHE_RETRY_BACKOFF
+                return None
+
+            # 이전 캐시는 TTL이 지나면 서버에서 자동 삭제됨
+            if entry is not None:
+                self._models = {k: m for k, m in self._models.items() if k[3] != entry[0].name}
+            self._context_caches[key] = (cached, time.time() + CONTEXT_CACHE_TTL)
+            self._context_cache_retry_at.pop(key, None)
+            self._context_caches_created += 1
+            print(f"✅ Gemini context cache created: {cached.name} ({model_name})")
+            return cached
+
+    async def _call_model(
+        self,
+        fn: Callable[[genai.GenerativeModel], Awaitable[Any]],
+        model_name: str,
+        system_instruction: Optional[str] = None,
+        generation_config: Optional[Dict[str, Any]] = None,
+    ):
+        """컨텍스트 캐시 모델로 호출하고, 캐시가 서버에서 사라졌으면 일반 모델로 재시도"""
+        if self._backend is not None:
+            if self._backend.offline:
+                return await fn(self._backend.model(model_name, system_instruction, generation_config))
+            fn = self._backend.wrap(fn, model_name, system_instruction)
+        _ensure_gemini_configured()
+        cached = await self._context_cache(model_name, system_instruction) if system_instruction else None
+        if cached is None:
+            return await fn(self.model(model_name, system_instruction, generation_config))
+
+        try:
+            return await fn(self.model(model_name, generation_config=generation_config, cached_content=cached))
+        except (google_exceptions.NotFound, google_exceptions.PermissionDenied) as e:
+            print(f"⚠️ Gemini context cache {cached.name} rejected ({str(e)}), falling back")
+            self._context_caches.pop(self._instruction_key(model_name, system_instruction), None)
+            return await fn(self.model(model_name, system_instruction, generation_config))
+
+    def _breaker(self, model_name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model_name)
+        if breaker is None:
+            breaker = self._breakers[model_name] = CircuitBreaker()
+        return breaker
+
+    async def _call_with_retry(self, fn, model_name: str, deadline: float, model_kwargs: dict) -> Tuple[Any, int]:
+        """한 모델에 대해 서킷 확인 → 기한 내 재시도. (응답, 재시도 횟수) 반환"""
+        breaker = self._breaker(model_name)
+        if not breaker.allow():
+            raise GeminiUnavailable(f"Gemini {model_name} circuit open", breaker.retry_after())
+
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                response = await asyncio.wait_for(self._call_model(fn, model_name, **model_kwargs), remaining)
+            except RETRYABLE_ERRORS as e:
+                delay = _retry_delay(attempt)
+                if attempt >= MAX_RETRIES or time.monotonic() + delay >= deadline:
+                    breaker.record_failure()
+                    raise GeminiUnavailable(
+                        f"Gemini {model_name} unavailable: {type(e).__name__} {str(e)}".strip(),
+                        breaker.retry_after() if breaker.state == 'open' else max(1, int(delay) + 1),
+                    ) from e
+                print(f"⚠️ Gemini {model_name} {type(e).__name__}, retrying in {delay:.2f}s ({attempt + 1}/{MAX_RETRIES})")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # 요청 자체의 오류(400, 파싱 오류 등)·취소는 업스트림 장애도 정상 응답도 아니므로
+                # 성공/실패를 기록하지 않고 시험 호출만 반환
+                breaker.release_probe()
+                raise
+            breaker.record_success()
+            return response, attempt
+
+    async def _call(
+        self,
+        fn: Callable[[genai.GenerativeModel], Awaitable[Any]],
+        model_name: str,
+        fallback_model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        **model_kwargs,
+    ) -> Tuple[Any, str, int]:
+        """주 모델 → (장애 시) 폴백 모델. (응답, 실제 사용 모델, 재시도 횟수) 반환"""
+        deadline = time.monotonic() + (timeout or CALL_TIMEOUT)
+        try:
+            response, retries = await self._call_with_retry(fn, model_name, deadline, model_kwargs)
+            return response, model_name, retries
+        except GeminiUnavailable as e:
+            if not fallback_model or fallback_model == model_name:
+                raise
+            print(f"⚠️ {str(e)} → falling back to {fallback_model}")
+            # 폴백은 자체 기한으로 한 번 더 (주 모델이 기한을 모두 쓴 경우 대비)
+            fallback_deadline = max(deadline, time.monotonic() + (timeout or CALL_TIMEOUT) / 2)
+            response, retries = await self._call_with_retry(fn, fallback_model, fallback_deadline, model_kwargs)
+            return response, fallback_model, retries
+
+    @staticmethod
+    def _record(model_name: str, started: float, response=None, error: Optional[BaseException] = None,
+                ttft: Optional[float] = None, retries: int = 0, fallback: bool = False):
+        """호출 결과를 지표에 기록 (시간 단위: ms)"""
+        usage = getattr(response, 'usage_metadata', None)
+        latency = (time.perf_counter() - started) * 1000
+        get_llm_metrics().record_call(
+            model=model_name,
+            outcome='ok' if error is None else type(error).__name__,
+            latency_ms=latency,
+            ttft_ms=ttft if ttft is not None else (latency if error is None else None),
+            prompt_tokens=getattr(usage, 'prompt_token_count', 0) or 0,
+            cached_tokens=getattr(usage, 'cached_content_token_count', 0) or 0,
+            output_tokens=getattr(usage, 'candidates_token_count', 0) or 0,
+            retries=retries,
+            fallback=fallback,
+        )
+
+    async def generate(self, contents: Any, model_name: str = DEFAULT_MODEL, **model_kwargs):
+        """단일 프롬프트(또는 멀티모달 contents) 생성"""
+        started = time.perf_counter()
+        try:
+            response, used_model, retries = await self._call(
+                lambda m: m.generate_content_async(contents), model_name, **model_kwargs
+            )
+        except Exception as e:
+            self._record(model_name, started, error=e)
+            raise
+        self._record(used_model, started, response, retries=retries, fallback=used_model != model_name)
+        return response
+
+    async def generate_text(self, contents: Any, model_name: str = DEFAULT_MODEL, **model_kwargs) -> str:
+        response = await self.generate(contents, model_name, **model_kwargs)
+        return response.text
+
+    async def send_message(
+        self,
+        history: List[Dict[str, Any]],
+        message: str,
+        model_name: str = DEFAULT_MODEL,
+        **model_kwargs,
+    ):
+        """히스토리를 이어 받아 채팅 한 턴 전송"""
+        started = time.perf_counter()
+        try:
+            response, used_model, retries = await self._call(
+                lambda m: m.start_chat(history=history).send_message_async(message),
+                model_name,
+                **model_kwargs,
+            )
+        except Exception as e:
+            self._record(model_name, started, error=e)
+            raise
+        self._record(used_model, started, response, retries=retries, fallback=used_model != model_name)
+        return response
+
+    async def stream_message(
+        self,
+        history: List[Dict[str, Any]],
+        message: str,
+        model_name: str = DEFAULT_MODEL,
+        **model_kwargs,
+    ) -> AsyncIterator[str]:
+        """
+        채팅 한 턴을 스트리밍으로 전송하고 텍스트 청크를 순서대로 반환.
+        재시도/폴백은 첫 응답 전까지만 적용되고, 기한은 스트림 전체에 적용됩니다.
+        """
+        started = time.perf_counter()
+        deadline = time.monotonic() + (model_kwargs.get('timeout') or CALL_TIMEOUT)
+        used_model, retries = model_name, 0
+        ttft = None
+        response = None
+        try:
+            response, used_model, retries = await self._call(
+                lambda m: m.start_chat(history=history).send_message_async(message, stream=True),
+                model_name,
+                **model_kwargs,
+            )
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(deadline - time.monotonic(), 0.001))
+                except StopAsyncIteration:
+                    break
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # 텍스트 파트가 없는 청크 (종료 메타데이터 등)
+                    continue
+                if ttft is None:
+                    ttft = (time.perf_counter() - started) * 1000
+                yield text or ""
+        except BaseException as e:
+            # 클라이언트 연결 종료(GeneratorExit/CancelledError)도 결과로 기록
+            self._record(used_model, started, response, error=e, ttft=ttft, retries=retries)
+            raise
+        self._record(used_model, started, response, ttft=ttft, retries=retries, fallback=used_model != model_name)
+
+    async def upload_file(self, path: str, mime_type: str):
+        if self._backend is not None and self._backend.offline:
+            return await self._backend.upload_file(path, mime_type)
+        _ensure_gemini_configured()
+        return await asyncio.to_thread(genai.upload_file, path, mime_type=mime_type)
+
+    async def delete_file(self, name: str):
+        if self._backend is not None and self._backend.offline:
+            return await self._backend.delete_file(name)
+        _ensure_gemini_configured()
+        await asyncio.to_thread(genai.delete_file, name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'models': len(self._models),
+            'context_caches': len(self._context_caches),
+            'context_caches_created': self._context_caches_created,
+            'breakers': {
+                name: {'state': b.state, 'failures': b.failures}
+                for name, b in self._breakers.items()
+            },
+            'backend': self._backend.stats() if self._backend is not None else {'backend': 'live'},
+        }
+
+
+# Singleton instance for application-wide use
+_client_instance = None
+
+
+def get_gemini_client() -> GeminiClient:
+    """GeminiClient 싱글톤 반환"""
+    global _client_instance
+
+    if _client_instance is None:
+        _client_instance = GeminiClient()
+
+    return _client_instance
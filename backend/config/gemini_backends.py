@@ -0,0 +1,407 @@
+"""
+Pluggable Gemini backends for offline runs and load testing.
+GeminiClient keeps its retry / circuit breaker / deadline / metrics path and
+only swaps what answers the model call, selected with GEMINI_BACKEND:
+
+- live       실제 Gemini API (기본값)
+- record     실제 API를 호출하면서 응답 텍스트·청크 타이밍·토큰 수를 GEMINI_RECORDINGS(JSONL)에 기록
+- replay     GEMINI_RECORDINGS의 응답을 기록된 타이밍으로 재생 (요청 해시 → 같은 엔드포인트 순환 → synthetic)
+- synthetic  설정한 TTFT 분포(로그정규)와 토큰 속도로 엔드포인트별 형식의 가짜 응답 생성
+
+녹화 파일에는 요청 원문 대신 요청 해시만 저장되지만, 모델 응답에는 지원자 분석 내용이
+포함될 수 있으므로 저장소에 커밋하지 마세요. 오프라인 모드에서도 라우트의 키 확인을 위해
+GEMINI_API_KEY에는 아무 값이나 설정하면 됩니다.
+
+Usage:
+    GEMINI_BACKEND=synthetic GEMINI_SYNTH_TTFT_MS=600 GEMINI_SYNTH_TTFT_P95_MS=3000 \\
+        GEMINI_API_KEY=offline uvicorn main:app
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from utils.metrics import current_call_context
+
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "live").lower()
+GEMINI_RECORDINGS = os.getenv("GEMINI_RECORDINGS", "")
+# 재생 속도 배율 (0이면 지연 없이 즉시 응답)
+REPLAY_SPEED = float(os.getenv("GEMINI_REPLAY_SPEED", "1"))
+
+SYNTH_TTFT_MS = float(os.getenv("GEMINI_SYNTH_TTFT_MS", "800"))
+SYNTH_TTFT_P95_MS = float(os.getenv("GEMINI_SYNTH_TTFT_P95_MS", "2500"))
+SYNTH_TOKENS_PER_SEC = float(os.getenv("GEMINI_SYNTH_TOKENS_PER_SEC", "80"))
+SYNTH_OUTPUT_TOKENS = int(os.getenv("GEMINI_SYNTH_OUTPUT_TOKENS", "300"))
+SYNTH_CHUNK_TOKENS = int(os.getenv("GEMINI_SYNTH_CHUNK_TOKENS", "20"))
+# 이 비율만큼 429(ResourceExhausted)를 발생시켜 재시도/서킷 경로도 부하 테스트
+SYNTH_ERROR_RATE = float(os.getenv("GEMINI_SYNTH_ERROR_RATE", "0"))
+
+_Z95 = 1.645
+_FILLER = "지원자의 경험과 역량을 바탕으로 요구 사항과의 적합도를 검토했습니다. "
+
+
+def _estimate_tokens(text: str) -> int:
+    return math.ceil(len(text.encode('utf-8')) / 4) if text else 0
+
+
+def _jsonable(obj: Any) -> Any:
+    # 업로드 파일 등 직렬화할 수 없는 입력은 이름으로 대체
+    return getattr(obj, 'name', None) or type(obj).__name__
+
+
+def request_key(model_name: str, system_instruction: Optional[str], payload: Dict[str, Any]) -> str:
+    """녹화/재생에서 요청을 식별하는 해시 (요청 원문은 저장하지 않음)"""
+    raw = json.dumps([model_name, system_instruction, payload], default=_jsonable, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class OfflineResponse:
+    """GenerateContentResponse에서 GeminiClient와 라우트가 쓰는 부분만 흉내냄"""
+
+    def __init__(self, text: str, usage: Dict[str, int], chunks: Optional[AsyncIterator[Any]] = None):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=usage.get('prompt', 0),
+            cached_content_token_count=usage.get('cached', 0),
+            candidates_token_count=usage.get('output', 0),
+        )
+        self._chunks = chunks
+
+    def __aiter__(self):
+        return self._chunks.__aiter__()
+
+
+async def _play(chunks: List[str], ttft: float, gaps: List[float], usage: Dict[str, int], stream: bool) -> OfflineResponse:
+    """TTFT만큼 기다린 뒤 응답 (스트리밍이면 청크 사이 간격을 두고 하나씩)"""
+    text = "".join(chunks)
+    if not stream:
+        await asyncio.sleep(ttft + sum(gaps))
+        return OfflineResponse(text, usage)
+
+    await asyncio.sleep(ttft)
+
+    async def stream_chunks():
+        for i, (chunk, gap) in enumerate(zip(chunks, gaps)):
+            if i:
+                await asyncio.sleep(gap)
+            yield SimpleNamespace(text=chunk)
+
+    return OfflineResponse(text, usage, stream_chunks())
+
+
+class _OfflineChat:
+    def __init__(self, model: "OfflineModel", history: List[Dict[str, Any]]):
+        self._model = model
+        self._history = history
+
+    async def send_message_async(self, message: Any, stream: bool = False):
+        return await self._model.respond({'history': self._history, 'message': message}, stream)
+
+
+class OfflineModel:
+    """GenerativeModel 대용: generate_content_async / start_chat().send_message_async"""
+
+    def __init__(self, backend: "SyntheticBackend", model_name: str, system_instruction: Optional[str],
+                 generation_config: Optional[Dict[str, Any]]):
+        self._backend = backend
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.generation_config = generation_config or {}
+
+    async def respond(self, payload: Dict[str, Any], stream: bool):
+        return await self._backend.respond(self.model_name, self.system_instruction, payload, stream)
+
+    async def generate_content_async(self, contents: Any, stream: bool = False):
+        return await self.respond({'contents': contents}, stream)
+
+    def start_chat(self, history: Optional[List[Dict[str, Any]]] = None) -> _OfflineChat:
+        return _OfflineChat(self, history or [])
+
+
+class _OfflineFiles:
+    """Files API 대용 (업로드 없이 이름만 발급)"""
+
+    async def upload_file(self, path: str, mime_type: str):
+        return SimpleNamespace(name=f"files/offline-{uuid.uuid4().hex[:12]}", mime_type=mime_type)
+
+    async def delete_file(self, name: str):
+        return None
+
+
+class SyntheticBackend(_OfflineFiles):
+    """설정한 지연 분포와 토큰 속도로 엔드포인트별 형식의 가짜 응답 생성"""
+
+    offline = True
+    name = 'synthetic'
+
+    def __init__(
+        self,
+        ttft_ms: float = SYNTH_TTFT_MS,
+        ttft_p95_ms: float = SYNTH_TTFT_P95_MS,
+        tokens_per_sec: float = SYNTH_TOKENS_PER_SEC,
+        output_tokens: int = SYNTH_OUTPUT_TOKENS,
+        chunk_tokens: int = SYNTH_CHUNK_TOKENS,
+        error_rate: float = SYNTH_ERROR_RATE,
+        seed: Optional[int] = None,
+    ):
+        # 중앙값이 ttft_ms, 95분위가 ttft_p95_ms인 로그정규 분포
+        self._mu = math.log(max(ttft_ms, 1))
+        self._sigma = math.log(max(ttft_p95_ms / max(ttft_ms, 1), 1)) / _Z95
+        self.tokens_per_sec = tokens_per_sec
+        self.output_tokens = output_tokens
+        self.chunk_tokens = max(chunk_tokens, 1)
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+
+    def model(self, model_name: str, system_instruction: Optional[str] = None,
+              generation_config: Optional[Dict[str, Any]] = None) -> OfflineModel:
+        return OfflineModel(self, model_name, system_instruction, generation_config)
+
+    def _filler(self, tokens: int) -> str:
+        unit = _estimate_tokens(_FILLER)
+        return (_FILLER * (tokens // unit + 1)).strip()
+
+    def _text(self, endpoint: str, tokens: int) -> str:
+        """엔드포인트가 기대하는 형식으로 응답 생성 (채팅 JSON 봉투, PDF JD JSON, 그 외 텍스트)"""
+        if endpoint.startswith('gemini_chat'):
+            return json.dumps({
+                "aiResponse": self._filler(tokens),
+                "options": ["네", "아니요"],
+                "multiSelect": False,
+                "jdData": {"title": "[synthetic] 채용 공고", "jobRole": "백엔드 개발자", "requirements": ["Python 경험"]},
+            }, ensure_ascii=False)
+        if endpoint.startswith('analyze_pdf'):
+            return json.dumps({
+                "title": "[synthetic] 채용 공고",
+                "company": "", "jobRole": "백엔드 개발자", "location": "", "scale": "",
+                "description": self._filler(tokens), "vision": "", "mission": "",
+                "techStacks": [], "responsibilities": [], "requirements": [], "preferred": [], "benefits": [],
+                "recruitmentPeriod": "", "recruitmentCount": "", "recruitmentProcess": [],
+                "activitySchedule": "", "membershipFee": "",
+            }, ensure_ascii=False)
+        return self._filler(tokens)
+
+    def split(self, text: str, tokens: int) -> List[str]:
+        """대략 chunk_tokens 토큰씩 분할"""
+        size = max(1, len(text) * self.chunk_tokens // max(tokens, 1))
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+    async def respond(self, model_name: str, system_instruction: Optional[str],
+                      payload: Dict[str, Any], stream: bool) -> OfflineResponse:
+        self.calls += 1
+        ttft = self._rng.lognormvariate(self._mu, self._sigma) / 1000
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            await asyncio.sleep(ttft / 4)
+            raise google_exceptions.ResourceExhausted("synthetic rate limit")
+
+        endpoint, _ = current_call_context()
+        tokens = max(1, int(self.output_tokens * self._rng.uniform(0.7, 1.3)))
+        chunks = self.split(self._text(endpoint, tokens), tokens)
+        gap = self.chunk_tokens / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+        prompt = json.dumps([system_instruction, payload], default=_jsonable, ensure_ascii=False)
+        usage = {'prompt': _estimate_tokens(prompt), 'cached': 0, 'output': _estimate_tokens("".join(chunks))}
+        return await _play(chunks, ttft, [0.0] + [gap] * (len(chunks) - 1), usage, stream)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'calls': self.calls, 'errors': self.errors}
+
+
+class ReplayBackend(SyntheticBackend):
+    """녹화된 응답을 기록된 TTFT/청크 간격으로 재생 (녹화가 없는 요청은 synthetic으로 응답)"""
+
+    name = 'replay'
+
+    def __init__(self, path: str, speed: float = REPLAY_SPEED, **synthetic_kwargs):
+        super().__init__(**synthetic_kwargs)
+        self.speed = speed
+        self._by_key: Dict[str, List[dict]] = defaultdict(list)
+        self._by_endpoint: Dict[str, List[dict]] = defaultdict(list)
+        self._cursor: Dict[tuple, itertools.count] = defaultdict(itertools.count)
+        self.hits = 0
+        self.endpoint_hits = 0
+        self.misses = 0
+
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._by_key[record['key']].append(record)
+                    self._by_endpoint[record['endpoint']].append(record)
+        print(f"✅ Gemini replay backend: {sum(len(v) for v in self._by_key.values())} recording(s) from {path}")
+
+    def _pick(self, index: Dict[str, List[dict]], name: str) -> Optional[dict]:
+        records = index.get(name)
+        if not records:
+            return None
+        return records[next(self._cursor[(id(index), name)]) % len(records)]
+
+    async def respond(self, model_name: str, system_instruction: Optional[str],
+                      payload: Dict[str, Any], stream: bool) -> OfflineResponse:
+        endpoint, _ = current_call_context()
+        record = self._pick(self._by_key, request_key(model_name, system_instruction, payload))
+        if record is not None:
+            self.hits += 1
+        else:
+            record = self._pick(self._by_endpoint, endpoint)
+            if record is None:
+                self.misses += 1
+                return await super().respond(model_name, system_instruction, payload, stream)
+            self.endpoint_hits += 1
+
+        self.calls += 1
+        offsets = [c['ms'] for c in record['chunks']] or [record['latencyMs']]
+        texts = [c['text'] for c in record['chunks']] or [record['text']]
+        ttft = offsets[0] / 1000 * self.speed
+        gaps = [0.0] + [max(b - a, 0) / 1000 * self.speed for a, b in zip(offsets, offsets[1:])]
+        return await _play(texts, ttft, gaps, record.get('usage', {}), stream)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            'hits': self.hits,
+            'endpoint_hits': self.endpoint_hits,
+            'misses': self.misses,
+        }
+
+
+class _RecordingStream:
+    """스트리밍 응답을 그대로 전달하면서 청크와 도착 시각을 모음"""
+
+    def __init__(self, response, started: float, on_done: Callable[[List[dict], Any], None]):
+        self._response = response
+        self._started = started
+        self._on_done = on_done
+
+    @property
+    def usage_metadata(self):
+        return getattr(self._response, 'usage_metadata', None)
+
+    async def __aiter__(self):
+        chunks = []
+        async for chunk in self._response:
+            try:
+                chunks.append({'text': chunk.text, 'ms': round((time.perf_counter() - self._started) * 1000, 1)})
+            except ValueError:
+                pass
+            yield chunk
+        self._on_done(chunks, self._response)
+
+
+class _RecordingChat:
+    def __init__(self, recorder: "_RecordingModel", chat, history: List[Dict[str, Any]]):
+        self._recorder = recorder
+        self._chat = chat
+        self._history = history
+
+    async def send_message_async(self, message: Any, **kwargs):
+        return await self._recorder.capture(
+            {'history': self._history, 'message': message},
+            lambda: self._chat.send_message_async(message, **kwargs),
+            kwargs.get('stream', False),
+        )
+
+
+class _RecordingModel:
+    def __init__(self, model, backend: "RecordingBackend", model_name: str, system_instruction: Optional[str]):
+        self._model = model
+        self._backend = backend
+        self._model_name = model_name
+        self._system_instruction = system_instruction
+
+    async def capture(self, payload: Dict[str, Any], call: Callable[[], Awaitable[Any]], stream: bool):
+        return await self._backend.capture(self._model_name, self._system_instruction, payload, call, stream)
+
+    async def generate_content_async(self, contents: Any, **kwargs):
+        return await self.capture(
+            {'contents': contents},
+            lambda: self._model.generate_content_async(contents, **kwargs),
+            kwargs.get('stream', False),
+        )
+
+    def start_chat(self, history: Optional[List[Dict[str, Any]]] = None) -> _RecordingChat:
+        return _RecordingChat(self, self._model.start_chat(history=history), history or [])
+
+
+class RecordingBackend:
+    """실제 Gemini 응답을 GEMINI_RECORDINGS(JSONL)에 추가 기록"""
+
+    offline = False
+    name = 'record'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def wrap(self, fn: Callable[[Any], Awaitable[Any]], model_name: str,
+             system_instruction: Optional[str]) -> Callable[[Any], Awaitable[Any]]:
+        return lambda model: fn(_RecordingModel(model, self, model_name, system_instruction))
+
+    def _write(self, key: str, model_name: str, chunks: List[dict], response, latency_ms: float):
+        usage = getattr(response, 'usage_metadata', None)
+        endpoint, _ = current_call_context()
+        record = {
+            'key': key,
+            'endpoint': endpoint,
+            'model': model_name,
+            'text': "".join(c['text'] for c in chunks),
+            'chunks': chunks,
+            'latencyMs': round(latency_ms, 1),
+            'usage': {
+                'prompt': getattr(usage, 'prompt_token_count', 0) or 0,
+                'cached': getattr(usage, 'cached_content_token_count', 0) or 0,
+                'output': getattr(usage, 'candidates_token_count', 0) or 0,
+            },
+        }
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.recorded += 1
+
+    async def capture(self, model_name: str, system_instruction: Optional[str], payload: Dict[str, Any],
+                      call: Callable[[], Awaitable[Any]], stream: bool):
+        key = request_key(model_name, system_instruction, payload)
+        started = time.perf_counter()
+        response = await call()
+        if stream:
+            return _RecordingStream(
+                response, started,
+                lambda chunks, r: self._write(key, model_name, chunks, r, (time.perf_counter() - started) * 1000),
+            )
+        latency = (time.perf_counter() - started) * 1000
+        try:
+            self._write(key, model_name, [{'text': response.text, 'ms': round(latency, 1)}], response, latency)
+        except ValueError:
+            # 텍스트가 없는 응답(안전 필터 차단 등)은 기록하지 않음
+            pass
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'recorded': self.recorded, 'path': self.path}
+
+
+def create_backend(name: str = GEMINI_BACKEND):
+    """GEMINI_BACKEND 값에 맞는 백엔드 (live이면 None)"""
+    if name in ('', 'live'):
+        return None
+    if name == 'synthetic':
+        return SyntheticBackend()
+    if name in ('record', 'replay'):
+        if not GEMINI_RECORDINGS:
+            raise ValueError(f"GEMINI_BACKEND={name} requires GEMINI_RECORDINGS (JSONL path)")
+        return RecordingBackend(GEMINI_RECORDINGS) if name == 'record' else ReplayBackend(GEMINI_RECORDINGS)
+    raise ValueError(f"Unknown GEMINI_BACKEND: {name}")
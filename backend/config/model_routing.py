@@ -0,0 +1,158 @@
+"""
+Tiered Gemini model routing.
+Short, option-selection and follow-up chat turns go to a cheaper/faster model;
+draft generation and heavy tasks (applicant analysis, vision PDF parsing)
+stay on the stronger model. Every decision is recorded in the LLM metrics of
+the current `llm_call_context` endpoint.
+
+Environment:
+    GEMINI_ROUTING=true|false          false면 모든 호출을 강한 모델로
+    GEMINI_FAST_MODEL                  (기본 gemini-2.5-flash-lite)
+    GEMINI_STRONG_MODEL                (기본 DEFAULT_MODEL)
+    GEMINI_ROUTE_SHORT_CHARS           이 길이 이하의 메시지는 짧은 턴 (기본 30)
+    GEMINI_ROUTE_FOLLOWUP_CHARS        대화 중 이 길이 이하의 메시지는 후속 턴 (기본 80)
+    GEMINI_TASK_TIERS                  작업별 티어 덮어쓰기 ("applicant_query=fast,pdf_text=strong")
+
+Usage:
+    from config.model_routing import route_chat, route_task
+
+    decision = route_chat(message, history)
+    response = await client.send_message(history, message, decision.model, ...)
+"""
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from config.gemini import DEFAULT_MODEL
+from utils.metrics import get_llm_metrics
+
+TIER_FAST = "fast"
+TIER_STRONG = "strong"
+
+ROUTING_ENABLED = os.getenv("GEMINI_ROUTING", "true").lower() == "true"
+FAST_MODEL = os.getenv("GEMINI_FAST_MODEL", "gemini-2.5-flash-lite")
+STRONG_MODEL = os.getenv("GEMINI_STRONG_MODEL", DEFAULT_MODEL)
+SHORT_CHARS = int(os.getenv("GEMINI_ROUTE_SHORT_CHARS", "30"))
+FOLLOWUP_CHARS = int(os.getenv("GEMINI_ROUTE_FOLLOWUP_CHARS", "80"))
+
+# 초안 생성은 항상 강한 모델
+DRAFT_MARKER = "[초안 생성 요청]"
+# 섹션 포커스 수정은 해당 섹션 내용을 새로 쓰므로 강한 모델
+SECTION_FOCUS_MARKER = "[섹션 포커스:"
+
+# 작업별 기본 티어 (GEMINI_TASK_TIERS로 덮어쓰기)
+DEFAULT_TASK_TIERS: Dict[str, str] = {
+    "applicant_analysis": TIER_STRONG,
+    "pdf_vision": TIER_STRONG,
+    "pdf_text": TIER_STRONG,
+    "applicant_query": TIER_STRONG,
+}
+
+# 프론트엔드가 메시지 앞에 붙이는 컨텍스트 블록 ("[이미 입력된 정보: ...] ")
+_CONTEXT_PREFIX = re.compile(r'^\s*\[[^\]]*\]\s*')
+_MAX_OPTION_PICKS = 8
+_SENTENCE_END = re.compile(r'[.?!]')
+
+
+class RouteDecision(NamedTuple):
+    model: str
+    tier: str
+    reason: str
+
+
+def _parse_task_tiers(value: str) -> Dict[str, str]:
+    tiers = dict(DEFAULT_TASK_TIERS)
+    for pair in filter(None, (p.strip() for p in value.split(','))):
+        task, _, tier = pair.partition('=')
+        tier = tier.strip().lower()
+        if tier in (TIER_FAST, TIER_STRONG):
+            tiers[task.strip()] = tier
+        else:
+            print(f"⚠️ Ignoring invalid GEMINI_TASK_TIERS entry: {pair}")
+    return tiers
+
+
+TASK_TIERS = _parse_task_tiers(os.getenv("GEMINI_TASK_TIERS", ""))
+
+
+def tier_model(tier: str) -> str:
+    return FAST_MODEL if tier == TIER_FAST else STRONG_MODEL
+
+
+def task_tier(task: str) -> str:
+    if not ROUTING_ENABLED:
+        return TIER_STRONG
+    return TASK_TIERS.get(task, TIER_STRONG)
+
+
+def task_model(task: str) -> str:
+    """작업의 모델 이름 (지표 기록 없음, 해시 계산 등에 사용)"""
+    return tier_model(task_tier(task))
+
+
+def _user_text(message: str) -> str:
+    """컨텍스트 블록을 뺀 실제 사용자 입력"""
+    text = message
+    while True:
+        stripped = _CONTEXT_PREFIX.sub('', text, count=1)
+        if stripped == text:
+            return text.strip()
+        text = stripped
+
+
+def classify_chat(message: str, history: Optional[List[dict]] = None) -> RouteDecision:
+    """채팅 한 턴의 티어 결정 (지표 기록 없음)"""
+    if not ROUTING_ENABLED:
+        return RouteDecision(STRONG_MODEL, TIER_STRONG, "disabled")
+    if DRAFT_MARKER in message:
+        return RouteDecision(STRONG_MODEL, TIER_STRONG, "draft")
+    if SECTION_FOCUS_MARKER in message:
+        return RouteDecision(STRONG_MODEL, TIER_STRONG, "section_edit")
+    if not history:
+        # 첫 턴은 대화 방향을 정하므로 강한 모델
+        return RouteDecision(STRONG_MODEL, TIER_STRONG, "first_turn")
+
+    text = _user_text(message)
+    if len(text) <= SHORT_CHARS:
+        return RouteDecision(FAST_MODEL, TIER_FAST, "short")
+    picks = [p.strip() for p in text.split(',')]
+    if (1 < len(picks) <= _MAX_OPTION_PICKS and all(0 < len(p) <= SHORT_CHARS for p in picks)
+            and not _SENTENCE_END.search(text)):
+        # 다중 선택 옵션 ("A, B, C") — 문장 부호가 있으면 일반 문장으로 봄
+        return RouteDecision(FAST_MODEL, TIER_FAST, "option_pick")
+    if len(text) <= FOLLOWUP_CHARS:
+        return RouteDecision(FAST_MODEL, TIER_FAST, "follow_up")
+    return RouteDecision(STRONG_MODEL, TIER_STRONG, "long_turn")
+
+
+def route_chat(message: str, history: Optional[List[dict]] = None) -> RouteDecision:
+    """채팅 턴 라우팅 + 지표 기록"""
+    decision = classify_chat(message, history)
+    get_llm_metrics().record_route(decision.tier, decision.reason)
+    return decision
+
+
+def route_task(task: str) -> RouteDecision:
+    """고정 작업(지원자 분석, PDF 분석 등) 라우팅 + 지표 기록"""
+    tier = task_tier(task)
+    decision = RouteDecision(tier_model(tier), tier, task)
+    get_llm_metrics().record_route(decision.tier, decision.reason)
+    return decision
+
+
+def fallback_for(decision: RouteDecision, default_fallback: Optional[str]) -> Optional[str]:
+    """빠른 모델이 장애면 강한 모델로, 강한 모델이 장애면 기존 폴백 모델로"""
+    if decision.tier == TIER_FAST:
+        return STRONG_MODEL
+    return default_fallback
+
+
+def routing_config() -> dict:
+    return {
+        'enabled': ROUTING_ENABLED,
+        'fast_model': FAST_MODEL,
+        'strong_model': STRONG_MODEL,
+        'short_chars': SHORT_CHARS,
+        'followup_chars': FOLLOWUP_CHARS,
+        'task_tiers': dict(TASK_TIERS),
+    }
@@ -1,36 +1,205 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from firebase_admin import auth as firebase_auth
-from config.firebase import get_db, cache_data, get_cached_data
-from datetime import datetime
+from google.auth import jwt as google_jwt
+from config.firebase import get_db
+from utils.cache import cache_namespace
+from utils.singleflight import SingleFlight
+from typing import Optional
+import asyncio
 import hashlib
+import os
+import re
+import time
+import httpx
 
 security = HTTPBearer()
 
+# 토큰 해시 → 검증된 클레임
+_token_cache = cache_namespace("token_verify")
+# 같은 토큰의 동시 검증 병합
+_token_flight = SingleFlight()
+
+# Firebase ID 토큰 서명용 Google x509 공개 인증서
+_FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+_DEFAULT_CERTS_MAX_AGE = 3600       # Cache-Control 헤더가 없을 때 기본 캐시 시간 (초)
+_CERTS_REFRESH_MARGIN = 300         # 만료 5분 전부터 백그라운드 갱신
+_CLAIMS_EXPIRY_MARGIN = 60          # 토큰 exp 1분 전까지만 검증 결과 캐싱
+_CLOCK_SKEW_SECONDS = 10
+_FORCED_REFRESH_COOLDOWN = 60       # 모르는 kid로 인한 강제 갱신은 60초에 한 번까지
+
+_certs: dict = {}
+_certs_expire_at: float = 0.0
+_certs_lock = asyncio.Lock()
+_certs_refresh_task: Optional[asyncio.Task] = None
+_last_forced_refresh: float = float('-inf')
+
+
+class _CertsUnavailable(Exception):
+    """Google 인증서를 가져올 수 없음 (로컬 검증 불가 → SDK 검증으로 폴백)"""
+
+
+def _get_project_id() -> Optional[str]:
+    project_id = os.getenv("FIREBASE_PROJECT_ID")
+    if project_id:
+        return project_id
+    try:
+        import firebase_admin
+        return firebase_admin.get_app().project_id
+    except Exception:
+        return None
+
+
+def _parse_max_age(cache_control: str) -> int:
+    match = re.search(r'max-age=(\d+)', cache_control or '')
+    return int(match.group(1)) if match else _DEFAULT_CERTS_MAX_AGE
+
+
+async def _fetch_certs() -> dict:
+    """Google 인증서를 내려받아 Cache-Control max-age 동안 보관"""
+    global _certs, _certs_expire_at
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.get(_FIREBASE_CERTS_URL)
+            resp.raise_for_status()
+            certs = resp.json()
+    except Exception as e:
+        raise _CertsUnavailable(str(e))
+
+    _certs = certs
+    _certs_expire_at = time.time() + _parse_max_age(resp.headers.get('cache-control', ''))
+    return _certs
+
+
+async def _refresh_certs_in_background():
+    global _certs_refresh_task
+    try:
+        await _fetch_certs()
+    except _CertsUnavailable as e:
+        # 기존 인증서는 만료 시점까지 계속 사용
+        print(f"⚠️ Background cert refresh failed: {e}")
+    finally:
+        _certs_refresh_task = None
+
+
+async def get_google_certs(force_refresh: bool = False) -> dict:
+    """
+    캐시된 Google 인증서 반환.
+    만료가 가까우면 백그라운드에서 갱신하고, 이미 만료된 경우에만 요청을 블로킹합니다.
+    force_refresh는 _FORCED_REFRESH_COOLDOWN마다 한 번만 실제로 내려받습니다
+    (위조 kid를 가진 토큰으로 외부 요청을 반복 유발하지 못하도록).
+    """
+    global _certs_refresh_task, _last_forced_refresh
+    now = time.time()
+
+    if force_refresh:
+        async with _certs_lock:
+            if time.monotonic() - _last_forced_refresh < _FORCED_REFRESH_COOLDOWN:
+                return _certs
+            _last_forced_refresh = time.monotonic()
+            return await _fetch_certs()
+
+    if not _certs or now >= _certs_expire_at:
+        async with _certs_lock:
+            if not _certs or time.time() >= _certs_expire_at:
+                return await _fetch_certs()
+        return _certs
+
+    if now >= _certs_expire_at - _CERTS_REFRESH_MARGIN and _certs_refresh_task is None:
+        _certs_refresh_task = asyncio.create_task(_refresh_certs_in_background())
+
+    return _certs
+
+
+def _token_key_id(token: str) -> str:
+    """서명 검증 전에 헤더 확인: RS256 + kid 필수 (firebase_admin과 동일)"""
+    try:
+        header = google_jwt.decode_header(token)
+    except Exception as e:
+        raise ValueError(f"Malformed token header: {e}")
+    if header.get('alg') != 'RS256':
+        raise ValueError("Token must use the RS256 algorithm")
+    kid = header.get('kid')
+    if not isinstance(kid, str) or not kid:
+        raise ValueError("Token has no 'kid' header")
+    return kid
+
+
+def _decode_id_token(token: str, certs: dict, project_id: str) -> dict:
+    """Firebase ID 토큰 서명 및 클레임 검증 (firebase_admin.verify_id_token과 동일 규칙)"""
+    claims = google_jwt.decode(
+        token,
+        certs=certs,
+        audience=project_id,
+        clock_skew_in_seconds=_CLOCK_SKEW_SECONDS,
+    )
+
+    if claims.get('iss') != f"https://securetoken.google.com/{project_id}":
+        raise ValueError("Invalid issuer")
+
+    sub = claims.get('sub')
+    if not isinstance(sub, str) or not sub or len(sub) > 128:
+        raise ValueError("Invalid subject")
+
+    auth_time = claims.get('auth_time')
+    if auth_time is not None and auth_time > time.time() + _CLOCK_SKEW_SECONDS:
+        raise ValueError("Invalid auth_time")
+
+    claims['uid'] = sub
+    return claims
+
+
+async def _verify_id_token_locally(token: str) -> dict:
+    """
+    캐시된 인증서로 로컬 검증.
+    모르는 kid면 (키 교체 대비) 인증서를 새로 받아 보지만, 쿨다운 중이면 바로 거절합니다.
+    """
+    project_id = _get_project_id()
+    if not project_id:
+        raise _CertsUnavailable("Firebase project id not configured")
+
+    kid = _token_key_id(token)
+    certs = await get_google_certs()
+    if kid not in certs:
+        certs = await get_google_certs(force_refresh=True)
+        if kid not in certs:
+            raise ValueError(f"Unknown key id: {kid}")
+    return _decode_id_token(token, certs, project_id)
+
 
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Firebase ID 토큰을 검증하고 사용자 정보를 반환합니다. (캐싱 적용)"""
     # Firebase 초기화 확인 (get_db 호출 시 초기화됨)
     get_db()
-    
+
     token = credentials.credentials
-    
+
     # 토큰 해시를 캐시 키로 사용 (보안상 토큰 전체를 저장하지 않음)
     token_hash = hashlib.sha256(token.encode()).hexdigest()[:16]
-    cache_key = f"token_verify:{token_hash}"
-    
-    # 캐시된 토큰 검증 결과 확인 (5분 TTL)
-    cached_result = get_cached_data(cache_key)
+
+    # 캐시된 토큰 검증 결과 확인 (토큰 exp 직전까지 유효)
+    cached_result = _token_cache.get(token_hash)
     if cached_result:
         return cached_result
-    
-    try:
-        decoded_token = firebase_auth.verify_id_token(token)
-        
-        # 검증 결과 캐시 저장 (5분)
-        cache_data(cache_key, decoded_token, ttl_seconds=300)
-        
+
+    async def _verify() -> dict:
+        try:
+            decoded_token = await _verify_id_token_locally(token)
+        except _CertsUnavailable as e:
+            # 인증서를 가져올 수 없으면 Firebase SDK 검증으로 폴백
+            print(f"⚠️ Local token verification unavailable ({e}), falling back to Firebase SDK")
+            decoded_token = await run_in_threadpool(firebase_auth.verify_id_token, token)
+
+        # 검증 결과 캐시 저장 (exp - 여유시간)
+        ttl = int(decoded_token.get('exp', 0) - time.time() - _CLAIMS_EXPIRY_MARGIN)
+        if ttl > 0:
+            _token_cache.set(token_hash, decoded_token, ttl_seconds=ttl)
+
         return decoded_token
+
+    try:
+        return await _token_flight.do(token_hash, _verify)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
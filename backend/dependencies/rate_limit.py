@@ -0,0 +1,252 @@
+"""
+Admission control for AI endpoints.
+A global concurrency limit with a bounded, per-user fair wait queue, plus
+per-user token buckets, so one recruiter's bulk requests cannot exhaust the
+Gemini quota or starve CRUD traffic. Saturation is reported quickly as
+429 with Retry-After instead of piling up requests.
+
+Usage:
+    from dependencies.rate_limit import ai_admission
+
+    @router.post("/chat")
+    async def chat(request: ..., user_data: dict = Depends(ai_admission)):
+        ...
+"""
+import asyncio
+import itertools
+import math
+import os
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+
+from dependencies.auth import verify_token
+
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+AI_MAX_QUEUE = int(os.getenv("AI_MAX_QUEUE", "32"))
+AI_QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", "10"))
+AI_USER_MAX_CONCURRENCY = int(os.getenv("AI_USER_MAX_CONCURRENCY", "2"))
+AI_USER_RATE_PER_MINUTE = float(os.getenv("AI_USER_RATE_PER_MINUTE", "20"))
+AI_USER_BURST = int(os.getenv("AI_USER_BURST", "10"))
+# 이 수를 넘으면 유휴(가득 찬) 버킷을 정리 (사용 중인 버킷은 지우지 않음)
+AI_RATE_BUCKET_MAX_USERS = int(os.getenv("AI_RATE_BUCKET_MAX_USERS", "10000"))
+
+
+def _too_many(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def is_full(self, now: float) -> bool:
+        """다시 가득 찼으면 새 버킷과 같으므로 지워도 됨"""
+        return self.tokens + (now - self.updated_at) * self.rate >= self.capacity
+
+    def try_take(self) -> Tuple[bool, float]:
+        """토큰 하나 사용. (성공 여부, 다음 토큰까지 남은 초)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    전역 동시 실행 수 제한 + 사용자별 공정 대기열.
+
+    슬롯이 비면 대기 중인 사용자 중 현재 실행 중인 요청이 가장 적은 사용자에게
+    먼저 배정하고(같으면 먼저 온 요청), 사용자별 동시 실행 수도 제한합니다.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = AI_MAX_CONCURRENCY,
+        max_queue: int = AI_MAX_QUEUE,
+        queue_timeout: float = AI_QUEUE_TIMEOUT,
+        user_max_concurrency: int = AI_USER_MAX_CONCURRENCY,
+        user_rate_per_minute: float = AI_USER_RATE_PER_MINUTE,
+        user_burst: int = AI_USER_BURST,
+        max_buckets: int = AI_RATE_BUCKET_MAX_USERS,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.user_max_concurrency = user_max_concurrency
+        self.user_rate = user_rate_per_minute / 60
+        self.user_burst = user_burst
+
+        # 공유 캐시에 두면 다른 네임스페이스 때문에 LRU로 밀려나 버스트가 초기화되므로 전용 dict 사용
+        self.max_buckets = max_buckets
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._prune_at = max_buckets
+        self._active = 0
+        self._inflight: Counter = Counter()
+        self._waiters: Dict[str, Deque[Tuple[int, asyncio.Future]]] = {}
+        self._waiting = 0
+        self._seq = itertools.count()
+        self.rejected: Counter = Counter()
+
+    def _prune_buckets(self):
+        """다시 가득 찬 유휴 버킷만 제거. 남은 버킷 수의 2배가 될 때까지 다음 정리를 미룸"""
+        now = time.monotonic()
+        self._buckets = {uid: b for uid, b in self._buckets.items() if not b.is_full(now)}
+        self._prune_at = max(self.max_buckets, 2 * len(self._buckets))
+
+    def _take_token(self, uid: str) -> Tuple[bool, float]:
+        bucket = self._buckets.get(uid)
+        if bucket is None:
+            if len(self._buckets) >= self._prune_at:
+                self._prune_buckets()
+            bucket = self._buckets[uid] = TokenBucket(self.user_rate, self.user_burst)
+        return bucket.try_take()
+
+    def _can_run(self, uid: str) -> bool:
+        return self._active < self.max_concurrency and self._inflight[uid] < self.user_max_concurrency
+
+    def _grant(self, uid: str):
+        self._active += 1
+        self._inflight[uid] += 1
+
+    def _dispatch(self):
+        """빈 슬롯을 대기 중인 사용자에게 공정하게 배정"""
+        while self._active < self.max_concurrency:
+            candidates = [
+                (self._inflight[uid], queue[0][0], uid)
+                for uid, queue in self._waiters.items()
+                if queue and self._inflight[uid] < self.user_max_concurrency
+            ]
+            if not candidates:
+                return
+            _, _, uid = min(candidates)
+            _, future = self._waiters[uid].popleft()
+            if not self._waiters[uid]:
+                del self._waiters[uid]
+            self._waiting -= 1
+            if not future.done():
+                self._grant(uid)
+                future.set_result(True)
+
+    def _remove_waiter(self, uid: str, future: asyncio.Future):
+        queue = self._waiters.get(uid)
+        if not queue:
+            return
+        for item in queue:
+            if item[1] is future:
+                queue.remove(item)
+                self._waiting -= 1
+                break
+        if not queue:
+            del self._waiters[uid]
+
+    async def acquire(self, uid: str):
+        """슬롯 확보. 한도 초과 또는 대기 시간 초과 시 429"""
+        ok, retry_after = self._take_token(uid)
+        if not ok:
+            self.rejected['rate'] += 1
+            raise _too_many("AI 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.", retry_after)
+
+        if not self._waiters and self._can_run(uid):
+            self._grant(uid)
+            return
+
+        if self._waiting >= self.max_queue:
+            self.rejected['queue_full'] += 1
+            raise _too_many("AI 서버가 혼잡합니다. 잠시 후 다시 시도해주세요.", self.queue_timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(uid, deque()).append((next(self._seq), future))
+        self._waiting += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # 배정과 취소가 겹친 경우 슬롯 반환
+                self.release(uid)
+            else:
+                future.cancel()
+                self._remove_waiter(uid, future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected['queue_timeout'] += 1
+            raise _too_many("AI 서버가 혼잡합니다. 잠시 후 다시 시도해주세요.", self.queue_timeout)
+
+    def release(self, uid: str):
+        self._active -= 1
+        self._inflight[uid] -= 1
+        if self._inflight[uid] <= 0:
+            del self._inflight[uid]
+        self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            'active': self._active,
+            'waiting': self._waiting,
+            'maxConcurrency': self.max_concurrency,
+            'maxQueue': self.max_queue,
+            'rateBuckets': len(self._buckets),
+            'rejected': dict(self.rejected),
+        }
+
+
+class AdmissionSlot:
+    """스트리밍 응답처럼 핸들러 반환 이후까지 슬롯을 유지할 때 사용 (release는 한 번만 적용)"""
+
+    def __init__(self, controller: AdmissionController, uid: str):
+        self.controller = controller
+        self.uid = uid
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.controller.release(self.uid)
+
+
+# Singleton instance for application-wide use
+_controller_instance: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """AdmissionController 싱글톤 반환"""
+    global _controller_instance
+
+    if _controller_instance is None:
+        _controller_instance = AdmissionController()
+
+    return _controller_instance
+
+
+async def ai_admission(user_data: dict = Depends(verify_token)):
+    """AI 엔드포인트용 의존성: 인증 후 슬롯을 확보하고 응답이 만들어지면 반환"""
+    controller = get_admission_controller()
+    await controller.acquire(user_data['uid'])
+    try:
+        yield user_data
+    finally:
+        controller.release(user_data['uid'])
+
+
+async def acquire_ai_slot(user_data: dict) -> AdmissionSlot:
+    """스트리밍 엔드포인트용: 슬롯을 확보해 반환 (스트림 종료 시 slot.release())"""
+    controller = get_admission_controller()
+    await controller.acquire(user_data['uid'])
+    return AdmissionSlot(controller, user_data['uid'])
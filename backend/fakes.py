@@ -0,0 +1,150 @@
+"""
+In-memory Firestore stand-in shared by the backend tests.
+
+Supports the subset of the client API the services use: collection/document
+references, set/update/get, where(...).stream(), SERVER_TIMESTAMP and
+last_update_time write preconditions. Module globals are swapped with
+`patched(...)`, which always restores the originals.
+
+Usage:
+    from fakes import FakeFirestore, patched
+
+    db = FakeFirestore()
+    with patched(analysis, get_db=lambda: db):
+        ...
+"""
+import contextlib
+import itertools
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from firebase_admin import firestore as firebase_firestore
+from google.api_core import exceptions as google_exceptions
+
+
+@contextlib.contextmanager
+def patched(target: Any, **attrs):
+    """target의 속성을 잠시 교체하고, 끝나면 (예외가 나도) 원래 값으로 되돌림"""
+    originals = {name: getattr(target, name) for name in attrs}
+    try:
+        for name, value in attrs.items():
+            setattr(target, name, value)
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(target, name, value)
+
+
+class FakeSnapshot:
+    def __init__(self, reference: "FakeDocRef", data: Optional[dict], update_time: Optional[int]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.exists = data is not None
+        self.update_time = update_time
+
+    def to_dict(self) -> Optional[dict]:
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocRef:
+    def __init__(self, db: "FakeFirestore", collection: str, doc_id: str):
+        self.db = db
+        self.collection = collection
+        self.id = doc_id
+
+    def set(self, data: dict):
+        self.db._write("set", self.collection, self.id, data)
+
+    def update(self, data: dict, option: Optional[dict] = None):
+        self.db._write("update", self.collection, self.id, data, option)
+
+    def get(self, field_paths=None) -> FakeSnapshot:
+        return self.db._read(self)
+
+
+class FakeQuery:
+    def __init__(self, db: "FakeFirestore", collection: str, filters: tuple = ()):
+        self.db = db
+        self.collection_name = collection
+        self.filters = filters
+
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        return FakeQuery(self.db, self.collection_name, self.filters + ((field, op, value),))
+
+    def _matches(self, data: dict) -> bool:
+        for field, op, value in self.filters:
+            if op == "==" and data.get(field) != value:
+                return False
+            if op == "in" and data.get(field) not in value:
+                return False
+        return True
+
+    def stream(self):
+        self.db.before_stream(self)
+        docs = self.db.docs.get(self.collection_name, {})
+        return [
+            self.db._read(FakeDocRef(self.db, self.collection_name, doc_id))
+            for doc_id, data in list(docs.items()) if self._matches(data)
+        ]
+
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id: Optional[str] = None) -> FakeDocRef:
+        if doc_id is None:
+            doc_id = f"doc{next(self.db._ids)}"
+        return FakeDocRef(self.db, self.collection_name, doc_id)
+
+
+class FakeFirestore:
+    """
+    컬렉션별 문서 dict + 쓰기 기록(writes) + 읽기 횟수(reads).
+    SERVER_TIMESTAMP는 현재 시각으로 바뀌고, 문서마다 쓰기 횟수를 update_time으로 사용합니다.
+    """
+
+    def __init__(self, docs: Optional[Dict[str, Dict[str, dict]]] = None):
+        self.docs: Dict[str, Dict[str, dict]] = {name: dict(items) for name, items in (docs or {}).items()}
+        self.writes: list = []
+        self.reads = 0
+        self._versions: Dict[tuple, int] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # 테스트에서 스트리밍 도중 끼어들 지점이 필요하면 교체
+    def before_stream(self, query: FakeQuery):
+        pass
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, name)
+
+    def write_option(self, last_update_time=None) -> dict:
+        return {"last_update_time": last_update_time}
+
+    def doc(self, collection: str, doc_id: str) -> Optional[dict]:
+        return self.docs.get(collection, {}).get(doc_id)
+
+    async def get_document(self, collection: str, doc_id: str, field_paths=None) -> FakeSnapshot:
+        """config.firebase.get_document 대체"""
+        return self._read(FakeDocRef(self, collection, doc_id))
+
+    def _read(self, ref: FakeDocRef) -> FakeSnapshot:
+        with self._lock:
+            self.reads += 1
+            data = self.doc(ref.collection, ref.id)
+            version = self._versions.get((ref.collection, ref.id))
+            return FakeSnapshot(ref, dict(data) if data is not None else None, version)
+
+    def _write(self, op: str, collection: str, doc_id: str, data: dict, option: Optional[dict] = None):
+        now = datetime.now(timezone.utc)
+        values = {k: now if v is firebase_firestore.SERVER_TIMESTAMP else v for k, v in data.items()}
+        key = (collection, doc_id)
+        with self._lock:
+            current = self.doc(collection, doc_id)
+            if op == "update" and current is None:
+                raise google_exceptions.NotFound(f"{collection}/{doc_id}")
+            if option is not None and option["last_update_time"] != self._versions.get(key):
+                raise google_exceptions.FailedPrecondition(f"{collection}/{doc_id} was modified")
+            self.writes.append((op, collection, doc_id, data))
+            self.docs.setdefault(collection, {})[doc_id] = values if op == "set" else {**current, **values}
+            self._versions[key] = self._versions.get(key, 0) + 1
@@ -2,7 +2,7 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.responses import JSONResponse, Response
 from datetime import datetime
 from dotenv import load_dotenv
 import asyncio
@@ -19,6 +19,8 @@ from routes.gemini import router as gemini_router
 from routes.comments import router as comments_router
 from routes.team import router as team_router
 from routes.pdf_analysis import router as pdf_router
+from routes.jobs import router as jobs_router
+from routes.metrics import router as metrics_router
 
 app = FastAPI(title="Winnow API", version="1.0.0")
 
@@ -81,6 +83,23 @@ async def startup_event():
     except Exception as e:
         print(f"⚠️  Firebase initialization warning: {e}")
     
+    # 1-1. ID 토큰 로컬 검증용 Google 인증서 미리 받기
+    from dependencies.auth import get_google_certs
+    try:
+        await get_google_certs()
+        print("✅ Google ID token certs cached")
+    except Exception as e:
+        print(f"⚠️  Google cert prefetch warning: {e}")
+    
+    # 1-2. 인메모리 캐시 만료 항목 주기적 정리
+    from utils.cache import get_cache
+    get_cache().start_sweeper()
+    
+    # 1-3. 백그라운드 작업 워커 시작 (미완료 작업 복구 포함)
+    from services.jobs import get_job_manager
+    await get_job_manager().start()
+    print("✅ Background job workers started")
+    
     # 2. 자체 Keep-alive (Render Free Tier 15분 sleep 방지)
     _keep_alive_task = asyncio.create_task(_self_ping_loop())
     print("✅ Self keep-alive timer started (13min interval)")
@@ -93,6 +112,14 @@ async def shutdown_event():
     if _keep_alive_task:
         _keep_alive_task.cancel()
         print("🛑 Self keep-alive timer stopped")
+    
+    from utils.cache import get_cache
+    get_cache().stop_sweeper()
+    
+    # 실행 중인 백그라운드 작업 완료 대기 (남은 작업은 다음 시작 시 복구)
+    from services.jobs import get_job_manager
+    await get_job_manager().shutdown()
+    print("🛑 Background job workers stopped")
 
 
 async def _self_ping_loop():
@@ -147,6 +174,23 @@ app.include_router(gemini_router)
 app.include_router(comments_router)
 app.include_router(team_router)
 app.include_router(pdf_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
+
+
+# ==================== Gemini 장애 응답 ====================
+from config.gemini import GeminiUnavailable
+
+
+@app.exception_handler(GeminiUnavailable)
+async def gemini_unavailable_handler(request: Request, exc: GeminiUnavailable):
+    """Gemini 과부하/장애 시 500 대신 503 + Retry-After (클라이언트의 즉시 재시도 방지)"""
+    print(f"⚠️ {str(exc)}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "AI 서비스가 일시적으로 혼잡합니다. 잠시 후 다시 시도해주세요."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 # ==================== Health Check ====================
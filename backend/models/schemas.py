@@ -1,8 +1,63 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable
 from utils.security_utils import get_encryptor
 
 
+# 암호화 대상 개인정보 필드 (AES-256-GCM)
+SENSITIVE_FIELDS = [
+    'applicantName',
+    'applicantEmail',
+    'applicantPhone',
+    'birthDate',
+    'university',
+    'major'
+]
+
+# Firestore DatetimeWithNanoseconds → ISO 문자열 변환 대상
+DATETIME_FIELDS = ['createdAt', 'updatedAt', 'appliedAt']
+
+
+def decrypt_application_data(data: dict, fields: Optional[Iterable[str]] = None) -> dict:
+    """
+    Decrypt sensitive fields of a raw application document in place.
+
+    Only the sensitive fields listed in ``fields`` are decrypted (all of them
+    when ``fields`` is None), so sparse views pay only for what they show.
+    Gracefully handles non-encrypted legacy data.
+    Also converts Firestore DatetimeWithNanoseconds to ISO string.
+    """
+    for field in DATETIME_FIELDS:
+        if field in data and data[field] is not None:
+            val = data[field]
+            if hasattr(val, 'isoformat'):
+                data[field] = val.isoformat()
+
+    if fields is None:
+        targets = SENSITIVE_FIELDS
+    else:
+        requested = set(fields)
+        targets = [f for f in SENSITIVE_FIELDS if f in requested]
+    if not targets:
+        return data
+
+    encryptor = get_encryptor()
+
+    # Decrypt each sensitive field that has a value
+    for field in targets:
+        if field in data and data[field] is not None:
+            try:
+                # Try to decrypt - if it fails, assume it's already decrypted (legacy data)
+                original_value = str(data[field])
+                data[field] = encryptor.decrypt(original_value)
+                print(f"✅ Successfully decrypted {field}")
+            except Exception as e:
+                # If decryption fails, keep original value (backward compatibility)
+                print(f"⚠️ Failed to decrypt {field}: {str(e)} - keeping original value")
+                pass
+
+    return data
+
+
 # ==================== Auth Models ====================
 class UserRegister(BaseModel):
     """
@@ -80,6 +135,7 @@ class JDCreate(BaseModel):
     recruitmentProcess: Optional[List[str]] = None  # 모집 절차
     activitySchedule: Optional[str] = None    # 활동 일정
     membershipFee: Optional[str] = None       # 회비/활동비
+    autoAnalyze: bool = False                 # 지원서 제출 시 AI 분석 자동 실행
 
 
 class JDUpdate(BaseModel):
@@ -113,6 +169,7 @@ class JDUpdate(BaseModel):
     recruitmentProcess: Optional[List[str]] = None
     activitySchedule: Optional[str] = None
     membershipFee: Optional[str] = None
+    autoAnalyze: Optional[bool] = None
 
 
 # ==================== Application Models ====================
@@ -148,21 +205,11 @@ class ApplicationCreate(BaseModel):
         """
         encryptor = get_encryptor()
         
-        # List of fields to encrypt
-        sensitive_fields = [
-            'applicantName',
-            'applicantEmail', 
-            'applicantPhone',
-            'birthDate',
-            'university',
-            'major'
-        ]
-        
         # Convert to dict for encryption
         data_dict = self.model_dump()
         
         # Encrypt each sensitive field that has a value
-        for field in sensitive_fields:
+        for field in SENSITIVE_FIELDS:
             if field in data_dict and data_dict[field] is not None:
                 try:
                     data_dict[field] = encryptor.encrypt(str(data_dict[field]))
@@ -214,38 +261,7 @@ class ApplicationResponse(BaseModel):
         Also converts Firestore DatetimeWithNanoseconds to ISO string.
         """
         if isinstance(data, dict):
-            # Convert Firestore datetime objects to ISO strings
-            datetime_fields = ['createdAt', 'updatedAt', 'appliedAt']
-            for field in datetime_fields:
-                if field in data and data[field] is not None:
-                    val = data[field]
-                    if hasattr(val, 'isoformat'):
-                        data[field] = val.isoformat()
-            
-            encryptor = get_encryptor()
-            
-            # List of fields to decrypt
-            sensitive_fields = [
-                'applicantName',
-                'applicantEmail',
-                'applicantPhone',
-                'birthDate',
-                'university',
-                'major'
-            ]
-            
-            # Decrypt each sensitive field that has a value
-            for field in sensitive_fields:
-                if field in data and data[field] is not None:
-                    try:
-                        # Try to decrypt - if it fails, assume it's already decrypted (legacy data)
-                        original_value = str(data[field])
-                        data[field] = encryptor.decrypt(original_value)
-                        print(f"✅ Successfully decrypted {field}")
-                    except Exception as e:
-                        # If decryption fails, keep original value (backward compatibility)
-                        print(f"⚠️ Failed to decrypt {field}: {str(e)} - keeping original value")
-                        pass
+            decrypt_application_data(data)
         
         return data
 
@@ -257,15 +273,43 @@ class ApplicationUpdate(BaseModel):
 # ==================== AI Models ====================
 class AIAnalysisRequest(BaseModel):
     applicantData: Dict[str, Any]
+    force: bool = False  # True면 저장된 분석이 있어도 새로 생성
+    background: bool = False  # True면 백그라운드 작업으로 실행하고 jobId 반환
 
 
 class SaveAnalysisRequest(BaseModel):
     analysis: str
 
 
+class AnalyzeAllRequest(BaseModel):
+    force: bool = False  # True면 저장된 분석이 있어도 모두 새로 생성
+
+
 class GeminiChatRequest(BaseModel):
     message: str
     chatHistory: List[Dict[str, Any]] = []
     type: Optional[str] = "club"  # 'company' | 'club'
+    jdData: Optional[Dict[str, Any]] = None  # 현재 공고 데이터 (히스토리 압축 시 스냅샷으로 사용)
+    sessionId: Optional[str] = None  # 서버 채팅 세션 ID (있으면 chatHistory 대신 세션 히스토리 사용)
+    responseMode: Optional[str] = "full"  # 'full' | 'patch' (jdData 대신 이전 상태 대비 RFC 6902 패치 jdPatch 반환)
+
+
+class ChatSessionCreate(BaseModel):
+    type: Optional[str] = "club"  # 'company' | 'club'
+    chatHistory: List[Dict[str, Any]] = []  # 이어받을 기존 대화 (새 대화면 비움)
+    jdData: Optional[Dict[str, Any]] = None
+
+
+class SemanticSearchRequest(BaseModel):
+    jdId: str
+    query: str
+    topK: int = Field(20, ge=1, le=200)
+
+
+class QueryApplicantsRequest(BaseModel):
+    jdId: str
+    question: str
+    chatHistory: List[Dict[str, Any]] = []
+    topK: int = Field(8, ge=1, le=30)  # 자유 질문 시 Gemini에 보낼 지원자 수
 
 
@@ -1,24 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from fastapi.responses import StreamingResponse
 from firebase_admin import firestore as firebase_firestore
+from typing import List, Optional
+import hashlib
 import json
+import re
 import uuid
 import io
-import google.generativeai as genai
 
-from config.firebase import get_db, bucket
+from config.firebase import get_db, get_document, bucket
+from config.gemini import GeminiUnavailable
 import os
 from dependencies.auth import verify_token
-from models.schemas import ApplicationCreate, ApplicationUpdate, ApplicationResponse, AIAnalysisRequest, SaveAnalysisRequest
+from dependencies.rate_limit import ai_admission
+from models.schemas import ApplicationCreate, ApplicationUpdate, ApplicationResponse, AIAnalysisRequest, SaveAnalysisRequest, decrypt_application_data
+from services.analysis import analyze_stored_application, analyze_applicant_data, submit_application_analysis, submit_eager_analysis
+from services.access import APPLICATION_AUTH_FIELDS, can_access_application, require_application_access
+from services.search import application_search_fields, invalidate_jd_index
+from utils.metrics import llm_call_context
+from utils.singleflight import SingleFlight
+from utils.uploads import MAX_PDF_BYTES, spooled_upload
 
 router = APIRouter(prefix="/api/applications", tags=["Applications"])
 
+_FIELD_NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# 동일 지원자 동시 AI 분석 병합
+_analysis_flight = SingleFlight()
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """`?fields=a,b,c` 쿼리를 필드 목록으로 변환 (없으면 None = 전체 필드)"""
+    if not fields:
+        return None
+    requested = []
+    for name in fields.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if not _FIELD_NAME_PATTERN.match(name):
+            raise HTTPException(status_code=400, detail=f"Invalid field name: {name}")
+        if name not in requested:
+            requested.append(name)
+    return requested or None
+
+
+def _serialize_application(doc_id: str, app_data: dict, fields: Optional[List[str]] = None) -> dict:
+    """
+    Firestore 지원서 문서를 응답 형태로 변환합니다.
+
+    fields가 지정되면 해당 필드만 남기고, 그중 민감 필드만 복호화합니다.
+    fields가 없으면 ApplicationResponse 모델로 전체 필드를 복호화합니다.
+    """
+    if fields is not None:
+        projected = {k: app_data[k] for k in fields if k in app_data}
+        decrypt_application_data(projected, fields)
+        projected['id'] = doc_id
+        projected['applicationId'] = doc_id
+        return projected
+
+    app_data['applicationId'] = doc_id
+
+    # ApplicationResponse 모델을 통해 자동 복호화
+    try:
+        print(f"🔄 Decrypting application {doc_id}...")
+        decrypted_app = ApplicationResponse(**app_data)
+        decrypted_data = decrypted_app.model_dump()
+        decrypted_data['id'] = doc_id  # id 필드 추가
+        print(f"✅ Successfully processed application {doc_id}")
+        return decrypted_data
+    except Exception as e:
+        # 복호화 실패 시 상세 에러 로깅
+        print(f"❌ Failed to process application {doc_id}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        # 원본 데이터 반환 (backward compatibility)
+        app_data['id'] = doc_id
+        return app_data
+
 
 @router.post("")
 async def create_application(application: ApplicationCreate):
     """새 지원서를 제출합니다."""
     try:
-        jd_doc = get_db().collection('jds').document(application.jdId).get()
+        jd_doc = await get_document('jds', application.jdId)
         if not jd_doc.exists:
             raise HTTPException(status_code=404, detail="JD not found")
 
@@ -29,9 +94,20 @@ async def create_application(application: ApplicationCreate):
         app_data['recruiterId'] = recruiter_id
         app_data['appliedAt'] = firebase_firestore.SERVER_TIMESTAMP
         app_data['status'] = 'pending'
+        # 검색용 해시 TF-IDF 항 (제출 시 한 번만 계산)
+        app_data.update(application_search_fields(app_data))
 
         doc_ref = get_db().collection('applications').document()
         doc_ref.set(app_data)
+        invalidate_jd_index(application.jdId)
+
+        if jd_data.get('autoAnalyze'):
+            # 작업 등록 실패가 지원서 제출을 실패시키지 않도록 로그만 남김
+            try:
+                job_id = await submit_eager_analysis(doc_ref.id, recruiter_id)
+                print(f"🧠 Queued eager analysis {job_id} for application {doc_ref.id}")
+            except Exception as e:
+                print(f"⚠️ Failed to queue eager analysis for {doc_ref.id}: {str(e)}")
 
         return {"id": doc_ref.id, "message": "Application submitted successfully"}
     except HTTPException:
@@ -51,23 +127,22 @@ async def upload_portfolio(file: UploadFile = File(...)):
         if not file.filename or not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="PDF 파일만 업로드 가능합니다.")
         
-        # 파일 크기 제한 (10MB)
-        contents = await file.read()
-        if len(contents) > 10 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="파일 크기는 10MB 이하여야 합니다.")
-        
-        # 고유 파일명 생성
-        file_id = str(uuid.uuid4())
-        original_name = file.filename
-        blob_path = f"portfolios/{file_id}_{original_name}"
-        
-        # Firebase Storage에 업로드
-        blob = bucket.blob(blob_path)
-        blob.upload_from_string(contents, content_type='application/pdf')
-        
+        # 파일 크기 제한 (10MB, 스트리밍 중 초과 즉시 거절)
+        async with spooled_upload(file, MAX_PDF_BYTES) as upload:
+            # 고유 파일명 생성
+            file_id = str(uuid.uuid4())
+            original_name = file.filename
+            blob_path = f"portfolios/{file_id}_{original_name}"
+
+            # Firebase Storage에 업로드 (임시 파일에서 바로 전송)
+            blob = bucket.blob(blob_path)
+            blob.metadata = {"sha256": upload.sha256}
+            blob.upload_from_file(upload.file, size=upload.size, content_type='application/pdf')
+
         return {
             "fileUrl": blob_path,
             "fileName": original_name,
+            "sha256": upload.sha256,
             "message": "파일 업로드 완료"
         }
     except HTTPException:
@@ -84,7 +159,7 @@ async def download_portfolio(application_id: str, user_data: dict = Depends(veri
             raise HTTPException(status_code=500, detail="Storage가 설정되지 않았습니다.")
         
         # 지원서 조회
-        app_doc = get_db().collection('applications').document(application_id).get()
+        app_doc = await get_document('applications', application_id)
         if not app_doc.exists:
             raise HTTPException(status_code=404, detail="지원서를 찾을 수 없습니다.")
         
@@ -116,232 +191,79 @@ async def download_portfolio(application_id: str, user_data: dict = Depends(veri
 
 
 @router.post("/analyze")
-async def analyze_application(request: AIAnalysisRequest, user_data: dict = Depends(verify_token)):
-    """지원자를 AI로 분석합니다."""
+async def analyze_application(request: AIAnalysisRequest, user_data: dict = Depends(ai_admission)):
+    """
+    지원자를 AI로 분석합니다.
+    지원서 ID가 있으면 결과를 입력 해시와 함께 저장하고, 입력이 바뀌지 않았다면 저장된 분석을 재사용합니다.
+    force=true이면 항상 새로 생성하고, background=true이면 작업 ID를 즉시 반환합니다.
+    """
     try:
         GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
         if not GEMINI_API_KEY:
             raise HTTPException(status_code=500, detail="Gemini API key not configured")
 
         # application ID가 제공된 경우 DB에서 복호화된 데이터를 가져옴
-        if 'id' in request.applicantData or 'applicationId' in request.applicantData:
-            app_id = request.applicantData.get('id') or request.applicantData.get('applicationId')
-            print(f"🔄 Fetching and decrypting application {app_id} for AI analysis...")
-            
-            doc = get_db().collection('applications').document(app_id).get()
-            if not doc.exists:
-                raise HTTPException(status_code=404, detail="Application not found")
-            
-            app_data = doc.to_dict()
-            app_data['applicationId'] = doc.id
-            app_data['id'] = doc.id
-            
-            # ApplicationResponse를 통해 복호화
-            try:
-                decrypted_app = ApplicationResponse(**app_data)
-                applicant = decrypted_app.model_dump()
-                print(f"✅ Successfully decrypted application data for AI analysis")
-            except Exception as e:
-                print(f"⚠️ Failed to decrypt application for AI: {str(e)}")
-                # 실패 시 원본 데이터 사용
-                applicant = app_data
-        else:
-            # ID가 없으면 전달받은 데이터 그대로 사용 (backward compatibility)
-            applicant = request.applicantData
-
-        prompt = f"""[시스템 역할]
-당신은 초기 스타트업의 생존을 결정짓는 전문 채용 컨설턴트입니다. 지원자의 답변에서 미사여구를 제거하고, 오직 [데이터, 방법론, 행동 패턴]만을 근거로 역량(Skill)과 의지(Will)를 냉정하게 판별합니다.
-
-[분석 원칙]
-- 냉정한 상/중/하: 수치와 구체적 방법론이 없으면 무조건 '중' 이하로 판정합니다.
-- 팩트 위주: 지원자의 답변을 짧게 인용(Quote)하여 평가의 객관성을 확보합니다.
-
----
-
-🔍 지원자 분석 리포트: {applicant.get('applicantName', 'N/A')}
-
----
-
-[0. 서류 지원 현황 및 프로필]
-
-지원 트랙 : {applicant.get('track', '') or '미기입'}
-
-전공 정보 : {applicant.get('major', '') or '미기입'}
-
-인적 사항 : {(str(applicant.get('grade', '')) + '학년') if applicant.get('grade') else '미기입'} / {(str(applicant.get('age', '')) + '세') if applicant.get('age') else '미기입'}{(' (' + applicant.get('applicantGender', '') + ')') if applicant.get('applicantGender') else ''}
-
-현재 상태 : {applicant.get('status', '') or '미기입'}
-
----
-
-지원자 세부 정보:
-- 이메일: {applicant.get('applicantEmail', 'N/A')}
-- 전화번호: {applicant.get('applicantPhone', 'N/A')}
-- 공고: {applicant.get('jdTitle', 'N/A')}
-
-자격 요건 답변:
-{json.dumps(applicant.get('requirementAnswers', []), ensure_ascii=False, indent=2)}
-
-우대 사항 답변:
-{json.dumps(applicant.get('preferredAnswers', []), ensure_ascii=False, indent=2)}
-
----
-
-위 정보를 바탕으로 아래 형식에 맞춰 분석 리포트를 작성하세요:
-
-[1. 종합 진단 결과]
-
-최종 분류 : [완성형 리더 / 직무 중심 전문가 / 성장형 유망주 / 신중 검토 대상]
-
-역량(Skill) 수준 : [높음 / 보통 / 낮음]
-
-의지(Will) 수준 : [높음 / 보통 / 낮음]
-
----
-
-[2. 세부 역량 평가] (냉정 평가 모드)
-
-직무 역량 | [상 / 중 / 하]
-
-근거: " " (답변 발쵼)
-
-판정: (JD 기준 대비 실무 전문성 및 숙련도 분석)
-
----
-
-문제 해결 | [상 / 중 / 하]
-
-근거: " " (답변 발쵼)
-
-판정: (장애물 돌파를 위한 논리적 사고 및 실행력 분석)
-
----
+        app_id = request.applicantData.get('id') or request.applicantData.get('applicationId')
+        if app_id:
+            # 소유자 또는 JD 협업자만 저장된 분석을 읽거나 갱신(작업 등록 포함)할 수 있음
+            await require_application_access(app_id, user_data['uid'])
 
-성장 잠재력 | [상 / 중 / 하]
+        if app_id and request.background:
+            # 백그라운드 작업으로 실행 (진행 상황은 /api/jobs/{jobId})
+            job_id = await submit_application_analysis(app_id, user_data['uid'], request.force)
+            return {"jobId": job_id, "status": "queued"}
 
-근거: " " (답변 발쵼)
+        if app_id:
+            flight_key = ('application', app_id, request.force)
 
-판정: (실제 학습 성과 및 팀 성장에 대한 기여 의지 분석)
-
----
-
-협업 태도 | [상 / 중 / 하]
-
-근거: " " (답변 발쵼)
-
-판정: (전략적 협업 관점 및 목표 중심적 소통 능력 분석)
-
----
-
-[3. 조직 적합도 (Culture Fit)]
-
-[ ] 스타트업 마인드셋 : [확인됨 / 미흡] (MVP 사고방식 및 리소스 제한 극복 경험)
-
-[ ] 자기 주도성 : [확인됨 / 미흡] (지시 대기 여부 및 스스로 과업 정의 능력)
-
-[ ] 커뮤니케이션 : [확인됨 / 미흡] (피드백 수용성 및 결론 중심의 논리력)
-
----
-
-[4. 채용 가이드]
-
-💡 핵심 강점
-
-1.
-
-2.
-
-⚠️ 주의 사항 (Risk)
-
-(치명적인 결함 혹은 리스크 요소)
-
-(관리 시 유의해야 할 매니징 포인트)
-
-🙋 면접 질문 추천
-
-(답변의 허점을 짰르는 압박 질문)
-
-(실무 역량의 바닥을 확인하는 기술 질문)
-
----
-
-[중요 지시 사항]
-
-가독성 최우선: 들여쓰기와 구분선(---)을 사용하여 섹션을 명확히 분리하세요.
-
-간결성: 각 항목은 2줄 이내로 핵심만 짰르듯 작성하세요.
-
-엄격함: 답변이 기준에 미달하면 가차 없이 '낮음' 또는 '미흡'으로 평가하세요.
-
-금지: 절대 JSON이나 코드 블록으로 답변을 감싸지 마세요."""
+            async def _run() -> dict:
+                return await analyze_stored_application(app_id, request.force)
+        else:
+            # ID가 없으면 전달받은 데이터 그대로 사용 (backward compatibility)
+            payload = json.dumps(request.applicantData, sort_keys=True, ensure_ascii=False, default=str)
+            flight_key = ('payload', hashlib.sha256(payload.encode()).hexdigest())
 
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
+            async def _run() -> dict:
+                return await analyze_applicant_data(request.applicantData)
 
-        return {"analysis": response.text}
+        # 같은 지원자에 대한 동시 분석 요청은 한 번의 Gemini 호출을 공유
+        with llm_call_context("analyze_application", user_data['uid']):
+            return await _analysis_flight.do(flight_key, _run)
+    except (HTTPException, GeminiUnavailable):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("")
-async def get_applications(user_data: dict = Depends(verify_token)):
+async def get_applications(
+    fields: Optional[str] = Query(None, description="응답에 포함할 필드 (쉼표 구분, 예: applicantName,status,appliedAt)"),
+    user_data: dict = Depends(verify_token)
+):
     """현재 사용자의 모든 지원서를 반환합니다 (소유 + 협업 JD 포함)."""
+    field_list = _parse_fields(fields)
     try:
         uid = user_data['uid']
         applications = []
         seen_ids = set()
 
+        def _query(ref):
+            # 필드 프로젝션: 요청된 필드만 Firestore에서 읽음
+            return ref.select(field_list) if field_list else ref
+
         # 1. 자신이 recruiterId인 지원서
-        own_ref = get_db().collection('applications').where('recruiterId', '==', uid)
+        own_ref = _query(get_db().collection('applications').where('recruiterId', '==', uid))
         for doc in own_ref.stream():
-            app_data = doc.to_dict()
-            app_data['applicationId'] = doc.id
-            
-            # ApplicationResponse 모델을 통해 자동 복호화
-            try:
-                print(f"🔄 Decrypting application {doc.id}...")
-                decrypted_app = ApplicationResponse(**app_data)
-                decrypted_data = decrypted_app.model_dump()
-                decrypted_data['id'] = doc.id  # id 필드 추가
-                applications.append(decrypted_data)
-                print(f"✅ Successfully processed application {doc.id}")
-            except Exception as e:
-                # 복호화 실패 시 상세 에러 로깅
-                print(f"❌ Failed to process application {doc.id}: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                # 원본 데이터 반환 (backward compatibility)
-                app_data['id'] = doc.id
-                applications.append(app_data)
-            
+            applications.append(_serialize_application(doc.id, doc.to_dict() or {}, field_list))
             seen_ids.add(doc.id)
 
         # 2. 협업자로 초대된 JD의 지원서
         collab_jds_ref = get_db().collection('jds').where('collaboratorIds', 'array_contains', uid)
         for jd_doc in collab_jds_ref.stream():
-            jd_apps_ref = get_db().collection('applications').where('jdId', '==', jd_doc.id)
+            jd_apps_ref = _query(get_db().collection('applications').where('jdId', '==', jd_doc.id))
             for doc in jd_apps_ref.stream():
                 if doc.id not in seen_ids:
-                    app_data = doc.to_dict()
-                    app_data['applicationId'] = doc.id
-                    
-                    # ApplicationResponse 모델을 통해 자동 복호화
-                    try:
-                        print(f"🔄 Decrypting application {doc.id}...")
-                        decrypted_app = ApplicationResponse(**app_data)
-                        decrypted_data = decrypted_app.model_dump()
-                        decrypted_data['id'] = doc.id  # id 필드 추가
-                        applications.append(decrypted_data)
-                        print(f"✅ Successfully processed application {doc.id}")
-                    except Exception as e:
-                        # 복호화 실패 시 상세 에러 로깅
-                        print(f"❌ Failed to process application {doc.id}: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
-                        # 원본 데이터 반환
-                        app_data['id'] = doc.id
-                        applications.append(app_data)
-                    
+                    applications.append(_serialize_application(doc.id, doc.to_dict() or {}, field_list))
                     seen_ids.add(doc.id)
 
         return applications
@@ -350,44 +272,30 @@ async def get_applications(user_data: dict = Depends(verify_token)):
 
 
 @router.get("/{application_id}")
-async def get_application(application_id: str, user_data: dict = Depends(verify_token)):
+async def get_application(
+    application_id: str,
+    fields: Optional[str] = Query(None, description="응답에 포함할 필드 (쉼표 구분)"),
+    user_data: dict = Depends(verify_token)
+):
     """특정 지원서를 반환합니다."""
+    field_list = _parse_fields(fields)
     try:
         uid = user_data['uid']
-        doc = get_db().collection('applications').document(application_id).get()
+        if field_list:
+            # 권한 확인용 필드는 항상 함께 읽음
+            doc = await get_document('applications', application_id, list(dict.fromkeys(field_list + APPLICATION_AUTH_FIELDS)))
+        else:
+            doc = await get_document('applications', application_id)
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Application not found")
 
-        app_data = doc.to_dict()
+        app_data = doc.to_dict() or {}
 
         # 소유자 또는 해당 JD 협업자인지 확인
-        is_authorized = app_data.get('recruiterId') == uid
-        if not is_authorized and app_data.get('jdId'):
-            jd_doc = get_db().collection('jds').document(app_data['jdId']).get()
-            if jd_doc.exists:
-                jd_data = jd_doc.to_dict()
-                is_authorized = uid in (jd_data.get('collaboratorIds') or [])
-        if not is_authorized:
+        if not await can_access_application(app_data, uid):
             raise HTTPException(status_code=403, detail="Not authorized")
 
-        app_data['applicationId'] = doc.id
-        
-        # ApplicationResponse 모델을 통해 자동 복호화
-        try:
-            print(f"🔄 Decrypting application {doc.id}...")
-            decrypted_app = ApplicationResponse(**app_data)
-            decrypted_data = decrypted_app.model_dump()
-            decrypted_data['id'] = doc.id
-            print(f"✅ Successfully processed application {doc.id}")
-            return decrypted_data
-        except Exception as e:
-            # 복호화 실패 시 상세 에러 로깅
-            print(f"❌ Failed to process application {doc.id}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            # 원본 데이터 반환 (backward compatibility)
-            app_data['id'] = doc.id
-            return app_data
+        return _serialize_application(doc.id, app_data, field_list)
     except HTTPException:
         raise
     except Exception as e:
@@ -400,7 +308,7 @@ async def update_application(application_id: str, application: ApplicationUpdate
     try:
         uid = user_data['uid']
         doc_ref = get_db().collection('applications').document(application_id)
-        doc = doc_ref.get()
+        doc = await get_document('applications', application_id)
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Application not found")
@@ -410,7 +318,7 @@ async def update_application(application_id: str, application: ApplicationUpdate
         # 소유자 또는 해당 JD 협업자인지 확인
         is_authorized = app_data.get('recruiterId') == uid
         if not is_authorized and app_data.get('jdId'):
-            jd_doc = get_db().collection('jds').document(app_data['jdId']).get()
+            jd_doc = await get_document('jds', app_data['jdId'])
             if jd_doc.exists:
                 jd_data = jd_doc.to_dict()
                 is_authorized = uid in (jd_data.get('collaboratorIds') or [])
@@ -434,7 +342,7 @@ async def delete_application(application_id: str, user_data: dict = Depends(veri
     """지원서를 삭제합니다."""
     try:
         doc_ref = get_db().collection('applications').document(application_id)
-        doc = doc_ref.get()
+        doc = await get_document('applications', application_id)
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Application not found")
@@ -444,6 +352,7 @@ async def delete_application(application_id: str, user_data: dict = Depends(veri
             raise HTTPException(status_code=403, detail="Not authorized")
 
         doc_ref.delete()
+        invalidate_jd_index(app_data.get('jdId'))
         return {"message": "Application deleted successfully"}
     except HTTPException:
         raise
@@ -456,14 +365,18 @@ async def save_analysis(application_id: str, request: SaveAnalysisRequest, user_
     """AI 분석 결과를 저장합니다."""
     try:
         doc_ref = get_db().collection('applications').document(application_id)
-        doc = doc_ref.get()
+        doc = await get_document('applications', application_id)
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Application not found")
 
-        doc_ref.update({
+        update_data = {
             'aiAnalysis': request.analysis,
             'aiAnalyzedAt': firebase_firestore.SERVER_TIMESTAMP
-        })
+        }
+        # 생성된 분석과 다른 내용을 저장하면 입력 해시 캐시를 무효화
+        if request.analysis != (doc.to_dict() or {}).get('aiAnalysis'):
+            update_data['aiAnalysisHash'] = firebase_firestore.DELETE_FIELD
+        doc_ref.update(update_data)
         return {"message": "Analysis saved successfully"}
     except HTTPException:
         raise
@@ -475,7 +388,7 @@ async def save_analysis(application_id: str, request: SaveAnalysisRequest, user_
 async def get_analysis(application_id: str, user_data: dict = Depends(verify_token)):
     """저장된 AI 분석 결과를 반환합니다."""
     try:
-        doc = get_db().collection('applications').document(application_id).get()
+        doc = await get_document('applications', application_id)
         if not doc.exists:
             raise HTTPException(status_code=404, detail="Application not found")
 
@@ -1,12 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException
 from firebase_admin import auth as firebase_auth, firestore as firebase_firestore
+from datetime import datetime, timezone
+from typing import Optional
 
-from config.firebase import get_db
+from config.firebase import get_db, get_document
 from dependencies.auth import verify_token
 from models.schemas import UserRegister
+from utils.cache import cache_namespace
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
+# 사용자 프로필 단기 캐시 (google-login 직후 /me 재조회 방지)
+_PROFILE_CACHE_TTL = 600
+# lastLoginAt은 1시간 단위로만 갱신 (로그인마다 쓰기 방지)
+_LOGIN_WRITE_INTERVAL = 3600
+
+_profile_cache = cache_namespace("user_profile", default_ttl=_PROFILE_CACHE_TTL)
+
+
+async def _load_profile(uid: str) -> Optional[dict]:
+    """캐시 또는 Firestore에서 users 문서를 조회 (없으면 None)"""
+    profile = _profile_cache.get(uid)
+    if profile is None:
+        user_doc = await get_document('users', uid)
+        if not user_doc.exists:
+            return None
+        profile = user_doc.to_dict()
+        _profile_cache.set(uid, profile)
+    return profile
+
+
+def _login_is_recent(last_login_at, now: datetime) -> bool:
+    if not hasattr(last_login_at, 'timestamp'):
+        return False
+    return now.timestamp() - last_login_at.timestamp() < _LOGIN_WRITE_INTERVAL
+
 
 @router.post("/register")
 async def register(user: UserRegister):
@@ -46,23 +74,30 @@ async def google_login(user_data: dict = Depends(verify_token)):
         picture = user_data.get('picture', '')
 
         user_ref = get_db().collection('users').document(uid)
-        user_doc = user_ref.get()
+        profile = await _load_profile(uid)
+        now = datetime.now(timezone.utc)
 
-        if not user_doc.exists:
+        if profile is None:
             # 신규 Google 사용자: Firestore 문서 생성
-            user_ref.set({
+            profile = {
                 'email': email,
                 'nickname': name,
                 'photoURL': picture,
                 'provider': 'google',
-                'createdAt': firebase_firestore.SERVER_TIMESTAMP
+            }
+            user_ref.set({
+                **profile,
+                'createdAt': firebase_firestore.SERVER_TIMESTAMP,
+                'lastLoginAt': firebase_firestore.SERVER_TIMESTAMP,
             })
-        else:
-            # 기존 사용자: 최근 로그인 시간 업데이트
+            _profile_cache.set(uid, {**profile, 'createdAt': now, 'lastLoginAt': now})
+        elif profile.get('photoURL') != picture or not _login_is_recent(profile.get('lastLoginAt'), now):
+            # 기존 사용자: 사진이 바뀌었거나 마지막 기록이 1시간 이상 지난 경우에만 업데이트
             user_ref.update({
                 'lastLoginAt': firebase_firestore.SERVER_TIMESTAMP,
                 'photoURL': picture,
             })
+            _profile_cache.set(uid, {**profile, 'lastLoginAt': now, 'photoURL': picture})
 
         return {
             "uid": uid,
@@ -78,9 +113,9 @@ async def google_login(user_data: dict = Depends(verify_token)):
 async def get_current_user(user_data: dict = Depends(verify_token)):
     """현재 로그인한 사용자 정보를 반환합니다."""
     try:
-        user_doc = get_db().collection('users').document(user_data['uid']).get()
-        if user_doc.exists:
-            return {"uid": user_data['uid'], **user_doc.to_dict()}
+        profile = await _load_profile(user_data['uid'])
+        if profile is not None:
+            return {"uid": user_data['uid'], **profile}
         return {"uid": user_data['uid'], "email": user_data.get('email')}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,30 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException
-import google.generativeai as genai
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import json
-import re
+from typing import Any, Optional, Tuple
 
 import os
+from config.gemini import CHAT_FALLBACK_MODEL, GeminiUnavailable, get_gemini_client
+from config.model_routing import fallback_for, route_chat
 from dependencies.auth import verify_token
-from models.schemas import GeminiChatRequest
+from dependencies.rate_limit import acquire_ai_slot, ai_admission
+from models.schemas import ChatSessionCreate, GeminiChatRequest, QueryApplicantsRequest, SemanticSearchRequest
+from services.access import require_jd_access
+from services.applicant_query import aggregate, answer_structured, answer_with_retrieval, load_jd_records
+from services.chat_history import compact_history, history_tokens
+from services.chat_sessions import append_turn, create_session, delete_session, get_session, session_view
+from services.search import get_jd_index
+from utils import json_patch
+from utils.json_stream import StreamingJSONParser
+from utils.metrics import get_llm_metrics, llm_call_context
 
 router = APIRouter(prefix="/api/gemini", tags=["Gemini AI"])
 
 
-@router.post("/chat")
-async def gemini_chat(request: GeminiChatRequest, user_data: dict = Depends(verify_token)):
-    """Gemini AI와 채팅하여 JD를 생성합니다."""
-    try:
-        GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-        if not GEMINI_API_KEY:
-            raise HTTPException(
-                status_code=500,
-                detail="Gemini API 키가 설정되지 않았습니다. 관리자에게 문의하세요."
-            )
-
-        jd_type = request.type or "club"
-
-        # ── 회사 모드 시스템 프롬프트 ──
-        company_system_instruction = """You are 'Winnow 채용 마스터', a specialist in corporate recruitment and hiring. Respond ONLY in pure JSON format.
+# ── 회사 모드 시스템 프롬프트 ──
+COMPANY_SYSTEM_INSTRUCTION = """You are 'Winnow 채용 마스터', a specialist in corporate recruitment and hiring. Respond ONLY in pure JSON format.
 
 CRITICAL: NO markdown code blocks! Never use ```json or ``` in your response.
 
@@ -115,8 +114,8 @@ CRITICAL - jdData PRESERVATION:
 - When user provides any info, ACCUMULATE it - never lose data from previous turns.
 """
 
-        # ── 동아리 모드 시스템 프롬프트 ──
-        club_system_instruction = """You are 'Winnow 채용 마스터', a specialist in university club and student organization recruitment. Respond ONLY in pure JSON format.
+# ── 동아리 모드 시스템 프롬프트 ──
+CLUB_SYSTEM_INSTRUCTION = """You are 'Winnow 채용 마스터', a specialist in university club and student organization recruitment. Respond ONLY in pure JSON format.
 
 CRITICAL: NO markdown code blocks! Never use ```json or ``` in your response.
 
@@ -220,70 +219,325 @@ CRITICAL - jdData PRESERVATION:
 - This is the MOST critical rule: previously gathered data must ALWAYS persist.
 """
 
-        system_instruction = company_system_instruction if jd_type == "company" else club_system_instruction
+# ── 변경분 응답 모드 (responseMode=patch) ──
+# 누적 jdData는 서버가 보관하므로 모델은 이번 턴에 바뀐 필드만 생성 (출력 토큰 절감)
+JD_DELTA_INSTRUCTION = """
 
-        # gemini-2.5-flash: 최신 고성능 모델 (gemini-2.0-flash-exp는 존재하지 않음)
-        model = genai.GenerativeModel(
-            'gemini-2.5-flash',
-            system_instruction=system_instruction,
-            generation_config={
-                "response_mime_type": "application/json"
-            }
+RESPONSE MODE - CHANGED FIELDS ONLY (this overrides the jdData PRESERVATION rules above):
+- The server keeps the accumulated jdData. Do NOT repeat previously filled fields.
+- Put in jdData ONLY the fields you add or change in this turn. Omit unchanged fields entirely.
+- For an array field you change, return the complete new array for that field.
+- If nothing changed, return "jdData":{}.
+"""
+
+
+def _ensure_api_key():
+    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+    if not GEMINI_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="Gemini API 키가 설정되지 않았습니다. 관리자에게 문의하세요."
         )
 
-        # 채팅 히스토리 변환
-        history = []
-        for msg in request.chatHistory:
-            role = msg.get("role", "user")
-            text = msg.get("text", "")
-            if text:
-                history.append({
-                    "role": "user" if role == "user" else "model",
-                    "parts": [text]
-                })
-
-        chat = model.start_chat(history=history)
-        response = chat.send_message(request.message)
-        
-        # AI 응답 파싱 (순수 JSON 형식 기대)
-        response_text = response.text.strip()
-        
-        # 디버깅: AI 응답 출력
-        print(f"📥 AI Response: {response_text[:500]}...")
-        
-        try:
-            # 마크다운 코드 블록 제거 (혹시 모를 경우 대비)
-            if response_text.startswith("```"):
-                response_text = re.sub(r'^```(?:json)?\s*|\s*```$', '', response_text, flags=re.MULTILINE).strip()
-            
-            # JSON 응답 파싱 시도
-            try:
-                parsed_response = json.loads(response_text)
-            except json.JSONDecodeError:
-                # JSON 파싱 실패 시 줄바꿈 문자 제거 후 재시도
-                print(f"⚠️ 첫 번째 JSON 파싱 실패, 줄바꿈 문자 정리 후 재시도...")
-                # 줄바꿈 문자를 공백으로 대체 후 재파싱 시도
-                cleaned_text = response_text.replace('\n', ' ').replace('\r', ' ')
-                parsed_response = json.loads(cleaned_text)
-            
-            return {
-                "aiResponse": parsed_response.get("aiResponse", response_text),
-                "options": parsed_response.get("options", []),
-                "multiSelect": parsed_response.get("multiSelect", False),
-                "jdData": parsed_response.get("jdData", {})
-            }
-        except json.JSONDecodeError as je:
-            # JSON 파싱 완전 실패
-            print(f"❌ JSON 파싱 완전 실패: {str(je)}")
-            print(f"⚠️ 원본 응답: {response_text[:1000]}...")
-            return {
-                "aiResponse": response_text,
-                "options": [],
-                "jdData": {}
-            }
+
+def _chat_model_options(request: GeminiChatRequest) -> dict:
+    """JD 타입에 맞는 시스템 프롬프트 + JSON 응답 설정 + 턴 복잡도에 따른 모델 선택"""
+    jd_type = request.type or "club"
+    system_instruction = COMPANY_SYSTEM_INSTRUCTION if jd_type == "company" else CLUB_SYSTEM_INSTRUCTION
+    if request.responseMode == "patch":
+        system_instruction += JD_DELTA_INSTRUCTION
+
+    # 초안 생성/긴 턴은 강한 모델, 짧은 답변·옵션 선택·후속 턴은 빠른 모델
+    route = route_chat(request.message, request.chatHistory)
+    return {
+        "model_name": route.model,
+        "system_instruction": system_instruction,
+        "generation_config": {
+            "response_mime_type": "application/json"
+        },
+        # 주 모델 장애(429/5xx 재시도 소진, 서킷 오픈) 시 다른 모델로 응답
+        "fallback_model": fallback_for(route, CHAT_FALLBACK_MODEL),
+    }
+
+
+def _build_history(request: GeminiChatRequest) -> list:
+    """채팅 히스토리 변환 (오래된 턴은 요약 + jdData 스냅샷으로 압축)"""
+    history = []
+    for msg in request.chatHistory:
+        role = msg.get("role", "user")
+        text = msg.get("text", "")
+        if text:
+            history.append({
+                "role": "user" if role == "user" else "model",
+                "parts": [text]
+            })
+
+    compacted = compact_history(history, request.jdData)
+    if compacted is not history:
+        print(f"🗜️ Chat history compacted: {len(history)} → {len(compacted)} messages, "
+              f"~{history_tokens(history)} → ~{history_tokens(compacted)} tokens")
+    return compacted
+
+
+async def _resume_session(request: GeminiChatRequest, uid: str) -> Tuple[GeminiChatRequest, Optional[dict]]:
+    """sessionId가 있으면 서버에 저장된 히스토리·jdData·타입으로 요청을 채움"""
+    if not request.sessionId:
+        return request, None
+    session = await get_session(request.sessionId, uid)
+    update = {'chatHistory': session['history']}
+    if request.jdData is None:
+        update['jdData'] = session.get('jdData')
+    if 'type' not in request.model_fields_set:
+        update['type'] = session.get('type')
+    return request.model_copy(update=update), session
+
+
+def _filled_fields(jd_data: Any) -> dict:
+    """빈 문자열/빈 배열은 '아직 안 채움'으로 보고 기존 값을 덮어쓰지 않음 (프론트엔드 병합 규칙과 동일)"""
+    if not isinstance(jd_data, dict):
+        return {}
+    return {k: v for k, v in jd_data.items() if v not in ("", [], {}, None)}
+
+
+async def _finish_chat_turn(session: Optional[dict], request: GeminiChatRequest, result: dict) -> dict:
+    """
+    세션 모드면 이번 턴을 세션에 추가하고 응답에 세션 정보를 포함.
+    responseMode=patch이면 jdData 대신 이전 상태 대비 RFC 6902 패치(jdPatch)를 반환.
+    이전 상태는 클라이언트가 보낸 jdData(직접 수정한 경우), 보내지 않았으면 서버 세션에 저장된 jdData.
+    """
+    if request.jdData is not None:
+        base = request.jdData
+    else:
+        base = (session or {}).get('jdData') or {}
+    changes = _filled_fields(result.get("jdData"))
+
+    if session is not None:
+        # 클라이언트가 직접 수정한 jdData가 있으면 그 위에, 없으면 저장된 jdData 위에 AI가 갱신한 필드를 반영
+        session['jdData'] = base
+        await append_turn(session, request.message, result.get("aiResponse", ""), changes)
+        result = {**result, "sessionId": session['id'], "historyLength": len(session['history'])}
+
+    if request.responseMode == "patch":
+        result = {k: v for k, v in result.items() if k != "jdData"}
+        result["jdPatch"] = json_patch.diff(base, {**base, **changes})
+    return result
+
+
+def _chat_result(parsed: Any, response_text: str) -> dict:
+    """파싱된 응답을 {aiResponse, options, multiSelect, jdData} 형식으로 정리 (객체가 아닌 jdData는 {}로 취급)"""
+    if not isinstance(parsed, dict):
+        return {
+            "aiResponse": response_text,
+            "options": [],
+            "jdData": {}
+        }
+    jd_data = parsed.get("jdData")
+    return {
+        "aiResponse": parsed.get("aiResponse", response_text),
+        "options": parsed.get("options", []),
+        "multiSelect": parsed.get("multiSelect", False),
+        "jdData": jd_data if isinstance(jd_data, dict) else {}
+    }
+
+
+def _finish_chat_parse(parser: StreamingJSONParser, response_text: str) -> dict:
+    """
+    증분 파서의 최종 결과 (전체 텍스트를 다시 파싱하지 않음).
+    코드 펜스·raw 줄바꿈·잘린 출력은 파서가 복구하고, 복구 여부는 파싱 재시도 지표로 기록합니다.
+    """
+    # 디버깅: AI 응답 출력
+    print(f"📥 AI Response: {response_text.strip()[:500]}...")
+
+    parsed = parser.finish()
+    if parsed is None:
+        # JSON 파싱 완전 실패
+        print(f"❌ JSON 파싱 완전 실패: JSON 객체를 찾을 수 없습니다")
+        get_llm_metrics().record_parse(failed=True)
+        print(f"⚠️ 원본 응답: {response_text.strip()[:1000]}...")
+    elif parser.repaired:
+        print(f"⚠️ 불완전한 JSON 응답을 복구했습니다")
+        get_llm_metrics().record_parse(retried=True)
+    return _chat_result(parsed, response_text.strip())
+
+
+def _parse_chat_response(response_text: str) -> dict:
+    """AI 응답 파싱 (순수 JSON 형식 기대)"""
+    parser = StreamingJSONParser()
+    parser.feed(response_text)
+    return _finish_chat_parse(parser, response_text)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat")
+async def gemini_chat(request: GeminiChatRequest, user_data: dict = Depends(ai_admission)):
+    """
+    Gemini AI와 채팅하여 JD를 생성합니다.
+    sessionId를 보내면 히스토리는 서버 세션에서 가져오므로 chatHistory는 보내지 않아도 됩니다.
+    """
+    try:
+        _ensure_api_key()
+        request, session = await _resume_session(request, user_data['uid'])
+
+        with llm_call_context("gemini_chat", user_data['uid']):
+            response = await get_gemini_client().send_message(
+                _build_history(request),
+                request.message,
+                **_chat_model_options(request),
+            )
+
+            result = _parse_chat_response(response.text)
+        return await _finish_chat_turn(session, request, result)
+    except (HTTPException, GeminiUnavailable):
+        raise
     except Exception as e:
         print(f"❌ Gemini Chat Error: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"AI 응답 생성 중 오류가 발생했습니다: {str(e)}"
         )
+
+
+@router.post("/chat/stream")
+async def gemini_chat_stream(request: GeminiChatRequest, user_data: dict = Depends(verify_token)):
+    """
+    /chat의 Server-Sent Events 버전.
+
+    - event: delta → {"text": "..."}  aiResponse 텍스트 증분
+    - event: field → {"field": "...", "value": ...}  완성된 jdData 필드 (도착하는 대로)
+    - event: done  → {aiResponse, options, multiSelect, jdData}  최종 결과
+                     (세션 모드면 sessionId, historyLength 포함 / patch 모드면 jdData 대신 jdPatch)
+    - event: error → {"detail": "..."}
+
+    의존성 종료는 스트림 전송 전에 실행되므로, 동시 실행 슬롯은 여기서 직접 확보하고 스트림이 끝나면 반환합니다.
+    """
+    _ensure_api_key()
+    request, session = await _resume_session(request, user_data['uid'])
+    slot = await acquire_ai_slot(user_data)
+
+    async def event_stream():
+        try:
+            with llm_call_context("gemini_chat_stream", user_data['uid']):
+                chunks = get_gemini_client().stream_message(
+                    _build_history(request),
+                    request.message,
+                    **_chat_model_options(request),
+                )
+
+                parser = StreamingJSONParser()
+                chunks_text = []
+                sent = 0
+                async for chunk in chunks:
+                    chunks_text.append(chunk)
+                    parser.feed(chunk)
+                    text = parser.string_at(("aiResponse",))
+                    if len(text) > sent:
+                        yield _sse("delta", {"text": text[sent:]})
+                        sent = len(text)
+                    for path in parser.pop_completed():
+                        if len(path) == 2 and path[0] == "jdData":
+                            yield _sse("field", {"field": path[1], "value": parser.get(path)})
+
+                result = _finish_chat_parse(parser, "".join(chunks_text))
+                yield _sse("done", await _finish_chat_turn(session, request, result))
+        except GeminiUnavailable as e:
+            print(f"⚠️ Gemini Chat Stream Unavailable: {str(e)}")
+            yield _sse("error", {
+                "detail": "AI 서비스가 일시적으로 혼잡합니다. 잠시 후 다시 시도해주세요.",
+                "retryAfter": e.retry_after,
+            })
+        except Exception as e:
+            print(f"❌ Gemini Chat Stream Error: {str(e)}")
+            yield _sse("error", {"detail": f"AI 응답 생성 중 오류가 발생했습니다: {str(e)}"})
+        finally:
+            slot.release()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # GZipMiddleware가 이벤트를 버퍼링하지 않도록 압축 제외
+            "Content-Encoding": "identity",
+        },
+        # 스트림이 시작되기 전에 연결이 끊긴 경우에도 슬롯 반환
+        background=BackgroundTask(slot.release),
+    )
+
+
+@router.post("/sessions")
+async def create_chat_session(request: ChatSessionCreate, user_data: dict = Depends(verify_token)):
+    """서버 채팅 세션 생성. 이후 /chat, /chat/stream에는 sessionId + message만 보내면 됩니다."""
+    session = await create_session(user_data['uid'], request.type, request.chatHistory, request.jdData)
+    return session_view(session, include_history=False)
+
+
+@router.get("/sessions/{session_id}")
+async def get_chat_session(session_id: str, user_data: dict = Depends(verify_token)):
+    """세션 조회 (대화 복원용)"""
+    return session_view(await get_session(session_id, user_data['uid']))
+
+
+@router.delete("/sessions/{session_id}")
+async def delete_chat_session(session_id: str, user_data: dict = Depends(verify_token)):
+    await delete_session(session_id, user_data['uid'])
+    return {"message": "Chat session deleted"}
+
+
+@router.post("/semantic-search")
+async def semantic_search(request: SemanticSearchRequest, user_data: dict = Depends(ai_admission)):
+    """
+    JD 지원자 답변에 대한 서버 측 시맨틱 검색 (해시 TF-IDF + 코사인 유사도).
+    지원자 데이터는 서버에서만 사용하고 응답에는 지원서 ID와 점수만 포함합니다.
+    """
+    try:
+        await require_jd_access(request.jdId, user_data['uid'])
+
+        index = await get_jd_index(request.jdId)
+        results = index.search(request.query, request.topK)
+        return {
+            "results": [{"applicationId": app_id, "score": score} for app_id, score in results],
+            "total": len(index),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Semantic Search Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}")
+
+
+@router.post("/query-applicants")
+async def query_applicants(request: QueryApplicantsRequest, user_data: dict = Depends(ai_admission)):
+    """
+    JD 지원자 데이터에 대한 대화형 질의.
+
+    - mode: aggregate → 인원/상태/학교/전공/스킬/성별 질문은 서버에서 집계해 바로 답변
+    - mode: retrieval → 자유 질문은 관련도 상위 topK명의 요약만 Gemini에 전달
+    """
+    try:
+        await require_jd_access(request.jdId, user_data['uid'])
+
+        records = await load_jd_records(request.jdId)
+        if not records:
+            return {"mode": "aggregate", "answer": "아직 지원자가 없습니다.", "applicationIds": []}
+
+        stats = aggregate(records)
+        result = answer_structured(request.question, records, stats)
+        if result is not None:
+            return {"mode": "aggregate", **result}
+
+        _ensure_api_key()
+        with llm_call_context("query_applicants", user_data['uid']):
+            result = await answer_with_retrieval(
+                request.jdId, request.question, stats, request.chatHistory, request.topK
+            )
+        return {"mode": "retrieval", **result}
+    except (HTTPException, GeminiUnavailable):
+        raise
+    except Exception as e:
+        print(f"❌ Query Applicants Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"AI 응답 생성 중 오류가 발생했습니다: {str(e)}")
+
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from firebase_admin import firestore as firebase_firestore
+import os
 import uuid
 from datetime import timedelta, datetime
 
-from config.firebase import get_db, get_bucket
+from config.firebase import get_db, get_document, get_bucket
 from dependencies.auth import verify_token
-from models.schemas import JDCreate, JDUpdate
+from models.schemas import JDCreate, JDUpdate, AnalyzeAllRequest
+from services.access import require_jd_access
+from services.analysis import submit_jd_batch_analysis
+from services.jobs import get_job_manager
+from utils.uploads import MAX_IMAGE_BYTES, spooled_upload
 
 router = APIRouter(prefix="/api/jds", tags=["JDs"])
 
@@ -92,7 +97,7 @@ async def get_jds(user_data: dict = Depends(verify_token)):
 async def get_jd(jd_id: str):
     """특정 JD를 반환합니다."""
     try:
-        doc = get_db().collection('jds').document(jd_id).get()
+        doc = await get_document('jds', jd_id)
         if not doc.exists:
             raise HTTPException(status_code=404, detail="JD not found")
         jd_data = doc.to_dict()
@@ -109,7 +114,7 @@ async def update_jd(jd_id: str, jd: JDUpdate, user_data: dict = Depends(verify_t
     """JD를 수정합니다."""
     try:
         doc_ref = get_db().collection('jds').document(jd_id)
-        doc = doc_ref.get()
+        doc = await get_document('jds', jd_id)
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="JD not found")
@@ -133,7 +138,7 @@ async def delete_jd(jd_id: str, user_data: dict = Depends(verify_token)):
     """JD를 삭제합니다."""
     try:
         doc_ref = get_db().collection('jds').document(jd_id)
-        doc = doc_ref.get()
+        doc = await get_document('jds', jd_id)
 
         if not doc.exists:
             raise HTTPException(status_code=404, detail="JD not found")
@@ -149,6 +154,56 @@ async def delete_jd(jd_id: str, user_data: dict = Depends(verify_token)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/{jd_id}/analyze-all")
+async def analyze_all_applicants(
+    jd_id: str,
+    request: AnalyzeAllRequest = AnalyzeAllRequest(),
+    user_data: dict = Depends(verify_token)
+):
+    """JD의 모든 지원자를 AI로 일괄 분석합니다 (백그라운드 실행, 진행 상황은 폴링)."""
+    try:
+        if not os.getenv("GEMINI_API_KEY"):
+            raise HTTPException(status_code=500, detail="Gemini API key not configured")
+
+        await require_jd_access(jd_id, user_data['uid'])
+
+        job_id = await submit_jd_batch_analysis(jd_id, user_data['uid'], request.force)
+        return {"jobId": job_id, "status": "queued", "message": "Batch analysis started"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{jd_id}/analyze-all/{job_id}")
+async def get_analyze_all_status(jd_id: str, job_id: str, user_data: dict = Depends(verify_token)):
+    """일괄 분석 진행 상황을 반환합니다."""
+    try:
+        job = await get_job_manager().get(job_id)
+        if not job or job.get('type') != 'analyze_jd' or (job.get('payload') or {}).get('jdId') != jd_id:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        if job.get('userId') != user_data['uid']:
+            await require_jd_access(jd_id, user_data['uid'])
+
+        progress = job.get('progress') or {}
+        return {
+            "jobId": job_id,
+            "jdId": jd_id,
+            "status": job.get('status'),
+            "total": progress.get('total', 0),
+            "completed": progress.get('completed', 0),
+            "cached": progress.get('cached', 0),
+            "failed": progress.get('failed', 0),
+            "errors": (job.get('result') or {}).get('errors', []),
+            "error": job.get('error'),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/upload-banner")
 async def upload_banner_image(
     file: UploadFile = File(...),
@@ -163,14 +218,6 @@ async def upload_banner_image(
                 detail="Only image files are allowed"
             )
         
-        # 파일 크기 제한 (5MB)
-        contents = await file.read()
-        if len(contents) > 5 * 1024 * 1024:
-            raise HTTPException(
-                status_code=400,
-                detail="File size must be less than 5MB"
-            )
-        
         # Firebase Storage 버킷 가져오기
         bucket = get_bucket()
         if not bucket:
@@ -183,16 +230,19 @@ async def upload_banner_image(
         file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
         unique_filename = f"jd-banners/{user_data['uid']}/{uuid.uuid4()}.{file_extension}"
         
-        # Firebase Storage에 업로드
-        blob = bucket.blob(unique_filename)
-        
-        # 메타데이터에 토큰 추가 (공개 액세스용)
-        blob.metadata = {"firebaseStorageDownloadTokens": str(uuid.uuid4())}
-        
-        blob.upload_from_string(
-            contents,
-            content_type=file.content_type
-        )
+        # 파일 크기 제한 (5MB, 스트리밍 중 초과 즉시 거절)
+        async with spooled_upload(file, MAX_IMAGE_BYTES, "File size must be less than 5MB") as upload:
+            # Firebase Storage에 업로드
+            blob = bucket.blob(unique_filename)
+
+            # 메타데이터에 토큰 추가 (공개 액세스용)
+            blob.metadata = {"firebaseStorageDownloadTokens": str(uuid.uuid4()), "sha256": upload.sha256}
+
+            blob.upload_from_file(
+                upload.file,
+                size=upload.size,
+                content_type=file.content_type
+            )
         
         # 공개 URL 생성 (토큰 포함)
         # Firebase Storage 공개 URL 형식
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from dependencies.auth import verify_token
+from services.jobs import get_job_manager
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+
+async def _get_own_job(job_id: str, uid: str) -> dict:
+    job = await get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.get('userId') != uid:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return job
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, user_data: dict = Depends(verify_token)):
+    """백그라운드 작업 상태 (status, progress, result, error)를 반환합니다."""
+    try:
+        job = await _get_own_job(job_id, user_data['uid'])
+        return {
+            "id": job['id'],
+            "type": job.get('type'),
+            "status": job.get('status'),
+            "progress": job.get('progress') or {},
+            "result": job.get('result'),
+            "error": job.get('error'),
+            "attempts": job.get('attempts', 0),
+            "createdAt": job.get('createdAt'),
+            "updatedAt": job.get('updatedAt'),
+            "finishedAt": job.get('finishedAt'),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str, user_data: dict = Depends(verify_token)):
+    """대기 중이거나 실행 중인 작업을 취소합니다."""
+    try:
+        await _get_own_job(job_id, user_data['uid'])
+        if not await get_job_manager().cancel(job_id):
+            raise HTTPException(status_code=409, detail="Job already finished")
+        return {"message": "Cancellation requested"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,49 @@
+import os
+
+from fastapi import APIRouter, Depends, Query
+
+from config.gemini import get_gemini_client
+from config.model_routing import routing_config
+from dependencies.auth import verify_token
+from dependencies.rate_limit import get_admission_controller
+from utils.metrics import get_llm_metrics
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+
+
+def _is_metrics_admin(uid: str) -> bool:
+    """METRICS_ADMIN_UIDS (쉼표 구분)에 포함된 사용자만 전체 사용자 집계 조회 가능"""
+    admins = {u.strip() for u in os.getenv("METRICS_ADMIN_UIDS", "").split(",") if u.strip()}
+    return uid in admins
+
+
+@router.get("/gemini")
+async def gemini_metrics(user_data: dict = Depends(verify_token)):
+    """
+    Gemini 호출 지표 (엔드포인트별).
+
+    호출 수, 결과별 횟수, 모델, 토큰(프롬프트/캐시/출력), JSON 파싱 재시도,
+    지연 시간·TTFT·토큰 히스토그램 (p50/p95 포함), 모델 라우팅 결정, AI 요청 동시 실행/대기/거절 현황.
+    전체 지표는 관리자만 조회 가능하며, 그 외 사용자는 본인의 일간 사용량만 받습니다.
+    """
+    uid = user_data['uid']
+    if not _is_metrics_admin(uid):
+        return get_llm_metrics().user_daily(uid)
+    return {
+        **get_llm_metrics().snapshot(),
+        "client": get_gemini_client().stats(),
+        "admission": get_admission_controller().stats(),
+        "routing": routing_config(),
+    }
+
+
+@router.get("/gemini/daily")
+async def gemini_daily_usage(
+    all_users: bool = Query(False, alias="all", description="전체 사용자 집계 (관리자만)"),
+    user_data: dict = Depends(verify_token),
+):
+    """사용자별 일간 Gemini 사용량 (기본: 본인)"""
+    uid = user_data['uid']
+    if all_users and _is_metrics_admin(uid):
+        return get_llm_metrics().user_daily()
+    return get_llm_metrics().user_daily(uid)
@@ -0,0 +1 @@
+# backend/services/__init__.py
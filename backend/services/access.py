@@ -0,0 +1,50 @@
+"""
+JD / application access checks shared by routes that expose per-JD data.
+"""
+from fastapi import HTTPException
+
+from config.firebase import get_document
+
+
+def has_jd_access(jd_data: dict, uid: str) -> bool:
+    """JD 소유자 또는 협업자인지 확인"""
+    return jd_data.get('userId') == uid or uid in (jd_data.get('collaboratorIds') or [])
+
+
+async def require_jd_access(jd_id: str, uid: str) -> dict:
+    """JD를 조회하고 접근 권한이 없으면 404/403을 발생시킵니다."""
+    doc = await get_document('jds', jd_id)
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail="JD not found")
+
+    jd_data = doc.to_dict()
+    if not has_jd_access(jd_data, uid):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return jd_data
+
+
+# 지원서 권한 확인에 필요한 필드
+APPLICATION_AUTH_FIELDS = ['recruiterId', 'jdId']
+
+
+async def can_access_application(app_data: dict, uid: str) -> bool:
+    """지원서 담당 리크루터이거나 해당 JD 협업자인지 확인"""
+    if app_data.get('recruiterId') == uid:
+        return True
+    if app_data.get('jdId'):
+        jd_doc = await get_document('jds', app_data['jdId'])
+        if jd_doc.exists:
+            return uid in (jd_doc.to_dict().get('collaboratorIds') or [])
+    return False
+
+
+async def require_application_access(app_id: str, uid: str) -> dict:
+    """지원서의 권한 필드만 조회해 접근 권한이 없으면 404/403을 발생시킵니다."""
+    doc = await get_document('applications', app_id, APPLICATION_AUTH_FIELDS)
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail="Application not found")
+
+    app_data = doc.to_dict() or {}
+    if not await can_access_application(app_data, uid):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return app_data
@@ -0,0 +1,323 @@
+"""
+Applicant AI analysis shared by the application and JD routes.
+Results are content-addressed: the hash of the decrypted prompt, the prompt
+version and the model name is stored next to the analysis and checked
+before any Gemini call.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+from firebase_admin import firestore as firebase_firestore
+
+from config.firebase import get_db, get_document
+from config.gemini import get_gemini_client
+from config.model_routing import route_task, task_model
+from models.schemas import ApplicationResponse
+from services.jobs import JobContext, PRIORITY_LOW, PRIORITY_NORMAL, get_job_manager, job_handler
+from utils.metrics import llm_call_context
+
+# 프롬프트를 수정하면 버전을 올려 저장된 분석이 재생성되도록 함
+ANALYSIS_PROMPT_VERSION = "1"
+ANALYSIS_MODEL = task_model("applicant_analysis")
+
+
+def build_analysis_prompt(applicant: dict) -> str:
+    """지원자 분석 프롬프트 생성"""
+    return f"""[시스템 역할]
+당신은 초기 스타트업의 생존을 결정짓는 전문 채용 컨설턴트입니다. 지원자의 답변에서 미사여구를 제거하고, 오직 [데이터, 방법론, 행동 패턴]만을 근거로 역량(Skill)과 의지(Will)를 냉정하게 판별합니다.
+
+[분석 원칙]
+- 냉정한 상/중/하: 수치와 구체적 방법론이 없으면 무조건 '중' 이하로 판정합니다.
+- 팩트 위주: 지원자의 답변을 짧게 인용(Quote)하여 평가의 객관성을 확보합니다.
+
+---
+
+🔍 지원자 분석 리포트: {applicant.get('applicantName', 'N/A')}
+
+---
+
+[0. 서류 지원 현황 및 프로필]
+
+지원 트랙 : {applicant.get('track', '') or '미기입'}
+
+전공 정보 : {applicant.get('major', '') or '미기입'}
+
+인적 사항 : {(str(applicant.get('grade', '')) + '학년') if applicant.get('grade') else '미기입'} / {(str(applicant.get('age', '')) + '세') if applicant.get('age') else '미기입'}{(' (' + applicant.get('applicantGender', '') + ')') if applicant.get('applicantGender') else ''}
+
+현재 상태 : {applicant.get('status', '') or '미기입'}
+
+---
+
+지원자 세부 정보:
+- 이메일: {applicant.get('applicantEmail', 'N/A')}
+- 전화번호: {applicant.get('applicantPhone', 'N/A')}
+- 공고: {applicant.get('jdTitle', 'N/A')}
+
+자격 요건 답변:
+{json.dumps(applicant.get('requirementAnswers', []), ensure_ascii=False, indent=2)}
+
+우대 사항 답변:
+{json.dumps(applicant.get('preferredAnswers', []), ensure_ascii=False, indent=2)}
+
+---
+
+위 정보를 바탕으로 아래 형식에 맞춰 분석 리포트를 작성하세요:
+
+[1. 종합 진단 결과]
+
+최종 분류 : [완성형 리더 / 직무 중심 전문가 / 성장형 유망주 / 신중 검토 대상]
+
+역량(Skill) 수준 : [높음 / 보통 / 낮음]
+
+의지(Will) 수준 : [높음 / 보통 / 낮음]
+
+---
+
+[2. 세부 역량 평가] (냉정 평가 모드)
+
+직무 역량 | [상 / 중 / 하]
+
+근거: " " (답변 발쵼)
+
+판정: (JD 기준 대비 실무 전문성 및 숙련도 분석)
+
+---
+
+문제 해결 | [상 / 중 / 하]
+
+근거: " " (답변 발쵼)
+
+판정: (장애물 돌파를 위한 논리적 사고 및 실행력 분석)
+
+---
+
+성장 잠재력 | [상 / 중 / 하]
+
+근거: " " (답변 발쵼)
+
+판정: (실제 학습 성과 및 팀 성장에 대한 기여 의지 분석)
+
+---
+
+협업 태도 | [상 / 중 / 하]
+
+근거: " " (답변 발쵼)
+
+판정: (전략적 협업 관점 및 목표 중심적 소통 능력 분석)
+
+---
+
+[3. 조직 적합도 (Culture Fit)]
+
+[ ] 스타트업 마인드셋 : [확인됨 / 미흡] (MVP 사고방식 및 리소스 제한 극복 경험)
+
+[ ] 자기 주도성 : [확인됨 / 미흡] (지시 대기 여부 및 스스로 과업 정의 능력)
+
+[ ] 커뮤니케이션 : [확인됨 / 미흡] (피드백 수용성 및 결론 중심의 논리력)
+
+---
+
+[4. 채용 가이드]
+
+💡 핵심 강점
+
+1.
+
+2.
+
+⚠️ 주의 사항 (Risk)
+
+(치명적인 결함 혹은 리스크 요소)
+
+(관리 시 유의해야 할 매니징 포인트)
+
+🙋 면접 질문 추천
+
+(답변의 허점을 짰르는 압박 질문)
+
+(실무 역량의 바닥을 확인하는 기술 질문)
+
+---
+
+[중요 지시 사항]
+
+가독성 최우선: 들여쓰기와 구분선(---)을 사용하여 섹션을 명확히 분리하세요.
+
+간결성: 각 항목은 2줄 이내로 핵심만 짰르듯 작성하세요.
+
+엄격함: 답변이 기준에 미달하면 가차 없이 '낮음' 또는 '미흡'으로 평가하세요.
+
+금지: 절대 JSON이나 코드 블록으로 답변을 감싸지 마세요."""
+
+
+def analysis_hash(prompt: str, model_name: str = ANALYSIS_MODEL) -> str:
+    """분석 입력(복호화된 프롬프트) + 프롬프트 버전 + 모델명으로 만든 콘텐츠 주소"""
+    key = f"{ANALYSIS_PROMPT_VERSION}\n{model_name}\n{prompt}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def decrypt_for_analysis(app_id: str, stored: dict) -> dict:
+    """원본 지원서 문서를 분석용으로 복호화 (실패 시 원본 사용)"""
+    app_data = dict(stored)
+    app_data['applicationId'] = app_id
+    app_data['id'] = app_id
+
+    # ApplicationResponse를 통해 복호화
+    try:
+        decrypted_app = ApplicationResponse(**app_data)
+        print(f"✅ Successfully decrypted application data for AI analysis")
+        return decrypted_app.model_dump()
+    except Exception as e:
+        print(f"⚠️ Failed to decrypt application for AI: {str(e)}")
+        # 실패 시 원본 데이터 사용
+        return app_data
+
+
+async def analyze_application_record(
+    app_id: str,
+    stored: dict,
+    force: bool = False,
+    limiter: Optional["RateLimiter"] = None,
+) -> dict:
+    """
+    이미 읽어 둔 지원서 문서를 분석합니다.
+    입력 해시가 저장된 aiAnalysisHash와 같으면 Gemini를 호출하지 않고 저장된 결과를 반환합니다.
+    """
+    applicant = decrypt_for_analysis(app_id, stored)
+    prompt = build_analysis_prompt(applicant)
+    content_hash = analysis_hash(prompt)
+
+    if not force and stored.get('aiAnalysis') and stored.get('aiAnalysisHash') == content_hash:
+        print(f"♻️ Reusing stored analysis for application {app_id}")
+        return {"analysis": stored['aiAnalysis'], "cached": True}
+
+    if limiter is not None:
+        await limiter.wait()
+    analysis = await get_gemini_client().generate_text(prompt, route_task("applicant_analysis").model)
+
+    await asyncio.to_thread(get_db().collection('applications').document(app_id).update, {
+        'aiAnalysis': analysis,
+        'aiAnalysisHash': content_hash,
+        'aiAnalysisModel': ANALYSIS_MODEL,
+        'aiAnalyzedAt': firebase_firestore.SERVER_TIMESTAMP
+    })
+    return {"analysis": analysis, "cached": False}
+
+
+async def analyze_stored_application(
+    app_id: str,
+    force: bool = False,
+    limiter: Optional["RateLimiter"] = None,
+) -> dict:
+    """DB에서 지원서를 읽어 분석 (저장된 결과 재사용)"""
+    print(f"🔄 Fetching and decrypting application {app_id} for AI analysis...")
+
+    doc = await get_document('applications', app_id)
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail="Application not found")
+
+    return await analyze_application_record(app_id, doc.to_dict(), force, limiter)
+
+
+async def analyze_applicant_data(applicant: dict) -> dict:
+    """DB에 없는 지원자 데이터를 그대로 분석 (저장하지 않음)"""
+    prompt = build_analysis_prompt(applicant)
+    analysis = await get_gemini_client().generate_text(prompt, route_task("applicant_analysis").model)
+    return {"analysis": analysis, "cached": False}
+
+
+# ==================== JD 일괄 분석 ====================
+class RateLimiter:
+    """호출 간격을 일정하게 벌려 분당 요청 수를 제한하는 비동기 리미터"""
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / max(per_minute, 1)
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+BATCH_CONCURRENCY = int(os.getenv("ANALYZE_ALL_CONCURRENCY", "4"))
+BATCH_REQUESTS_PER_MINUTE = int(os.getenv("ANALYZE_ALL_RPM", "60"))
+_MAX_REPORTED_ERRORS = 50
+
+# 모든 일괄 분석이 공유하는 Gemini 호출 속도 제한
+_batch_limiter = RateLimiter(BATCH_REQUESTS_PER_MINUTE)
+
+
+@job_handler("analyze_jd")
+async def _analyze_jd_job(ctx: JobContext) -> dict:
+    """JD의 모든 지원자 분석. 재시도 시 이미 끝난 지원자는 해시 캐시로 건너뜀"""
+    jd_id = ctx.payload['jdId']
+    force = ctx.payload.get('force', False)
+
+    # 지원서 일괄 조회 (한 번의 쿼리)
+    docs = await asyncio.to_thread(
+        lambda: list(get_db().collection('applications').where('jdId', '==', jd_id).stream())
+    )
+    progress = {'total': len(docs), 'completed': 0, 'cached': 0, 'failed': 0}
+    await ctx.report(progress, force=True)
+
+    errors = []
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def _worker(doc):
+        async with semaphore:
+            ctx.raise_if_cancelled()
+            try:
+                result = await analyze_application_record(doc.id, doc.to_dict() or {}, force, _batch_limiter)
+                if result['cached']:
+                    progress['cached'] += 1
+            except Exception as e:
+                print(f"❌ Batch analysis failed for {doc.id}: {str(e)}")
+                progress['failed'] += 1
+                if len(errors) < _MAX_REPORTED_ERRORS:
+                    errors.append({"applicationId": doc.id, "error": str(e)})
+            progress['completed'] += 1
+            await ctx.report(progress)
+
+    with llm_call_context("analyze_jd", ctx.user_id):
+        await asyncio.gather(*(_worker(doc) for doc in docs))
+    await ctx.report(progress, force=True)
+    return {'errors': errors}
+
+
+@job_handler("analyze_application")
+async def _analyze_application_job(ctx: JobContext) -> dict:
+    if ctx.payload.get('eager'):
+        # 제출 시 자동 분석: 일괄 분석과 같은 호출 속도 제한을 공유
+        with llm_call_context("eager_analysis", ctx.user_id):
+            return await analyze_stored_application(ctx.payload['applicationId'], limiter=_batch_limiter)
+    with llm_call_context("analyze_application", ctx.user_id):
+        return await analyze_stored_application(ctx.payload['applicationId'], ctx.payload.get('force', False))
+
+
+async def submit_jd_batch_analysis(jd_id: str, requested_by: str, force: bool = False) -> str:
+    """JD의 모든 지원자 분석 작업을 등록하고 job id를 반환"""
+    return await get_job_manager().submit('analyze_jd', {'jdId': jd_id, 'force': force}, requested_by)
+
+
+async def submit_application_analysis(app_id: str, requested_by: str, force: bool = False, priority: int = PRIORITY_NORMAL) -> str:
+    """단일 지원자 분석 작업을 등록하고 job id를 반환"""
+    return await get_job_manager().submit(
+        'analyze_application', {'applicationId': app_id, 'force': force}, requested_by, priority
+    )
+
+
+async def submit_eager_analysis(app_id: str, recruiter_id: Optional[str]) -> str:
+    """지원서 제출 직후 자동 분석 작업을 낮은 우선순위로 등록 (JD의 autoAnalyze 옵션)"""
+    return await get_job_manager().submit(
+        'analyze_application', {'applicationId': app_id, 'eager': True}, recruiter_id, PRIORITY_LOW
+    )
@@ -0,0 +1,236 @@
+"""
+Natural-language questions about a JD's applicants.
+Structured questions (counts, status, university, major, skills, gender) are
+answered by local aggregation over the decrypted records; everything else
+sends only the top-k search hits as compact snippets to Gemini.
+"""
+import asyncio
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from config.firebase import get_db, get_document
+from config.gemini import get_gemini_client
+from config.model_routing import route_task
+from models.schemas import decrypt_application_data
+from services.search import get_jd_index
+
+QUERY_TOP_K = 8
+_SNIPPET_ANSWER_CHARS = 200
+
+# 집계에 필요한 필드만 조회/복호화
+_AGGREGATE_FIELDS = ['status', 'university', 'major', 'selectedSkills', 'applicantGender', 'track']
+_DECRYPT_FIELDS = ['university', 'major']
+
+_COUNT_PATTERN = re.compile(r"몇\s*명|인원|총원|총\s*몇|수는|how many", re.IGNORECASE)
+_DISTRIBUTION_PATTERN = re.compile(r"분포|별로|별\s|통계|현황|비율|구성|가장\s*많은", re.IGNORECASE)
+
+# 차원 이름 → 질문 키워드
+_DIMENSIONS = {
+    'status': ('상태', '진행', '합격', '불합격', '검토', '서류'),
+    'university': ('대학', '학교', '출신'),
+    'major': ('전공', '학과'),
+    'skills': ('스킬', '기술', '역량', '스택'),
+    'gender': ('성별', '남자', '여자', '남성', '여성'),
+    'track': ('트랙', '분야', '직무'),
+}
+_DIMENSION_LABELS = {
+    'status': '상태', 'university': '학교', 'major': '전공',
+    'skills': '스킬', 'gender': '성별', 'track': '트랙',
+}
+
+QUERY_SYSTEM_INSTRUCTION = """당신은 채용 담당자를 돕는 지원자 데이터 분석 어시스턴트입니다.
+제공된 [전체 통계]와 [관련 지원자] 데이터만 근거로 한국어로 간결하게 답하세요.
+- 데이터에 없는 내용은 추측하지 말고 "제공된 데이터로는 알 수 없습니다"라고 답하세요.
+- 지원자를 언급할 때는 이름과 근거가 된 답변을 짧게 인용하세요.
+- [관련 지원자]는 질문과 관련도가 높은 일부 지원자만 포함되어 있으므로, 전체 인원에 대한 수치는 [전체 통계]를 사용하세요.
+- 마크다운 코드 블록이나 JSON으로 감싸지 마세요."""
+
+
+def _record_values(record: dict, dimension: str) -> List[str]:
+    """집계 차원별 값 목록 (스킬은 여러 개)"""
+    if dimension == 'skills':
+        skills = record.get('selectedSkills') or {}
+        values = []
+        if isinstance(skills, dict):
+            for items in skills.values():
+                values.extend(str(v) for v in (items if isinstance(items, list) else [items]) if v)
+        return values
+    key = {'gender': 'applicantGender'}.get(dimension, dimension)
+    value = record.get(key)
+    return [str(value).strip()] if value else []
+
+
+async def load_jd_records(jd_id: str) -> List[dict]:
+    """JD 지원서의 집계용 필드만 조회하고 필요한 필드만 복호화"""
+    docs = await asyncio.to_thread(
+        lambda: list(
+            get_db().collection('applications')
+            .where('jdId', '==', jd_id)
+            .select(_AGGREGATE_FIELDS)
+            .stream()
+        )
+    )
+    records = []
+    for doc in docs:
+        data = doc.to_dict() or {}
+        decrypt_application_data(data, fields=_DECRYPT_FIELDS)
+        data['id'] = doc.id
+        records.append(data)
+    return records
+
+
+def aggregate(records: List[dict]) -> Dict[str, Any]:
+    """전체 인원 + 차원별 분포"""
+    stats: Dict[str, Any] = {'total': len(records)}
+    for dimension in _DIMENSIONS:
+        counter: Counter = Counter()
+        for record in records:
+            counter.update(set(_record_values(record, dimension)))
+        stats[dimension] = dict(counter.most_common())
+    return stats
+
+
+def _detect_filters(question: str, stats: Dict[str, Any]) -> Dict[str, str]:
+    """질문에 실제 데이터 값(예: '서울대학교', 'React', '합격')이 등장하면 필터로 사용"""
+    normalized = question.lower().replace(" ", "")
+    filters = {}
+    for dimension in _DIMENSIONS:
+        # 긴 값부터 비교해 '불합격'이 '합격'으로 잘못 잡히지 않도록 함
+        for value in sorted(stats.get(dimension, {}), key=len, reverse=True):
+            if len(value) >= 2 and value.lower().replace(" ", "") in normalized:
+                filters[dimension] = value
+                break
+    return filters
+
+
+def _matches(record: dict, filters: Dict[str, str]) -> bool:
+    return all(value in _record_values(record, dimension) for dimension, value in filters.items())
+
+
+def _asked_dimension(question: str, filters: Dict[str, str]) -> Optional[str]:
+    """질문이 묻는 집계 차원 (필터로 이미 쓰인 차원은 제외)"""
+    for dimension, keywords in _DIMENSIONS.items():
+        if dimension not in filters and any(keyword in question for keyword in keywords):
+            return dimension
+    return None
+
+
+def _format_distribution(counts: Dict[str, int], limit: int = 10) -> str:
+    items = list(counts.items())[:limit]
+    return ", ".join(f"{value} {count}명" for value, count in items) if items else "데이터 없음"
+
+
+def answer_structured(question: str, records: List[dict], stats: Dict[str, Any]) -> Optional[dict]:
+    """
+    1단계: 집계로 답할 수 있는 질문이면 로컬에서 답변 (Gemini 호출 없음).
+    답할 수 없으면 None.
+    """
+    filters = _detect_filters(question, stats)
+    dimension = _asked_dimension(question, filters)
+
+    if _DISTRIBUTION_PATTERN.search(question) and dimension:
+        matched = [r for r in records if _matches(r, filters)]
+        counts = aggregate(matched)[dimension]
+        scope = " / ".join(filters.values())
+        prefix = f"{scope} 지원자 {len(matched)}명의 " if scope else f"전체 지원자 {len(matched)}명의 "
+        return {
+            "answer": f"{prefix}{_DIMENSION_LABELS[dimension]}별 분포: {_format_distribution(counts)}",
+            "applicationIds": [r['id'] for r in matched],
+            "aggregation": {dimension: counts},
+        }
+
+    if _COUNT_PATTERN.search(question):
+        matched = [r for r in records if _matches(r, filters)]
+        scope = " / ".join(filters.values())
+        answer = f"{scope} 지원자는 {len(matched)}명입니다." if scope else f"전체 지원자는 {len(matched)}명입니다."
+        if not scope and dimension:
+            answer += f" ({_DIMENSION_LABELS[dimension]}별: {_format_distribution(stats[dimension])})"
+        return {
+            "answer": answer,
+            "applicationIds": [r['id'] for r in matched],
+            "aggregation": {"count": len(matched), "filters": filters},
+        }
+
+    return None
+
+
+def _clip(text: Any, limit: int) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _snippet(app_id: str, data: dict) -> dict:
+    """Gemini에 보낼 지원자 요약 (연락처/생년월일 제외)"""
+    answers = []
+    for key in ('requirementAnswers', 'preferredAnswers'):
+        for answer in data.get(key) or []:
+            if isinstance(answer, dict) and (answer.get('detail') or answer.get('checked')):
+                answers.append({
+                    "q": _clip(answer.get('question'), 60),
+                    "checked": bool(answer.get('checked')),
+                    "detail": _clip(answer.get('detail'), _SNIPPET_ANSWER_CHARS),
+                })
+    custom = data.get('customAnswers') or {}
+    return {
+        "id": app_id,
+        "name": data.get('applicantName'),
+        "status": data.get('status'),
+        "university": data.get('university'),
+        "major": data.get('major'),
+        "skills": _record_values(data, 'skills'),
+        "answers": answers,
+        "customAnswers": [_clip(v, _SNIPPET_ANSWER_CHARS) for v in custom.values() if v] if isinstance(custom, dict) else [],
+    }
+
+
+async def _load_snippets(app_ids: List[str]) -> List[dict]:
+    docs = await asyncio.gather(*(get_document('applications', app_id) for app_id in app_ids))
+    snippets = []
+    for app_id, doc in zip(app_ids, docs):
+        if doc.exists:
+            data = doc.to_dict()
+            decrypt_application_data(data, fields=['applicantName', 'university', 'major'])
+            snippets.append(_snippet(app_id, data))
+    return snippets
+
+
+def _history_text(chat_history: List[Dict[str, Any]], limit: int = 6) -> str:
+    lines = []
+    for msg in chat_history[-limit:]:
+        text = _clip(msg.get("text", ""), 300)
+        if text:
+            lines.append(f"{'사용자' if msg.get('role') == 'user' else 'AI'}: {text}")
+    return "\n".join(lines)
+
+
+async def answer_with_retrieval(
+    jd_id: str,
+    question: str,
+    stats: Dict[str, Any],
+    chat_history: Optional[List[Dict[str, Any]]] = None,
+    top_k: int = QUERY_TOP_K,
+) -> dict:
+    """2단계: 관련도 상위 k명의 요약만 Gemini에 전달해 자유 질문에 답변"""
+    index = await get_jd_index(jd_id)
+    hits = index.search(question, top_k)
+    snippets = await _load_snippets([app_id for app_id, _ in hits])
+
+    summary = {k: v for k, v in stats.items() if k == 'total' or v}
+    prompt = "\n\n".join(filter(None, [
+        f"[이전 대화]\n{_history_text(chat_history)}" if chat_history else "",
+        f"[전체 통계]\n{json.dumps(summary, ensure_ascii=False)}",
+        f"[관련 지원자] (관련도 상위 {len(snippets)}명)\n{json.dumps(snippets, ensure_ascii=False)}",
+        f"[질문]\n{question}",
+    ]))
+
+    answer = await get_gemini_client().generate_text(
+        prompt,
+        route_task("applicant_query").model,
+        system_instruction=QUERY_SYSTEM_INSTRUCTION,
+    )
+    return {
+        "answer": answer.strip(),
+        "applicationIds": [s['id'] for s in snippets],
+    }
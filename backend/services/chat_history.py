@@ -0,0 +1,138 @@
+"""
+Token-budgeted chat history compaction for the JD builder chat.
+The last N turns are replayed verbatim; older turns are folded into one
+context turn holding a short extractive summary and the current jdData
+snapshot, which already carries everything the conversation has collected.
+"""
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+# 원문 그대로 유지할 최근 턴 수 (1턴 = 사용자 메시지 + 모델 응답)
+CHAT_KEEP_TURNS = int(os.getenv("GEMINI_CHAT_KEEP_TURNS", "4"))
+# 히스토리 전체 추정 토큰 상한
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("GEMINI_CHAT_HISTORY_TOKEN_BUDGET", "4000"))
+
+_SUMMARY_QUESTION_CHARS = 80
+_SUMMARY_ANSWER_CHARS = 160
+_SUMMARY_HEADER = "[이전 대화 요약] 아래는 앞선 대화에서 주고받은 질문과 답변입니다. 이미 답한 내용은 다시 묻지 마세요."
+_SNAPSHOT_MESSAGE = "지금까지의 대화 내용을 확인했습니다. 현재까지 정리된 공고 데이터를 유지하며 이어서 진행하겠습니다."
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    로컬 토큰 추정치 (UTF-8 4바이트 ≈ 1토큰).
+    영문은 약 4자, 한글은 약 1.3자당 1토큰으로 계산되어 Gemini 토크나이저보다 약간 넉넉합니다.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text.encode('utf-8')) / 4)
+
+
+def history_tokens(history: List[Dict[str, Any]]) -> int:
+    return sum(estimate_tokens(part) for msg in history for part in msg.get("parts", []))
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _summarize(messages: List[Dict[str, Any]]) -> List[str]:
+    """오래된 메시지를 '질문 → 답변' 한 줄씩으로 요약 (LLM 호출 없음)"""
+    lines = []
+    question = ""
+    for msg in messages:
+        text = msg["parts"][0]
+        if msg["role"] == "model":
+            question = _clip(text, _SUMMARY_QUESTION_CHARS)
+        else:
+            answer = _clip(text, _SUMMARY_ANSWER_CHARS)
+            lines.append(f"- Q: {question} → A: {answer}" if question else f"- A: {answer}")
+            question = ""
+    return lines
+
+
+def _history_jd_data(messages: List[Dict[str, Any]]) -> Optional[dict]:
+    """
+    요청에 jdData가 없을 때: 압축되는 모델 응답(JSON)의 jdData를 순서대로 병합해 스냅샷으로 사용.
+    빈 값은 덮어쓰지 않으며(프론트엔드 병합 규칙과 동일), jdData가 하나도 없으면 None.
+    """
+    merged = None
+    for msg in messages:
+        if msg["role"] != "model":
+            continue
+        try:
+            parsed = json.loads(msg["parts"][0])
+        except (TypeError, ValueError):
+            continue
+        jd_data = parsed.get("jdData") if isinstance(parsed, dict) else None
+        if isinstance(jd_data, dict):
+            merged = merged if merged is not None else {}
+            merged.update({k: v for k, v in jd_data.items() if v not in ("", [], {}, None)})
+    return merged
+
+
+def _context_turn(summary_lines: List[str], jd_data: Optional[dict]) -> List[Dict[str, Any]]:
+    """요약(user) + jdData 스냅샷(model) 한 쌍. 모델 응답 형식(JSON)을 그대로 따름"""
+    snapshot = json.dumps({
+        "aiResponse": _SNAPSHOT_MESSAGE,
+        "options": [],
+        "multiSelect": False,
+        "jdData": jd_data,
+    }, ensure_ascii=False)
+    summary = "\n".join([_SUMMARY_HEADER, *summary_lines]) if summary_lines else _SUMMARY_HEADER
+    return [
+        {"role": "user", "parts": [summary]},
+        {"role": "model", "parts": [snapshot]},
+    ]
+
+
+def compact_history(
+    history: List[Dict[str, Any]],
+    jd_data: Optional[dict] = None,
+    keep_turns: Optional[int] = None,
+    token_budget: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Gemini 형식 히스토리({role, parts})를 압축합니다.
+
+    - 최근 keep_turns 턴은 원문 유지
+    - 그 이전 메시지는 요약 + 현재 jdData 스냅샷으로 대체
+      (jd_data가 None이면 압축되는 모델 응답의 jdData로 스냅샷을 만들고,
+      그것도 없으면 수집된 정보가 사라지지 않도록 압축하지 않음)
+    - 추정 토큰이 token_budget을 넘으면 원문 턴을 하나씩 요약으로 넘기고,
+      요약은 남은 예산 안에서 최근 줄부터 유지
+    """
+    keep_turns = CHAT_KEEP_TURNS if keep_turns is None else keep_turns
+    token_budget = CHAT_HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+
+    if history_tokens(history) <= token_budget and len(history) <= keep_turns * 2:
+        return history
+
+    # 유지 구간은 사용자 메시지로 시작해야 user/model 교대가 유지됨
+    split = max(len(history) - keep_turns * 2, 0)
+    while split < len(history) and history[split]["role"] != "user":
+        split += 1
+
+    def snapshot(split_at: int) -> Optional[dict]:
+        return jd_data if jd_data is not None else _history_jd_data(history[:split_at])
+
+    # 스냅샷 + 원문 턴이 예산을 넘으면 가장 오래된 원문 턴(사용자 + 모델 응답)을 요약 쪽으로 이동
+    while split < len(history) and history_tokens(_context_turn([], snapshot(split)) + history[split:]) > token_budget:
+        split += 1
+        while split < len(history) and history[split]["role"] != "user":
+            split += 1
+
+    jd_snapshot = snapshot(split)
+    if jd_snapshot is None:
+        return history
+
+    # 남은 예산만큼 최근 요약 줄부터 채움
+    recent = history[split:]
+    summary_lines = _summarize(history[:split])
+    while summary_lines and history_tokens(_context_turn(summary_lines, jd_snapshot) + recent) > token_budget:
+        summary_lines = summary_lines[1:]
+
+    return _context_turn(summary_lines, jd_snapshot) + recent
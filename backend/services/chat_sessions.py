@@ -0,0 +1,137 @@
+"""
+Server-held JD builder chat sessions.
+A session keeps the conversation history and the current jdData so clients
+send only `sessionId` + `message` per turn. Sessions live in the shared
+bounded in-memory cache and are written through to the `chatSessions`
+collection, so they survive restarts and cache evictions.
+
+Firestore에서 `expiresAt` 필드에 TTL 정책을 설정하면 만료된 세션 문서가 자동 삭제됩니다.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from config.firebase import get_db, get_document
+from utils.cache import cache_namespace
+
+# 마지막 턴 이후 세션 유지 시간 (초)
+CHAT_SESSION_TTL = int(os.getenv("CHAT_SESSION_TTL", "86400"))
+# 세션에 보관할 최대 메시지 수 (오래된 메시지는 jdData 스냅샷이 대신함)
+CHAT_SESSION_MAX_MESSAGES = int(os.getenv("CHAT_SESSION_MAX_MESSAGES", "200"))
+
+_COLLECTION = 'chatSessions'
+_sessions = cache_namespace("chat_sessions", default_ttl=CHAT_SESSION_TTL)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _normalize_history(history: Optional[List[Dict[str, Any]]]) -> List[Dict[str, str]]:
+    """클라이언트 히스토리({role, text})에서 필요한 필드만 보관"""
+    messages = []
+    for msg in history or []:
+        messages.append({
+            "role": "user" if msg.get("role") == "user" else "model",
+            "text": str(msg.get("text", "")),
+        })
+    return messages[-CHAT_SESSION_MAX_MESSAGES:]
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    # Firestore는 DatetimeWithNanoseconds(datetime 하위 클래스)로 반환
+    return value if isinstance(value, datetime) else None
+
+
+async def _save(session: dict):
+    """메모리 캐시 갱신 + Firestore 기록 (캐시 크기는 set 시점에 다시 계산됨)"""
+    _sessions.set(session['id'], session)
+    data = {k: v for k, v in session.items() if k != 'id'}
+    await asyncio.to_thread(get_db().collection(_COLLECTION).document(session['id']).set, data)
+
+
+async def create_session(
+    user_id: str,
+    jd_type: Optional[str] = "club",
+    history: Optional[List[Dict[str, Any]]] = None,
+    jd_data: Optional[Dict[str, Any]] = None,
+) -> dict:
+    """새 세션 생성 (기존 대화를 이어받을 경우 history로 시작)"""
+    now = _now()
+    session = {
+        'id': uuid.uuid4().hex,
+        'userId': user_id,
+        'type': jd_type or "club",
+        'history': _normalize_history(history),
+        'jdData': jd_data or {},
+        'createdAt': now,
+        'updatedAt': now,
+        'expiresAt': now + timedelta(seconds=CHAT_SESSION_TTL),
+    }
+    await _save(session)
+    return session
+
+
+async def get_session(session_id: str, user_id: str) -> dict:
+    """세션 조회 (캐시 → Firestore). 없거나 만료되면 404, 다른 사용자의 세션이면 403"""
+    session = _sessions.get(session_id)
+    if session is None:
+        doc = await get_document(_COLLECTION, session_id)
+        if not doc.exists:
+            raise HTTPException(status_code=404, detail="Chat session not found")
+        session = {'id': session_id, **doc.to_dict()}
+
+    expires_at = _as_datetime(session.get('expiresAt'))
+    if expires_at is not None and expires_at <= _now():
+        _sessions.delete(session_id)
+        raise HTTPException(status_code=404, detail="Chat session expired")
+    if session.get('userId') != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    _sessions.set(session_id, session)
+    return session
+
+
+async def append_turn(
+    session: dict,
+    user_message: str,
+    ai_message: str,
+    jd_data: Optional[Dict[str, Any]] = None,
+) -> dict:
+    """한 턴(사용자 메시지 + AI 응답)을 추가하고 jdData를 갱신, 만료 시간을 연장"""
+    now = _now()
+    history = session['history'] + [
+        {"role": "user", "text": user_message},
+        {"role": "model", "text": ai_message},
+    ]
+    session['history'] = history[-CHAT_SESSION_MAX_MESSAGES:]
+    if jd_data:
+        session['jdData'] = {**(session.get('jdData') or {}), **jd_data}
+    session['updatedAt'] = now
+    session['expiresAt'] = now + timedelta(seconds=CHAT_SESSION_TTL)
+    await _save(session)
+    return session
+
+
+async def delete_session(session_id: str, user_id: str):
+    await get_session(session_id, user_id)
+    _sessions.delete(session_id)
+    await asyncio.to_thread(get_db().collection(_COLLECTION).document(session_id).delete)
+
+
+def session_view(session: dict, include_history: bool = True) -> dict:
+    """API 응답 형식"""
+    view = {
+        "sessionId": session['id'],
+        "type": session.get('type'),
+        "jdData": session.get('jdData') or {},
+        "historyLength": len(session.get('history') or []),
+        "expiresAt": session['expiresAt'].isoformat() if _as_datetime(session.get('expiresAt')) else None,
+    }
+    if include_history:
+        view["history"] = session.get('history') or []
+    return view
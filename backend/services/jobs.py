@@ -0,0 +1,446 @@
+"""
+In-process background jobs.
+Jobs are persisted in the Firestore `jobs` collection (status, progress,
+result, error) and executed by an asyncio worker pool, so handlers can
+return a job id immediately and the work survives client disconnects.
+
+Usage:
+    from services.jobs import job_handler, get_job_manager
+
+    @job_handler("analyze_application")
+    async def _analyze(ctx: JobContext):
+        await ctx.report({"step": "generating"})
+        return {"analysis": "..."}
+
+    job_id = await get_job_manager().submit("analyze_application", {"applicationId": app_id}, uid)
+"""
+import asyncio
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from firebase_admin import firestore as firebase_firestore
+from google.api_core import exceptions as google_exceptions
+
+from config.firebase import get_db, get_document
+
+# 우선순위 (작을수록 먼저 실행)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+JOB_STATUSES_ACTIVE = ('queued', 'running')
+
+_COLLECTION = 'jobs'
+_PROGRESS_WRITE_INTERVAL = 1.0   # 진행 상황 Firestore 기록 최소 간격 (초)
+
+
+class JobCancelled(Exception):
+    """작업이 취소 요청됨"""
+
+
+class JobContext:
+    """핸들러에 전달되는 작업 정보 및 진행 보고 인터페이스"""
+
+    def __init__(self, manager: "JobManager", job_id: str, job: dict):
+        self.manager = manager
+        self.job_id = job_id
+        self.payload: dict = job.get('payload') or {}
+        self.user_id: Optional[str] = job.get('userId')
+        self.attempt: int = job.get('attempts', 0)
+        self.progress: dict = dict(job.get('progress') or {})
+        self._last_write = 0.0
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self.job_id in self.manager._cancel_requested
+
+    def raise_if_cancelled(self):
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    async def report(self, progress: Optional[dict] = None, force: bool = False):
+        """진행 상황 갱신 (Firestore 쓰기는 최대 초당 1회로 제한)"""
+        if progress:
+            self.progress.update(progress)
+        now = time.monotonic()
+        if force or now - self._last_write >= _PROGRESS_WRITE_INTERVAL:
+            self._last_write = now
+            await self.manager._update(self.job_id, {'progress': self.progress})
+
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+
+
+class _Registration:
+    def __init__(self, handler: JobHandler, max_attempts: int):
+        self.handler = handler
+        self.max_attempts = max_attempts
+
+
+class JobManager:
+    """
+    Firestore-backed asyncio job queue.
+
+    - 우선순위 큐 + 고정 크기 워커 풀
+    - 낮은 우선순위 작업은 동시에 low_priority_limit 개까지만 실행 (나머지 워커는 대화형 작업용으로 남김)
+    - 실패 시 지수 백오프 재시도 (max_attempts)
+    - 취소 요청 (대기 중이면 즉시, 실행 중이면 태스크 취소)
+    - 시작 시 미완료 작업 복구, 종료 시 실행 중인 작업 완료 대기
+    - 실행 전 queued → running 전환을 last_update_time 조건부 쓰기로 선점하므로,
+      같은 작업이 큐에 두 번 들어가거나 여러 인스턴스가 복구해도 한 번만 실행
+    - 실행 중에는 lease_seconds / 3 간격으로 updatedAt을 갱신(하트비트)해 임대가 만료되지 않게 함
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        base_backoff: float = 2.0,
+        lease_seconds: int = 300,
+        low_priority_limit: int = 1,
+    ):
+        self.workers = workers
+        self.low_priority_limit = max(1, min(low_priority_limit, workers))
+        self.base_backoff = base_backoff
+        self.lease_seconds = lease_seconds
+
+        self._handlers: Dict[str, _Registration] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._worker_tasks: list = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: set = set()
+        self._retry_tasks: set = set()
+        self._busy = 0
+        self._low_busy = 0
+        self._parked: list = []   # 한도 초과로 보류된 낮은 우선순위 작업
+        self._accepting = False
+
+    # ---------- 등록 ----------
+    def register(self, job_type: str, handler: JobHandler, max_attempts: int = 3):
+        self._handlers[job_type] = _Registration(handler, max_attempts)
+
+    # ---------- Firestore ----------
+    async def _update(self, job_id: str, data: dict):
+        data = {**data, 'updatedAt': firebase_firestore.SERVER_TIMESTAMP}
+        await asyncio.to_thread(get_db().collection(_COLLECTION).document(job_id).update, data)
+
+    @staticmethod
+    def _update_if_unchanged(snapshot, data: dict) -> bool:
+        """스냅샷을 읽은 뒤 문서가 바뀌지 않았을 때만 쓰기 (다른 워커/인스턴스가 먼저 바꿨으면 False)"""
+        db = get_db()
+        try:
+            snapshot.reference.update(
+                {**data, 'updatedAt': firebase_firestore.SERVER_TIMESTAMP},
+                option=db.write_option(last_update_time=snapshot.update_time),
+            )
+            return True
+        except (google_exceptions.FailedPrecondition, google_exceptions.NotFound):
+            return False
+
+    async def _claim(self, job_id: str) -> Optional[dict]:
+        """queued 상태인 작업을 running으로 선점. 이미 선점됐거나 끝난 작업이면 None"""
+        def _claim_sync():
+            snapshot = get_db().collection(_COLLECTION).document(job_id).get()
+            if not snapshot.exists:
+                return None
+            job = snapshot.to_dict()
+            if job.get('status') != 'queued':
+                return None
+            job['attempts'] = job.get('attempts', 0) + 1
+            claimed = self._update_if_unchanged(snapshot, {
+                'status': 'running',
+                'attempts': job['attempts'],
+                'startedAt': firebase_firestore.SERVER_TIMESTAMP,
+            })
+            return job if claimed else None
+
+        return await asyncio.to_thread(_claim_sync)
+
+    async def _heartbeat(self, job_id: str):
+        """실행 중 임대 연장 (긴 Gemini 호출 중에도 _recover가 회수하지 않도록)"""
+        interval = self.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._update(job_id, {})
+            except Exception as e:
+                print(f"⚠️ Job heartbeat failed ({job_id}): {str(e)}")
+
+    # ---------- 제출 / 조회 / 취소 ----------
+    async def submit(
+        self,
+        job_type: str,
+        payload: dict,
+        user_id: Optional[str] = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> str:
+        """작업을 저장하고 큐에 넣은 뒤 바로 job id를 반환"""
+        registration = self._handlers.get(job_type)
+        if registration is None:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        doc_ref = get_db().collection(_COLLECTION).document()
+        await asyncio.to_thread(doc_ref.set, {
+            'type': job_type,
+            'payload': payload,
+            'userId': user_id,
+            'priority': priority,
+            'status': 'queued',
+            'progress': {},
+            'result': None,
+            'error': None,
+            'attempts': 0,
+            'maxAttempts': registration.max_attempts,
+            'cancelRequested': False,
+            'createdAt': firebase_firestore.SERVER_TIMESTAMP,
+            'updatedAt': firebase_firestore.SERVER_TIMESTAMP,
+            'startedAt': None,
+            'finishedAt': None,
+        })
+        self._enqueue(doc_ref.id, priority)
+        return doc_ref.id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        doc = await get_document(_COLLECTION, job_id)
+        if not doc.exists:
+            return None
+        job = doc.to_dict()
+        job['id'] = doc.id
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """취소 요청. 이미 끝난 작업이면 False"""
+        job = await self.get(job_id)
+        if job is None or job.get('status') not in JOB_STATUSES_ACTIVE:
+            return False
+
+        self._cancel_requested.add(job_id)
+        await self._update(job_id, {'cancelRequested': True})
+
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        elif job.get('status') == 'queued':
+            await self._update(job_id, {
+                'status': 'cancelled',
+                'finishedAt': firebase_firestore.SERVER_TIMESTAMP,
+            })
+        return True
+
+    # ---------- 큐 ----------
+    def _enqueue(self, job_id: str, priority: int, delay: float = 0):
+        if self._queue is None:
+            # 워커 시작 전 제출된 작업은 start()의 복구 단계에서 다시 읽힘
+            return
+        if delay <= 0:
+            self._queue.put_nowait((priority, next(self._seq), job_id))
+            return
+
+        async def _delayed():
+            await asyncio.sleep(delay)
+            if self._accepting:
+                self._queue.put_nowait((priority, next(self._seq), job_id))
+
+        task = asyncio.create_task(_delayed())
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+    async def _worker_loop(self):
+        while True:
+            item = await self._queue.get()
+            priority, _, job_id = item
+            if not self._accepting:
+                # 종료 중: 대기 작업은 Firestore에 queued로 남겨 다음 시작 시 복구
+                continue
+            low = priority >= PRIORITY_LOW
+            if low and self._low_busy >= self.low_priority_limit:
+                # 낮은 우선순위 실행 슬롯이 꽉 참 → 하나가 끝날 때 다시 큐에 넣음
+                self._parked.append(item)
+                continue
+            self._busy += 1
+            if low:
+                self._low_busy += 1
+            try:
+                await self._execute(job_id)
+            except Exception as e:
+                print(f"❌ Job worker error ({job_id}): {str(e)}")
+            finally:
+                self._busy -= 1
+                if low:
+                    self._low_busy -= 1
+                    if self._parked and self._queue is not None:
+                        self._queue.put_nowait(self._parked.pop(0))
+
+    async def _execute(self, job_id: str):
+        job = await self._claim(job_id)
+        if job is None:
+            return
+        if job.get('cancelRequested') or job_id in self._cancel_requested:
+            await self._update(job_id, {'status': 'cancelled', 'finishedAt': firebase_firestore.SERVER_TIMESTAMP})
+            self._cancel_requested.discard(job_id)
+            return
+
+        registration = self._handlers.get(job.get('type'))
+        if registration is None:
+            await self._update(job_id, {
+                'status': 'failed',
+                'error': f"Unknown job type: {job.get('type')}",
+                'finishedAt': firebase_firestore.SERVER_TIMESTAMP,
+            })
+            return
+
+        attempts = job['attempts']
+        ctx = JobContext(self, job_id, job)
+        task = asyncio.create_task(registration.handler(ctx))
+        self._running[job_id] = task
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await task
+        except (asyncio.CancelledError, JobCancelled):
+            if job_id in self._cancel_requested:
+                self._cancel_requested.discard(job_id)
+                await self._update(job_id, {
+                    'status': 'cancelled',
+                    'progress': ctx.progress,
+                    'finishedAt': firebase_firestore.SERVER_TIMESTAMP,
+                })
+            else:
+                # 서버 종료로 중단됨 → 다음 시작 시 복구되도록 대기 상태로 되돌림
+                await self._update(job_id, {'status': 'queued', 'progress': ctx.progress})
+            return
+        except Exception as e:
+            max_attempts = job.get('maxAttempts') or registration.max_attempts
+            if attempts < max_attempts and self._accepting:
+                delay = self.base_backoff * (2 ** (attempts - 1)) * (0.5 + random.random())
+                print(f"⚠️ Job {job_id} failed (attempt {attempts}/{max_attempts}), retrying in {delay:.1f}s: {str(e)}")
+                await self._update(job_id, {'status': 'queued', 'error': str(e), 'progress': ctx.progress})
+                self._enqueue(job_id, job.get('priority', PRIORITY_NORMAL), delay)
+            else:
+                print(f"❌ Job {job_id} failed: {str(e)}")
+                await self._update(job_id, {
+                    'status': 'failed',
+                    'error': str(e),
+                    'progress': ctx.progress,
+                    'finishedAt': firebase_firestore.SERVER_TIMESTAMP,
+                })
+            return
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job_id, None)
+
+        await self._update(job_id, {
+            'status': 'completed',
+            'result': result,
+            'error': None,
+            'progress': ctx.progress,
+            'finishedAt': firebase_firestore.SERVER_TIMESTAMP,
+        })
+
+    # ---------- 수명 주기 ----------
+    async def _recover(self):
+        """
+        이전 프로세스에서 끝나지 못한 작업을 다시 큐에 넣음.
+        임대가 만료된 running 작업은 조건부 쓰기로 queued로 되돌린 경우에만 넣고,
+        실제 실행 여부는 _claim이 결정하므로 같은 작업이 여러 번 들어가도 한 번만 실행됨
+        """
+        def _load():
+            return list(
+                get_db().collection(_COLLECTION)
+                .where('status', 'in', list(JOB_STATUSES_ACTIVE))
+                .stream()
+            )
+
+        recovered = 0
+        now = datetime.now(timezone.utc)
+        for doc in await asyncio.to_thread(_load):
+            job = doc.to_dict()
+            if job.get('status') == 'running':
+                # 다른 인스턴스가 실행 중일 수 있으므로 임대 시간이 지난 작업만 회수
+                updated_at = job.get('updatedAt')
+                if hasattr(updated_at, 'timestamp') and now.timestamp() - updated_at.timestamp() < self.lease_seconds:
+                    continue
+                if not await asyncio.to_thread(self._update_if_unchanged, doc, {'status': 'queued'}):
+                    continue
+            self._enqueue(doc.id, job.get('priority', PRIORITY_NORMAL))
+            recovered += 1
+        return recovered
+
+    async def start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._accepting = True
+        self._worker_tasks = [asyncio.create_task(self._worker_loop()) for _ in range(self.workers)]
+        try:
+            recovered = await self._recover()
+            if recovered:
+                print(f"♻️ Recovered {recovered} unfinished job(s)")
+        except Exception as e:
+            print(f"⚠️ Job recovery failed: {str(e)}")
+
+    async def shutdown(self, timeout: float = 20):
+        """새 작업 수락 중단 → 실행 중인 작업 완료 대기 → 남은 작업은 대기 상태로 보존"""
+        self._accepting = False
+        for task in list(self._retry_tasks):
+            task.cancel()
+
+        running = list(self._running.values())
+        if running:
+            print(f"⏳ Waiting for {len(running)} running job(s) to finish...")
+            _, pending = await asyncio.wait(running, timeout=timeout)
+            for task in pending:
+                task.cancel()
+
+        # 중단된 작업의 상태 기록이 끝날 때까지 잠시 대기
+        deadline = time.monotonic() + 5
+        while self._busy and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._parked = []
+        self._queue = None
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'queued': (self._queue.qsize() if self._queue is not None else 0) + len(self._parked),
+            'running': len(self._running),
+            'lowPriority': {
+                'limit': self.low_priority_limit,
+                'running': self._low_busy,
+                'parked': len(self._parked),
+            },
+            'handlers': sorted(self._handlers),
+        }
+
+
+# Singleton instance for application-wide use
+_manager_instance = None
+
+
+def get_job_manager() -> JobManager:
+    """JobManager 싱글톤 반환 (워커 수는 JOB_WORKERS, 낮은 우선순위 동시 실행 수는 JOB_LOW_PRIORITY_WORKERS)"""
+    global _manager_instance
+
+    if _manager_instance is None:
+        _manager_instance = JobManager(
+            workers=int(os.getenv("JOB_WORKERS", "2")),
+            low_priority_limit=int(os.getenv("JOB_LOW_PRIORITY_WORKERS", "1")),
+        )
+
+    return _manager_instance
+
+
+def job_handler(job_type: str, max_attempts: int = 3):
+    """작업 핸들러 등록 데코레이터"""
+    def decorator(handler: JobHandler) -> JobHandler:
+        get_job_manager().register(job_type, handler, max_attempts)
+        return handler
+    return decorator
@@ -0,0 +1,384 @@
+"""
+Job-posting PDF extraction with map-reduce over page chunks.
+Long documents are split into page-aligned chunks, each chunk is extracted
+by Gemini in parallel (at most PDF_CHUNK_CONCURRENCY at a time) and the
+partial JD JSONs are merged deterministically in page order. Scanned PDFs
+are split into page ranges the same way for the vision path. Documents over
+PDF_MAX_CHUNKS and chunks that fail are reported in the coverage dict
+(truncated, pagesCovered, failedChunks) instead of being dropped silently.
+
+Usage:
+    from services.pdf_extraction import extract_job_data_from_text, read_pdf_pages
+
+    pages = await asyncio.to_thread(read_pdf_pages, upload.file)
+    job_data, coverage = await extract_job_data_from_text(pages)
+"""
+import asyncio
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from config.gemini import GeminiUnavailable, get_gemini_client
+from config.model_routing import route_task
+from utils.metrics import get_llm_metrics
+
+PDF_CHUNK_CHARS = int(os.getenv("PDF_CHUNK_CHARS", "8000"))
+PDF_MAX_CHUNKS = int(os.getenv("PDF_MAX_CHUNKS", "16"))
+PDF_CHUNK_CONCURRENCY = int(os.getenv("PDF_CHUNK_CONCURRENCY", "4"))
+PDF_VISION_PAGES_PER_CHUNK = int(os.getenv("PDF_VISION_PAGES_PER_CHUNK", "5"))
+
+PDF_ANALYSIS_PROMPT_TEXT = """
+다음은 채용공고 PDF에서 추출한 텍스트입니다. 이 내용을 분석하여 아래 JSON 형식으로 정확하게 반환해주세요.
+{chunk_note}
+텍스트:
+{pdf_text}
+
+다음 JSON 형식으로만 응답해주세요 (다른 텍스트 없이):
+{{
+  "title": "공고 제목",
+  "company": "회사명",
+  "jobRole": "직무/포지션",
+  "location": "근무지",
+  "scale": "회사 규모",
+  "description": "회사/팀 소개",
+  "vision": "비전",
+  "mission": "미션",
+  "techStacks": [
+    {{"name": "기술명", "level": 3}}
+  ],
+  "responsibilities": ["업무 내용 1", "업무 내용 2"],
+  "requirements": ["자격 요건 1", "자격 요건 2"],
+  "preferred": ["우대 사항 1", "우대 사항 2"],
+  "benefits": ["복지/혜택 1", "복지/혜택 2"],
+  "recruitmentPeriod": "채용 기간",
+  "recruitmentCount": "채용 인원",
+  "recruitmentProcess": ["서류 전형", "면접", "최종 합격"],
+  "activitySchedule": "",
+  "membershipFee": ""
+}}
+
+비어있는 항목은 빈 문자열("") 또는 빈 배열([])로 반환하세요.
+텍스트에서 파악할 수 없는 정보는 비워서 반환하세요.
+"""
+
+PDF_ANALYSIS_PROMPT_VISION = """
+첨부된 PDF(또는 이미지)는 채용공고 문서입니다. 문서의 내용을 분석하여 아래 JSON 형식으로 정확하게 반환해주세요.
+{chunk_note}
+다음 JSON 형식으로만 응답해주세요 (다른 텍스트 없이):
+{{
+  "title": "공고 제목",
+  "company": "회사명",
+  "jobRole": "직무/포지션",
+  "location": "근무지",
+  "scale": "회사 규모",
+  "description": "회사/팀 소개",
+  "vision": "비전",
+  "mission": "미션",
+  "techStacks": [
+    {{"name": "기술명", "level": 3}}
+  ],
+  "responsibilities": ["업무 내용 1", "업무 내용 2"],
+  "requirements": ["자격 요건 1", "자격 요건 2"],
+  "preferred": ["우대 사항 1", "우대 사항 2"],
+  "benefits": ["복지/혜택 1", "복지/혜택 2"],
+  "recruitmentPeriod": "채용 기간",
+  "recruitmentCount": "채용 인원",
+  "recruitmentProcess": ["서류 전형", "면접", "최종 합격"],
+  "activitySchedule": "",
+  "membershipFee": ""
+}}
+
+문서에서 채용공고와 관련 없는 내용(재학증명서, 성적증명서 등 첨부서류)은 무시하고,
+채용/모집 공고에 해당하는 정보만 추출하세요.
+파악할 수 없는 항목은 빈 문자열("") 또는 빈 배열([])로 반환하세요.
+"""
+
+_CHUNK_NOTE = (
+    "\n이 문서는 긴 공고를 나눈 {total}개 부분 중 {index}번째 부분({pages}페이지)입니다. "
+    "이 부분에 있는 정보만 추출하고, 다른 부분의 내용을 추측해서 채우지 마세요.\n"
+)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def parse_gemini_json(response_text: str) -> dict:
+    """Gemini 응답에서 JSON 파싱"""
+    text = response_text.strip()
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0].strip()
+    elif "```" in text:
+        text = text.split("```")[1].split("```")[0].strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        get_llm_metrics().record_parse(failed=True)
+        raise
+
+
+# ==================== 분할 ====================
+def read_pdf_pages(source: BinaryIO) -> List[str]:
+    """PyPDF2로 페이지별 텍스트 추출 (파일 객체를 그대로 읽음, 동기 함수이므로 스레드에서 호출)"""
+    import PyPDF2
+    source.seek(0)
+    reader = PyPDF2.PdfReader(source)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def _split_long_text(text: str, max_chars: int) -> List[str]:
+    """한 페이지가 너무 길면 줄 경계에서 나눔 (한 줄이 너무 길면 강제로 자름)"""
+    parts, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:max_chars])
+            line = line[max_chars:]
+        if len(current) + len(line) > max_chars:
+            parts.append(current)
+            current = ""
+        current += line
+    if current:
+        parts.append(current)
+    return parts
+
+
+def chunk_pages(pages: List[str], max_chars: int = PDF_CHUNK_CHARS) -> List[Tuple[str, str]]:
+    """
+    연속된 페이지를 max_chars 이하 청크로 묶음.
+    (텍스트, 페이지 범위 "3-5") 목록을 문서 순서대로 반환합니다.
+    """
+    chunks: List[Tuple[str, str]] = []
+    current, first, last = "", 0, 0
+
+    def _flush():
+        if current.strip():
+            chunks.append((current, f"{first}" if first == last else f"{first}-{last}"))
+
+    for number, text in enumerate(pages, start=1):
+        if not text.strip():
+            continue
+        if len(text) > max_chars:
+            _flush()
+            current = ""
+            chunks.extend((part, str(number)) for part in _split_long_text(text, max_chars))
+            continue
+        if current and len(current) + len(text) + 1 > max_chars:
+            _flush()
+            current = ""
+        if not current:
+            first = number
+        current = f"{current}\n{text}" if current else text
+        last = number
+    _flush()
+    return chunks
+
+
+def split_pdf(
+    source: BinaryIO,
+    pages_per_chunk: int = PDF_VISION_PAGES_PER_CHUNK,
+    max_chunks: int = PDF_MAX_CHUNKS,
+) -> Tuple[List[Tuple[BinaryIO, str]], Optional[int]]:
+    """
+    스캔 PDF를 앞에서부터 최대 max_chunks개의 페이지 범위별 PDF로 나눔. ([(PDF, "1-5")], 전체 페이지 수) 반환.
+    나눌 필요가 없으면 원본 하나를, 나눌 수 없으면 원본 하나와 None(페이지 수 모름)을 반환합니다.
+    동기 함수이므로 스레드에서 호출합니다.
+    """
+    try:
+        import PyPDF2
+        source.seek(0)
+        reader = PyPDF2.PdfReader(source)
+        total = len(reader.pages)
+        if total <= pages_per_chunk:
+            return [(source, f"1-{total}" if total > 1 else "1")], total
+
+        parts = []
+        # 한도를 넘는 범위는 PDF로 만들지 않음
+        for start in range(0, min(total, pages_per_chunk * max_chunks), pages_per_chunk):
+            writer = PyPDF2.PdfWriter()
+            end = min(start + pages_per_chunk, total)
+            for i in range(start, end):
+                writer.add_page(reader.pages[i])
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            parts.append((buffer, f"{start + 1}-{end}"))
+        return parts, total
+    except Exception as e:
+        print(f"⚠️ PDF split failed, analyzing as a whole: {str(e)}")
+        return [(source, "")], None
+
+
+# ==================== 병합 ====================
+def _normalize(value: Any) -> str:
+    if isinstance(value, str):
+        return _WHITESPACE.sub(' ', value).strip().casefold()
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _merge_tech_stacks(lists: List[list]) -> list:
+    """기술명 기준 중복 제거 (처음 나온 순서 유지, 레벨은 가장 높은 값)"""
+    merged: Dict[str, dict] = {}
+    for items in lists:
+        for item in items:
+            if not isinstance(item, dict) or not item.get('name'):
+                continue
+            key = _normalize(item['name'])
+            if key not in merged:
+                merged[key] = dict(item)
+            elif isinstance(item.get('level'), (int, float)):
+                merged[key]['level'] = max(merged[key].get('level') or 0, item['level'])
+    return list(merged.values())
+
+
+def merge_job_data(parts: List[dict]) -> dict:
+    """
+    청크별 JD JSON을 문서 순서대로 병합 (같은 입력이면 항상 같은 결과).
+    - 문자열 등 단일 값: 처음으로 비어 있지 않은 값
+    - 배열: 순서대로 이어 붙이고 공백/대소문자 무시 중복 제거
+    - techStacks: 기술명 기준 중복 제거, 레벨은 최댓값
+    """
+    merged: Dict[str, Any] = {}
+    lists: Dict[str, List[list]] = {}
+    for part in parts:
+        if not isinstance(part, dict):
+            continue
+        for key, value in part.items():
+            if isinstance(value, list):
+                lists.setdefault(key, []).append(value)
+            elif key not in merged or (_is_empty(merged[key]) and not _is_empty(value)):
+                merged[key] = value
+
+    for key, values in lists.items():
+        if key == 'techStacks':
+            merged[key] = _merge_tech_stacks(values)
+            continue
+        seen, items = set(), []
+        for value in values:
+            for item in value:
+                norm = _normalize(item)
+                if _is_empty(item) or norm in seen:
+                    continue
+                seen.add(norm)
+                items.append(item)
+        merged[key] = items
+    return merged
+
+
+# ==================== 추출 ====================
+async def _map_chunks(count: int, extract: Callable[[int], Awaitable[dict]]) -> Tuple[List[dict], List[int]]:
+    """
+    청크를 동시 실행 한도 내에서 병렬 추출. (성공한 결과, 실패한 청크 번호) 반환.
+    일부 실패는 건너뛰고, 전부 실패하면 첫 오류를 다시 발생
+    """
+    semaphore = asyncio.Semaphore(PDF_CHUNK_CONCURRENCY)
+
+    async def _run(index: int) -> dict:
+        async with semaphore:
+            return await extract(index)
+
+    results = await asyncio.gather(*(_run(i) for i in range(count)), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    for error in errors:
+        if isinstance(error, (GeminiUnavailable, asyncio.CancelledError)):
+            raise error
+    parts = [r for r in results if not isinstance(r, BaseException)]
+    if not parts:
+        raise errors[0]
+    if errors:
+        print(f"⚠️ {len(errors)}/{count} PDF chunk(s) failed: {str(errors[0])}")
+    failed = [i for i, r in enumerate(results) if isinstance(r, BaseException)]
+    return parts, failed
+
+
+def _coverage(ranges: List[str], failed: List[int], total_pages: Optional[int], truncated: bool) -> dict:
+    """
+    응답에 포함할 분석 범위.
+    pagesCovered는 모델에 보낸 마지막 페이지 (1~pagesCovered 페이지 분석, 모르면 None),
+    failedChunks는 실패해서 결과에 반영되지 않은 페이지 범위 목록
+    """
+    last_pages = [int(r.split('-')[-1]) for r in ranges if r]
+    return {
+        "chunks": len(ranges),
+        "truncated": truncated,
+        "totalPages": total_pages,
+        "pagesCovered": total_pages if not truncated else (max(last_pages) if last_pages else None),
+        "failedChunks": [ranges[i] or "?" for i in failed],
+    }
+
+
+def _chunk_note(index: int, total: int, pages: str) -> str:
+    if total <= 1:
+        return ""
+    return _CHUNK_NOTE.format(index=index + 1, total=total, pages=pages or "?")
+
+
+async def extract_job_data_from_text(pages: List[str]) -> Tuple[dict, dict]:
+    """페이지 텍스트를 청크로 나눠 병렬 추출 후 병합. (jobData, 분석 범위) 반환"""
+    chunks = chunk_pages(pages)
+    truncated = len(chunks) > PDF_MAX_CHUNKS
+    if truncated:
+        print(f"⚠️ PDF has {len(chunks)} chunks, analyzing the first {PDF_MAX_CHUNKS}")
+        chunks = chunks[:PDF_MAX_CHUNKS]
+    model = route_task("pdf_text").model
+    client = get_gemini_client()
+
+    async def _extract(index: int) -> dict:
+        text, page_range = chunks[index]
+        prompt = PDF_ANALYSIS_PROMPT_TEXT.format(
+            chunk_note=_chunk_note(index, len(chunks), page_range), pdf_text=text
+        )
+        return parse_gemini_json(await client.generate_text(prompt, model))
+
+    parts, failed = await _map_chunks(len(chunks), _extract)
+    return merge_job_data(parts), _coverage([r for _, r in chunks], failed, len(pages), truncated)
+
+
+async def _analyze_pdf_part(source: BinaryIO, suffix: str, prompt: str, model: str) -> dict:
+    """Gemini Files API로 업로드해 분석 후 업로드 파일 삭제"""
+    client = get_gemini_client()
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        source.seek(0)
+        shutil.copyfileobj(source, tmp)
+        tmp_path = tmp.name
+
+    try:
+        uploaded_file = await client.upload_file(tmp_path, mime_type="application/pdf")
+        try:
+            response_text = await client.generate_text([uploaded_file, prompt], model)
+        finally:
+            try:
+                await client.delete_file(uploaded_file.name)
+            except Exception:
+                pass
+        return parse_gemini_json(response_text)
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except Exception:
+            pass
+
+
+async def extract_job_data_with_vision(source: BinaryIO, filename: str) -> Tuple[dict, dict]:
+    """이미지/스캔 PDF를 페이지 범위별로 나눠 병렬 비전 분석 후 병합. (jobData, 분석 범위) 반환"""
+    suffix = os.path.splitext(filename)[1] or ".pdf"
+    parts, total_pages = await asyncio.to_thread(split_pdf, source, PDF_VISION_PAGES_PER_CHUNK, PDF_MAX_CHUNKS)
+    truncated = total_pages is not None and total_pages > PDF_VISION_PAGES_PER_CHUNK * PDF_MAX_CHUNKS
+    if truncated:
+        print(f"⚠️ PDF has {total_pages} pages, analyzing the first {len(parts)} page ranges")
+    model = route_task("pdf_vision").model
+
+    async def _extract(index: int) -> dict:
+        part, page_range = parts[index]
+        prompt = PDF_ANALYSIS_PROMPT_VISION.format(chunk_note=_chunk_note(index, len(parts), page_range))
+        return await _analyze_pdf_part(part, suffix, prompt, model)
+
+    results, failed = await _map_chunks(len(parts), _extract)
+    return merge_job_data(results), _coverage([r for _, r in parts], failed, total_pages, truncated)
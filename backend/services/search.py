@@ -0,0 +1,213 @@
+"""
+Per-JD applicant search over hashed TF-IDF vectors.
+Each application stores its hashed term counts once (`searchTerms`), so
+building a JD index only reads that projection; queries are scored in
+memory with NumPy and never ship applicant data to or from the client.
+PII fields (SENSITIVE_FIELDS) are never indexed.
+"""
+import asyncio
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.firebase import get_db, get_document
+from utils.cache import cache_namespace
+from utils.singleflight import SingleFlight
+
+# 토큰화/해싱 규칙을 바꾸면 버전을 올려 저장된 벡터가 재계산되도록 함
+SEARCH_INDEX_VERSION = 1
+_HASH_BITS = 20
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:[.\-][a-z0-9+#]+)*|[가-힣]+")
+
+# JD id → SearchIndex
+_index_cache = cache_namespace("search_index", default_ttl=600)
+_index_flight = SingleFlight()
+
+
+def tokenize(text: str) -> List[str]:
+    """영문/숫자는 단어 단위, 한글은 음절 바이그램 (조사·어미가 붙어도 매칭되도록)"""
+    tokens = []
+    for word in _TOKEN_RE.findall((text or "").lower()):
+        if '가' <= word[0] <= '힣' and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def _hash_token(token: str) -> int:
+    return zlib.crc32(token.encode('utf-8')) & _HASH_MASK
+
+
+def hashed_term_counts(text: str) -> Dict[int, int]:
+    counts: Counter = Counter()
+    for token in tokenize(text):
+        counts[_hash_token(token)] += 1
+    return dict(counts)
+
+
+def application_search_text(app_data: dict) -> str:
+    """검색 대상 텍스트: 답변 내용, 선택한 역량/스킬, 지원 트랙 (개인정보 제외)"""
+    parts: List[str] = []
+    for key in ('requirementAnswers', 'preferredAnswers'):
+        for answer in app_data.get(key) or []:
+            if not isinstance(answer, dict):
+                continue
+            # 충족한 요건의 문항은 그 자체로 검색 신호
+            if answer.get('checked') or answer.get('answer') == 'Y':
+                parts.append(str(answer.get('question') or ''))
+            parts.append(str(answer.get('detail') or ''))
+
+    custom = app_data.get('customAnswers') or {}
+    if isinstance(custom, dict):
+        parts.extend(str(v) for v in custom.values() if v)
+
+    skills = app_data.get('selectedSkills') or {}
+    if isinstance(skills, dict):
+        for category, values in skills.items():
+            parts.append(str(category))
+            if isinstance(values, list):
+                parts.extend(str(v) for v in values)
+            elif values:
+                parts.append(str(values))
+
+    if app_data.get('track'):
+        parts.append(str(app_data['track']))
+
+    return "\n".join(p for p in parts if p)
+
+
+def application_search_fields(app_data: dict) -> dict:
+    """지원서 문서에 함께 저장할 검색 필드 (Firestore map 키는 문자열)"""
+    counts = hashed_term_counts(application_search_text(app_data))
+    return {
+        'searchTerms': {str(k): v for k, v in counts.items()},
+        'searchTermsVersion': SEARCH_INDEX_VERSION,
+    }
+
+
+class SearchIndex:
+    """
+    한 JD의 지원자 TF-IDF 행렬 (CSR과 같은 희소 표현).
+
+    행은 L2 정규화되어 있어 질의 벡터와의 곱이 곧 코사인 유사도입니다.
+    """
+
+    def __init__(self, ids: List[str], term_counts: List[Dict[int, int]]):
+        self.ids = ids
+        n = len(ids)
+
+        rows = np.repeat(np.arange(n, dtype=np.int32), [len(t) for t in term_counts])
+        hashed = np.fromiter((k for t in term_counts for k in t), dtype=np.int64, count=len(rows))
+        tf = np.fromiter((v for t in term_counts for v in t.values()), dtype=np.float32, count=len(rows))
+
+        # 해시 공간을 이 JD에 실제로 등장한 항으로 압축
+        self.vocab, cols = np.unique(hashed, return_inverse=True)
+        df = np.bincount(cols, minlength=len(self.vocab))
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+        weights = (1 + np.log(tf)) * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n)).astype(np.float32)
+        norms[norms == 0] = 1
+        self.rows = rows
+        self.cols = cols.astype(np.int32)
+        self.weights = (weights / norms[rows]).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __sizeof__(self) -> int:
+        # 캐시 바이트 예산 계산용
+        arrays = (self.vocab, self.idf, self.rows, self.cols, self.weights)
+        return object.__sizeof__(self) + sum(a.nbytes for a in arrays) + sum(len(i) + 49 for i in self.ids)
+
+    def _query_vector(self, query: str) -> Optional[np.ndarray]:
+        counts = hashed_term_counts(query)
+        if not counts or not len(self.vocab):
+            return None
+        hashed = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+
+        pos = np.searchsorted(self.vocab, hashed)
+        pos = np.minimum(pos, len(self.vocab) - 1)
+        found = self.vocab[pos] == hashed
+        if not found.any():
+            return None
+
+        q = np.zeros(len(self.vocab), dtype=np.float32)
+        q[pos[found]] = (1 + np.log(tf[found])) * self.idf[pos[found]]
+        return q / np.linalg.norm(q)
+
+    def scores(self, query: str) -> np.ndarray:
+        """모든 지원자의 코사인 유사도 (희소 행렬 × 질의 벡터)"""
+        q = self._query_vector(query)
+        if q is None:
+            return np.zeros(len(self.ids), dtype=np.float32)
+        return np.bincount(self.rows, weights=self.weights * q[self.cols], minlength=len(self.ids))
+
+    def search(self, query: str, top_k: int = 20) -> List[Tuple[str, float]]:
+        scores = self.scores(query)
+        k = min(top_k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.ids[i], round(float(scores[i]), 4)) for i in top if scores[i] > 0]
+
+
+def _stored_terms(data: dict) -> Optional[Dict[int, int]]:
+    if data.get('searchTermsVersion') != SEARCH_INDEX_VERSION or not isinstance(data.get('searchTerms'), dict):
+        return None
+    return {int(k): int(v) for k, v in data['searchTerms'].items()}
+
+
+async def _backfill_terms(app_id: str) -> Dict[int, int]:
+    """검색 필드가 없는(또는 구버전) 지원서는 한 번 계산해서 저장"""
+    doc = await get_document('applications', app_id)
+    fields = application_search_fields(doc.to_dict() or {})
+    await asyncio.to_thread(get_db().collection('applications').document(app_id).update, fields)
+    return {int(k): v for k, v in fields['searchTerms'].items()}
+
+
+async def _build_index(jd_id: str) -> SearchIndex:
+    docs = await asyncio.to_thread(
+        lambda: list(
+            get_db().collection('applications')
+            .where('jdId', '==', jd_id)
+            .select(['searchTerms', 'searchTermsVersion'])
+            .stream()
+        )
+    )
+
+    ids = [doc.id for doc in docs]
+    term_counts = [_stored_terms(doc.to_dict() or {}) for doc in docs]
+
+    missing = [i for i, terms in enumerate(term_counts) if terms is None]
+    if missing:
+        print(f"🔎 Backfilling search terms for {len(missing)} application(s) of JD {jd_id}")
+        backfilled = await asyncio.gather(*(_backfill_terms(ids[i]) for i in missing))
+        for i, terms in zip(missing, backfilled):
+            term_counts[i] = terms
+
+    index = SearchIndex(ids, term_counts)
+    _index_cache.set(jd_id, index)
+    return index
+
+
+async def get_jd_index(jd_id: str) -> SearchIndex:
+    """JD의 검색 인덱스 (캐시 → 없으면 한 번만 빌드)"""
+    index = _index_cache.get(jd_id)
+    if index is not None:
+        return index
+    return await _index_flight.do(jd_id, lambda: _build_index(jd_id))
+
+
+def invalidate_jd_index(jd_id: Optional[str]):
+    """지원서가 추가/삭제되면 호출"""
+    if jd_id:
+        _index_cache.delete(jd_id)
@@ -0,0 +1,172 @@
+"""
+Test applicant AI analysis (services/analysis.py).
+
+Gemini and Firestore are replaced with in-memory fakes (restored after each
+test) so the hash-based reuse, the batch job and the access check can be
+checked without external services.
+"""
+import asyncio
+import contextlib
+import time
+
+from fastapi import HTTPException
+
+from fakes import FakeFirestore, patched
+from services import access, analysis
+
+
+class FakeGemini:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_text(self, prompt, model_name=None, **kwargs):
+        self.calls += 1
+        return f"분석 결과 {self.calls}"
+
+
+@contextlib.contextmanager
+def _fakes(docs=None):
+    gemini, db = FakeGemini(), FakeFirestore(docs)
+    with patched(analysis, get_gemini_client=lambda: gemini, get_db=lambda: db):
+        yield gemini, db
+
+
+APPLICANT = {
+    "jdTitle": "백엔드 개발자",
+    "requirementAnswers": [{"question": "Python 경험", "checked": True, "detail": "3년"}],
+}
+
+
+def test_hash_reuse():
+    """force=false with an unchanged prompt makes no Gemini call; a changed prompt does"""
+    print("=" * 70)
+    print("TEST 1: Analysis hash reuse")
+    print("=" * 70)
+
+    async def run(gemini, db):
+        first = await analysis.analyze_application_record("app1", dict(APPLICANT))
+        assert first == {"analysis": "분석 결과 1", "cached": False}
+        stored = db.doc("applications", "app1")
+
+        again = await analysis.analyze_application_record("app1", stored)
+        assert again == {"analysis": "분석 결과 1", "cached": True}
+        assert gemini.calls == 1
+
+        changed = {**stored, "requirementAnswers": [{"question": "Python 경험", "checked": True, "detail": "5년"}]}
+        result = await analysis.analyze_application_record("app1", changed)
+        assert result == {"analysis": "분석 결과 2", "cached": False}
+        assert db.doc("applications", "app1")["aiAnalysisHash"] != stored["aiAnalysisHash"]
+
+        forced = await analysis.analyze_application_record("app1", db.doc("applications", "app1"), force=True)
+        assert forced["cached"] is False and gemini.calls == 3
+
+    with _fakes({"applications": {"app1": dict(APPLICANT)}}) as (gemini, db):
+        asyncio.run(run(gemini, db))
+    print("✅ Analysis hash reuse verified")
+
+
+def test_application_access():
+    """Only the recruiter or a JD collaborator may touch an application"""
+    print("=" * 70)
+    print("TEST 2: Application access")
+    print("=" * 70)
+
+    db = FakeFirestore({
+        "applications": {"app1": {"recruiterId": "owner", "jdId": "jd1"}},
+        "jds": {"jd1": {"userId": "owner", "collaboratorIds": ["helper"]}},
+    })
+
+    async def run():
+        assert (await access.require_application_access("app1", "owner"))["recruiterId"] == "owner"
+        await access.require_application_access("app1", "helper")
+        for app_id, uid, status in (("app1", "stranger", 403), ("missing", "owner", 404)):
+            try:
+                await access.require_application_access(app_id, uid)
+                raise AssertionError(f"{status} expected")
+            except HTTPException as e:
+                assert e.status_code == status
+
+    with patched(access, get_document=db.get_document):
+        asyncio.run(run())
+    print("✅ Application access verified")
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.waits = 0
+
+    async def wait(self):
+        self.waits += 1
+
+
+class FakeJobContext:
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.user_id = "owner"
+        self.progress = {}
+
+    def raise_if_cancelled(self):
+        pass
+
+    async def report(self, progress=None, force=False):
+        self.progress.update(progress or {})
+
+
+def test_batch_job():
+    """The JD batch job waits on the shared limiter only for applicants that need Gemini"""
+    print("=" * 70)
+    print("TEST 3: Batch analysis job")
+    print("=" * 70)
+
+    limiter = CountingLimiter()
+    docs = {f"app{i}": {**APPLICANT, "jdId": "jd1", "jdTitle": f"개발자 {i}"} for i in range(5)}
+
+    async def run(gemini, db):
+        # 두 지원자는 이미 같은 입력으로 분석됨 → 해시 재사용
+        for app_id in ("app0", "app1"):
+            await analysis.analyze_application_record(app_id, db.doc("applications", app_id))
+        gemini.calls = 0
+
+        ctx = FakeJobContext({"jdId": "jd1"})
+        result = await analysis._analyze_jd_job(ctx)
+        assert result == {"errors": []}
+        assert ctx.progress == {"total": 5, "completed": 5, "cached": 2, "failed": 0}
+        assert gemini.calls == 3 and limiter.waits == 3
+
+        # 재시도해도 모두 캐시에서 처리
+        ctx = FakeJobContext({"jdId": "jd1"})
+        await analysis._analyze_jd_job(ctx)
+        assert ctx.progress["cached"] == 5
+        assert gemini.calls == 3 and limiter.waits == 3
+
+        # force=True면 모두 다시 호출하고 리미터를 거침
+        await analysis._analyze_jd_job(FakeJobContext({"jdId": "jd1", "force": True}))
+        assert gemini.calls == 8 and limiter.waits == 8
+
+    with _fakes({"applications": docs}) as (gemini, db), patched(analysis, _batch_limiter=limiter):
+        asyncio.run(run(gemini, db))
+    print("✅ Batch analysis job verified")
+
+
+def test_rate_limiter_spacing():
+    """RateLimiter spaces consecutive calls by 60 / per_minute seconds"""
+    print("=" * 70)
+    print("TEST 4: Rate limiter spacing")
+    print("=" * 70)
+
+    async def run():
+        limiter = analysis.RateLimiter(1200)  # 50ms 간격
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.wait() for _ in range(4)))
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.14
+    print("✅ Rate limiter spacing verified")
+
+
+if __name__ == "__main__":
+    test_hash_reuse()
+    test_application_access()
+    test_batch_job()
+    test_rate_limiter_spacing()
+    print("\n✅ ALL ANALYSIS TESTS PASSED")
@@ -0,0 +1,63 @@
+"""
+Test applicant questions answered by local aggregation (services/applicant_query.py).
+
+Checks counts, filters taken from real data values and distributions, and
+that free-text questions fall through to the retrieval stage.
+"""
+
+from services.applicant_query import aggregate, answer_structured
+
+RECORDS = [
+    {'id': '1', 'status': '합격', 'university': '서울대학교', 'major': '컴퓨터공학',
+     'selectedSkills': {'개발': ['React', 'Python']}, 'applicantGender': '남'},
+    {'id': '2', 'status': '불합격', 'university': '연세대학교', 'major': '경영학',
+     'selectedSkills': {'디자인': ['Figma']}, 'applicantGender': '여'},
+    {'id': '3', 'status': '합격', 'university': '서울대학교', 'major': '경영학',
+     'selectedSkills': {'개발': ['React']}, 'applicantGender': '여'},
+]
+
+
+def test_counts():
+    """Count questions use data values as filters"""
+    print("=" * 70)
+    print("TEST 1: Counts")
+    print("=" * 70)
+
+    stats = aggregate(RECORDS)
+    assert answer_structured("지원자 몇 명이야?", RECORDS, stats)["aggregation"]["count"] == 3
+    assert answer_structured("서울대학교 지원자 몇 명?", RECORDS, stats)["applicationIds"] == ['1', '3']
+    # '불합격'이 '합격'으로 잘못 매칭되지 않음
+    assert answer_structured("불합격자 몇 명", RECORDS, stats)["applicationIds"] == ['2']
+    print("✅ Counts verified")
+
+
+def test_distribution():
+    """Distribution questions group by the asked dimension"""
+    print("=" * 70)
+    print("TEST 2: Distribution")
+    print("=" * 70)
+
+    stats = aggregate(RECORDS)
+    result = answer_structured("합격자 학교 분포 알려줘", RECORDS, stats)
+    assert result["aggregation"] == {"university": {"서울대학교": 2}}
+    result = answer_structured("가장 많은 스킬은?", RECORDS, stats)
+    assert list(result["aggregation"]["skills"])[0] == "React"
+    print("✅ Distribution verified")
+
+
+def test_free_text_falls_through():
+    """Questions aggregation cannot answer go to retrieval"""
+    print("=" * 70)
+    print("TEST 3: Free text")
+    print("=" * 70)
+
+    stats = aggregate(RECORDS)
+    assert answer_structured("리더십 경험이 있는 사람 추천해줘", RECORDS, stats) is None
+    print("✅ Free text falls through")
+
+
+if __name__ == "__main__":
+    test_counts()
+    test_distribution()
+    test_free_text_falls_through()
+    print("\n✅ ALL APPLICANT QUERY TESTS PASSED")
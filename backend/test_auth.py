@@ -0,0 +1,148 @@
+"""
+Test local Firebase ID token verification (dependencies/auth.py).
+
+Tokens are signed with a locally generated RSA key whose certificate is put
+in the cert cache; the Google cert download is replaced with a counter.
+The cert cache globals are restored after each test.
+"""
+import asyncio
+import contextlib
+import datetime
+import os
+import time
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt
+from google.auth import jwt as google_jwt
+
+from dependencies import auth
+from fakes import patched
+
+PROJECT_ID = "newjd-test"
+KID = "test-key"
+
+
+def _make_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return key_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+KEY_PEM, CERT_PEM = _make_key()
+
+
+def _token(kid=KID, **overrides) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "user-1",
+        "iat": now,
+        "exp": now + 3600,
+        "auth_time": now,
+        **overrides,
+    }
+    signer = crypt.RSASigner.from_string(KEY_PEM, key_id=kid)
+    return google_jwt.encode(signer, payload).decode()
+
+
+@contextlib.contextmanager
+def _fake_certs():
+    fetches = {"count": 0}
+
+    async def fetch_certs():
+        fetches["count"] += 1
+        return auth._certs
+
+    original_project = os.environ.get("FIREBASE_PROJECT_ID")
+    os.environ["FIREBASE_PROJECT_ID"] = PROJECT_ID
+    try:
+        with patched(auth, _fetch_certs=fetch_certs, _certs={KID: CERT_PEM},
+                     _certs_expire_at=time.time() + 3600, _last_forced_refresh=float("-inf")):
+            yield fetches
+    finally:
+        if original_project is None:
+            os.environ.pop("FIREBASE_PROJECT_ID", None)
+        else:
+            os.environ["FIREBASE_PROJECT_ID"] = original_project
+
+
+def _rejected(token: str) -> bool:
+    try:
+        asyncio.run(auth._verify_id_token_locally(token))
+        return False
+    except ValueError:
+        return True
+
+
+def test_valid_token():
+    """A correctly signed token verifies without downloading certs"""
+    print("=" * 70)
+    print("TEST 1: Valid token")
+    print("=" * 70)
+
+    with _fake_certs() as fetches:
+        claims = asyncio.run(auth._verify_id_token_locally(_token()))
+        assert claims["uid"] == "user-1"
+        assert fetches["count"] == 0
+
+        assert _rejected(_token(aud="other-project"))
+        assert _rejected(_token(iss="https://evil.example.com"))
+    print("✅ Valid token verified")
+
+
+def test_header_checks():
+    """Tokens without kid or with a non-RS256 alg are rejected before any fetch"""
+    print("=" * 70)
+    print("TEST 2: Header checks")
+    print("=" * 70)
+
+    with _fake_certs() as fetches:
+        assert _rejected(_token(kid=None))
+        hs256 = google_jwt.encode(crypt.RSASigner.from_string(KEY_PEM, key_id=KID), {"sub": "x"},
+                                  header={"alg": "HS256"}).decode()
+        assert _rejected(hs256)
+        assert _rejected("not-a-jwt")
+        assert fetches["count"] == 0
+    print("✅ Header checks verified")
+
+
+def test_unknown_kid_cooldown():
+    """Unknown kids force at most one cert download per cooldown window"""
+    print("=" * 70)
+    print("TEST 3: Unknown kid cooldown")
+    print("=" * 70)
+
+    with _fake_certs() as fetches:
+        for i in range(5):
+            assert _rejected(_token(kid=f"forged-{i}"))
+        assert fetches["count"] == 1
+
+        # 쿨다운이 지나면 다시 한 번 갱신 (키 교체 대응)
+        auth._last_forced_refresh -= auth._FORCED_REFRESH_COOLDOWN
+        assert _rejected(_token(kid="forged-again"))
+        assert fetches["count"] == 2
+    print("✅ Unknown kid cooldown verified")
+
+
+if __name__ == "__main__":
+    test_valid_token()
+    test_header_checks()
+    test_unknown_kid_cooldown()
+    print("\n✅ ALL AUTH TESTS PASSED")
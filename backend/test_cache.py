@@ -0,0 +1,95 @@
+"""
+Test the bounded in-memory cache (utils/cache.py).
+
+Checks LRU eviction, TTL expiry, byte budget, namespaces and counters.
+"""
+
+import time
+from utils.cache import TTLCache, CacheNamespace
+
+
+def test_lru_eviction():
+    """Least recently used entry is evicted once max_entries is exceeded"""
+    print("=" * 70)
+    print("TEST 1: LRU eviction")
+    print("=" * 70)
+
+    cache = TTLCache(max_entries=2, max_bytes=1024 * 1024)
+    cache.set("ns", "a", 1, ttl_seconds=60)
+    cache.set("ns", "b", 2, ttl_seconds=60)
+    cache.get("ns", "a")                 # a 최근 사용
+    cache.set("ns", "c", 3, ttl_seconds=60)
+
+    assert cache.get("ns", "a") == 1
+    assert cache.get("ns", "b") is None
+    assert cache.get("ns", "c") == 3
+    assert cache.stats()["evictions"] == 1
+    print("✅ LRU eviction verified")
+
+
+def test_ttl_expiry_and_sweep():
+    """Expired entries are not returned and are removed by sweep()"""
+    print("=" * 70)
+    print("TEST 2: TTL expiry & sweep")
+    print("=" * 70)
+
+    cache = TTLCache()
+    cache.set("ns", "short", "x", ttl_seconds=0.01)
+    cache.set("ns", "stale", "y", ttl_seconds=0.01)
+    cache.set("ns", "long", "z", ttl_seconds=60)
+    time.sleep(0.02)
+
+    assert cache.get("ns", "short") is None
+    assert cache.sweep() == 1
+    assert len(cache) == 1
+    assert cache.stats()["expirations"] == 2
+    print("✅ TTL expiry verified")
+
+
+def test_byte_budget():
+    """Entries are evicted to stay under max_bytes"""
+    print("=" * 70)
+    print("TEST 3: Byte budget")
+    print("=" * 70)
+
+    cache = TTLCache(max_entries=100, max_bytes=4096)
+    for i in range(10):
+        cache.set("ns", i, "x" * 1000, ttl_seconds=60)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 4096
+    assert stats["entries"] < 10
+    assert cache.get("ns", 9) is not None
+    print(f"✅ Byte budget verified ({stats['entries']} entries, {stats['bytes']} bytes)")
+
+
+def test_namespaces():
+    """Same key in different namespaces does not collide; counters are per namespace"""
+    print("=" * 70)
+    print("TEST 4: Namespaces")
+    print("=" * 70)
+
+    cache = TTLCache()
+    users = CacheNamespace(cache, "users", default_ttl=60)
+    tokens = CacheNamespace(cache, "tokens", default_ttl=60)
+    users.set("k", "user")
+    tokens.set("k", "token")
+
+    assert users.get("k") == "user"
+    assert tokens.get("k") == "token"
+    tokens.clear()
+    assert tokens.get("k") is None
+    assert users.get("k") == "user"
+
+    stats = cache.stats()["namespaces"]
+    assert stats["users"]["hits"] == 2
+    assert stats["tokens"]["misses"] == 1
+    print("✅ Namespaces verified")
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_ttl_expiry_and_sweep()
+    test_byte_budget()
+    test_namespaces()
+    print("\n✅ ALL CACHE TESTS PASSED")
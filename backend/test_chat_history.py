@@ -0,0 +1,90 @@
+"""
+Test chat history compaction (services/chat_history.py).
+
+Checks that recent turns stay verbatim, older turns become a summary plus
+the jdData snapshot, roles keep alternating and the token budget holds.
+"""
+
+import json
+from services.chat_history import compact_history, history_tokens
+
+
+def _conversation(turns: int, answer_len: int = 20) -> list:
+    history = []
+    for i in range(turns):
+        history.append({"role": "model", "parts": [f"질문 {i}: 어떤 정보를 알려주시겠어요?"]})
+        history.append({"role": "user", "parts": [f"답변 {i} " + "가" * answer_len]})
+    return history
+
+
+def test_short_history_untouched():
+    """History within keep_turns and budget is returned as-is"""
+    print("=" * 70)
+    print("TEST 1: Short history untouched")
+    print("=" * 70)
+
+    history = _conversation(2)
+    assert compact_history(history, {}, keep_turns=4, token_budget=4000) is history
+    print("✅ Short history untouched")
+
+
+def test_old_turns_replaced_by_snapshot():
+    """Older turns are folded into a summary + jdData snapshot"""
+    print("=" * 70)
+    print("TEST 2: Old turns compacted")
+    print("=" * 70)
+
+    history = _conversation(10)
+    jd_data = {"title": "백엔드 개발자", "requirements": ["Python 3년"]}
+    compacted = compact_history(history, jd_data, keep_turns=2, token_budget=100000)
+
+    assert compacted[0]["role"] == "user"
+    assert "답변 0" in compacted[0]["parts"][0]
+    assert json.loads(compacted[1]["parts"][0])["jdData"] == jd_data
+    assert compacted[2:] == history[-3:]
+    roles = [m["role"] for m in compacted]
+    assert all(a != b for a, b in zip(roles, roles[1:]))
+    print(f"✅ {len(history)} → {len(compacted)} messages")
+
+
+def test_token_budget():
+    """Compacted history stays under the token budget"""
+    print("=" * 70)
+    print("TEST 3: Token budget")
+    print("=" * 70)
+
+    history = _conversation(30, answer_len=300)
+    compacted = compact_history(history, {"title": "x"}, keep_turns=6, token_budget=1500)
+
+    assert history_tokens(compacted) <= 1500
+    assert compacted[-1] == history[-1]
+    print(f"✅ ~{history_tokens(history)} → ~{history_tokens(compacted)} tokens")
+
+
+def test_snapshot_without_jd_data():
+    """Without request jdData the snapshot comes from compacted model replies, or nothing is compacted"""
+    print("=" * 70)
+    print("TEST 4: Snapshot without jdData")
+    print("=" * 70)
+
+    # 모델 응답에 jdData가 없으면 수집된 정보를 잃지 않도록 그대로 둠
+    history = _conversation(10)
+    assert compact_history(history, None, keep_turns=2, token_budget=100000) is history
+
+    history = _conversation(10)
+    history[2]["parts"] = [json.dumps({"aiResponse": "q", "jdData": {"title": "백엔드", "skills": ["Python"]}})]
+    history[6]["parts"] = [json.dumps({"aiResponse": "q", "jdData": {"title": "", "location": "서울"}})]
+    compacted = compact_history(history, None, keep_turns=2, token_budget=100000)
+    assert json.loads(compacted[1]["parts"][0])["jdData"] == {
+        "title": "백엔드", "skills": ["Python"], "location": "서울"
+    }
+    assert compacted[2:] == history[-3:]
+    print("✅ Snapshot without jdData verified")
+
+
+if __name__ == "__main__":
+    test_short_history_untouched()
+    test_old_turns_replaced_by_snapshot()
+    test_token_budget()
+    test_snapshot_without_jd_data()
+    print("\n✅ ALL CHAT HISTORY TESTS PASSED")
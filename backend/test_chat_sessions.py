@@ -0,0 +1,80 @@
+"""
+Test server-held chat sessions (services/chat_sessions.py).
+
+Persistence is replaced with an in-memory dict so the session lifecycle can
+be checked without Firestore.
+"""
+import asyncio
+
+from fastapi import HTTPException
+
+from services import chat_sessions
+
+
+def _use_memory_store():
+    stored = {}
+
+    async def save(session):
+        chat_sessions._sessions.set(session['id'], session)
+        stored[session['id']] = dict(session)
+
+    chat_sessions._save = save
+    return stored
+
+
+def test_session_turns():
+    """Turns are appended, jdData is merged and history is bounded"""
+    print("=" * 70)
+    print("TEST 1: Session turns")
+    print("=" * 70)
+
+    stored = _use_memory_store()
+
+    async def run():
+        session = await chat_sessions.create_session(
+            "u1", "company", [{"role": "user", "text": "안녕", "timestamp": "10:00"}], {"title": "초안"}
+        )
+        assert session['history'] == [{"role": "user", "text": "안녕"}]
+
+        await chat_sessions.append_turn(session, "백엔드 개발자", "좋아요", {"jobRole": "백엔드"})
+        resumed = await chat_sessions.get_session(session['id'], "u1")
+        assert len(resumed['history']) == 3
+        assert resumed['jdData'] == {"title": "초안", "jobRole": "백엔드"}
+        assert stored[session['id']]['userId'] == "u1"
+
+        for i in range(chat_sessions.CHAT_SESSION_MAX_MESSAGES):
+            await chat_sessions.append_turn(session, f"q{i}", f"a{i}")
+        assert len(session['history']) == chat_sessions.CHAT_SESSION_MAX_MESSAGES
+        assert session['history'][-1] == {"role": "model", "text": f"a{chat_sessions.CHAT_SESSION_MAX_MESSAGES - 1}"}
+
+        view = chat_sessions.session_view(session, include_history=False)
+        assert view['historyLength'] == chat_sessions.CHAT_SESSION_MAX_MESSAGES and 'history' not in view
+
+    asyncio.run(run())
+    print("✅ Session turns verified")
+
+
+def test_session_owner():
+    """Another user's session is rejected"""
+    print("=" * 70)
+    print("TEST 2: Session owner")
+    print("=" * 70)
+
+    _use_memory_store()
+
+    async def run():
+        session = await chat_sessions.create_session("u1")
+        try:
+            await chat_sessions.get_session(session['id'], "u2")
+            raise AssertionError("403 expected")
+        except HTTPException as e:
+            assert e.status_code == 403
+
+    asyncio.run(run())
+    print("✅ Session owner verified")
+
+
+if __name__ == "__main__":
+    test_session_turns()
+    test_session_owner()
+    print("\n✅ ALL CHAT SESSION TESTS PASSED")
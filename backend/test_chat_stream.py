@@ -0,0 +1,141 @@
+"""
+Test the SSE chat endpoint (POST /api/gemini/chat/stream, routes/gemini.py).
+
+The Gemini client is replaced with a fake that streams a JSON reply in small
+chunks (restored after each call), so the event sequence can be checked
+without calling the API.
+"""
+import asyncio
+import json
+import os
+
+from fakes import FakeFirestore, patched
+from models.schemas import GeminiChatRequest
+from routes import gemini
+from services import chat_sessions
+
+REPLY = json.dumps({
+    "aiResponse": "백엔드 개발자 공고를 작성했어요.",
+    "options": ["좋아요", "수정할래요"],
+    "jdData": {"title": "백엔드 개발자", "skills": ["Python", "FastAPI"]},
+}, ensure_ascii=False)
+
+
+class FakeGemini:
+    def __init__(self, reply: str, chunk_size: int = 7):
+        self.reply = reply
+        self.chunk_size = chunk_size
+
+    async def stream_message(self, history, message, **kwargs):
+        for i in range(0, len(self.reply), self.chunk_size):
+            yield self.reply[i:i + self.chunk_size]
+
+
+def _parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _stream(request: GeminiChatRequest, reply: str = REPLY) -> list:
+    os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+    async def run():
+        response = await gemini.gemini_chat_stream(request, {"uid": "stream-user"})
+        body = "".join([chunk async for chunk in response.body_iterator])
+        return _parse_events(body)
+
+    with patched(gemini, get_gemini_client=lambda: FakeGemini(reply)):
+        return asyncio.run(run())
+
+
+def test_event_sequence():
+    """delta events rebuild aiResponse, field events arrive before a single done"""
+    print("=" * 70)
+    print("TEST 1: SSE event sequence")
+    print("=" * 70)
+
+    events = _stream(GeminiChatRequest(message="백엔드 개발자 공고 만들어줘"))
+    kinds = [kind for kind, _ in events]
+
+    assert kinds[-1] == "done" and kinds.count("done") == 1
+    assert "error" not in kinds
+    # 델타는 여러 번에 나뉘어 오고, 모든 필드·델타는 done보다 먼저 옴
+    assert kinds.count("delta") > 1
+    assert "".join(data["text"] for kind, data in events if kind == "delta") == "백엔드 개발자 공고를 작성했어요."
+    fields = [data for kind, data in events if kind == "field"]
+    assert fields == [
+        {"field": "title", "value": "백엔드 개발자"},
+        {"field": "skills", "value": ["Python", "FastAPI"]},
+    ]
+
+    done = events[-1][1]
+    assert done["aiResponse"] == "백엔드 개발자 공고를 작성했어요."
+    assert done["options"] == ["좋아요", "수정할래요"]
+    assert done["jdData"] == {"title": "백엔드 개발자", "skills": ["Python", "FastAPI"]}
+    print("✅ SSE event sequence verified")
+
+
+def test_patch_mode():
+    """responseMode=patch replaces jdData with a patch against the request jdData"""
+    print("=" * 70)
+    print("TEST 2: SSE patch mode")
+    print("=" * 70)
+
+    request = GeminiChatRequest(message="공고 수정", jdData={"title": "초안"}, responseMode="patch")
+    done = _stream(request)[-1][1]
+    assert "jdData" not in done
+    assert {"op": "replace", "path": "/title", "value": "백엔드 개발자"} in done["jdPatch"]
+    print("✅ SSE patch mode verified")
+
+
+def test_non_object_jd_data():
+    """A reply whose jdData is not an object is treated as no changes instead of failing"""
+    print("=" * 70)
+    print("TEST 3: Non-object jdData")
+    print("=" * 70)
+
+    for jd_data in (["title"], "백엔드", 3):
+        reply = json.dumps({"aiResponse": "네", "options": [], "jdData": jd_data}, ensure_ascii=False)
+        events = _stream(GeminiChatRequest(message="응", jdData={"title": "초안"}, responseMode="patch"), reply)
+        kind, done = events[-1]
+        assert kind == "done" and done["jdPatch"] == []
+
+        events = _stream(GeminiChatRequest(message="응"), reply)
+        kind, done = events[-1]
+        assert kind == "done" and done["jdData"] == {}
+    print("✅ Non-object jdData verified")
+
+
+def test_session_patch_mode():
+    """In session mode without jdData, the patch is diffed against the stored session jdData"""
+    print("=" * 70)
+    print("TEST 4: Session patch mode")
+    print("=" * 70)
+
+    db = FakeFirestore()
+    with patched(chat_sessions, get_db=lambda: db, get_document=db.get_document):
+        session = asyncio.run(chat_sessions.create_session(
+            "stream-user", jd_data={"title": "초안", "location": "서울"}))
+        request = GeminiChatRequest(message="공고 수정", sessionId=session['id'], responseMode="patch")
+        done = _stream(request)[-1][1]
+
+        assert "jdData" not in done
+        # 저장된 location은 그대로 두고, 바뀐 필드만 패치로 옴
+        assert done["jdPatch"] == [
+            {"op": "replace", "path": "/title", "value": "백엔드 개발자"},
+            {"op": "add", "path": "/skills", "value": ["Python", "FastAPI"]},
+        ]
+        stored = asyncio.run(chat_sessions.get_session(session['id'], "stream-user"))
+        assert stored['jdData'] == {"title": "백엔드 개발자", "location": "서울", "skills": ["Python", "FastAPI"]}
+    print("✅ Session patch mode verified")
+
+
+if __name__ == "__main__":
+    test_event_sequence()
+    test_patch_mode()
+    test_non_object_jd_data()
+    test_session_patch_mode()
+    print("\n✅ ALL CHAT STREAM TESTS PASSED")
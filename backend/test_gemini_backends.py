@@ -0,0 +1,103 @@
+"""
+Test the offline Gemini backends (config/gemini_backends.py).
+
+Runs GeminiClient against the synthetic and replay backends without network
+access and checks response shapes, streaming and recorded timings.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from config.gemini import GeminiClient
+from config.gemini_backends import ReplayBackend, SyntheticBackend, request_key
+from utils.metrics import llm_call_context
+
+
+def _client(backend) -> GeminiClient:
+    client = GeminiClient()
+    client._backend = backend
+    return client
+
+
+def test_synthetic_backend():
+    """Synthetic responses match each endpoint's expected format and stream in chunks"""
+    print("=" * 70)
+    print("TEST 1: Synthetic backend")
+    print("=" * 70)
+
+    async def run():
+        client = _client(SyntheticBackend(ttft_ms=10, ttft_p95_ms=30, tokens_per_sec=10000, output_tokens=100, seed=7))
+
+        with llm_call_context("gemini_chat_stream", "u1"):
+            chunks = [c async for c in client.stream_message([], "안녕하세요", system_instruction="S")]
+        assert len(chunks) > 1
+        envelope = json.loads("".join(chunks))
+        assert set(envelope) == {"aiResponse", "options", "multiSelect", "jdData"}
+
+        with llm_call_context("analyze_pdf_vision", "u1"):
+            uploaded = await client.upload_file("/tmp/none.pdf", mime_type="application/pdf")
+            jd = json.loads(await client.generate_text([uploaded, "prompt"]))
+            await client.delete_file(uploaded.name)
+        assert "title" in jd and "techStacks" in jd
+
+        with llm_call_context("analyze_application", "u1"):
+            text = await client.generate_text("prompt")
+        assert text and not text.startswith("{")
+
+    asyncio.run(run())
+    print("✅ Synthetic backend verified")
+
+
+def test_replay_backend():
+    """Recorded responses are replayed by request hash with their chunk timing"""
+    print("=" * 70)
+    print("TEST 2: Replay backend")
+    print("=" * 70)
+
+    payload = {'history': [], 'message': "hi"}
+    record = {
+        "key": request_key("m", "S", payload),
+        "endpoint": "gemini_chat",
+        "model": "m",
+        "text": '{"aiResponse": "recorded"}',
+        "chunks": [{"text": '{"aiResponse": ', "ms": 20}, {"text": '"recorded"}', "ms": 60}],
+        "latencyMs": 60,
+        "usage": {"prompt": 10, "cached": 0, "output": 4},
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+    async def run():
+        backend = ReplayBackend(f.name, ttft_ms=1, ttft_p95_ms=2, seed=1)
+        client = _client(backend)
+
+        with llm_call_context("gemini_chat", "u1"):
+            started = time.perf_counter()
+            chunks = [c async for c in client.stream_message([], "hi", "m", system_instruction="S")]
+            elapsed = time.perf_counter() - started
+            assert chunks == ['{"aiResponse": ', '"recorded"}']
+            assert 0.05 <= elapsed < 0.5, elapsed
+
+            # 같은 엔드포인트의 다른 요청은 녹화를 순환 재생
+            response = await client.send_message([], "other", "m", system_instruction="S")
+            assert response.text == record["text"]
+
+        with llm_call_context("query_applicants", "u1"):
+            assert await client.generate_text("no recording")
+
+        stats = backend.stats()
+        assert (stats["hits"], stats["endpoint_hits"], stats["misses"]) == (1, 1, 1), stats
+
+    try:
+        asyncio.run(run())
+    finally:
+        os.unlink(f.name)
+    print("✅ Replay backend verified")
+
+
+if __name__ == "__main__":
+    test_synthetic_backend()
+    test_replay_backend()
+    print("\n✅ ALL GEMINI BACKEND TESTS PASSED")
@@ -0,0 +1,127 @@
+"""
+Test the shared Gemini client wrapper (config/gemini.py).
+
+Only offline behaviour is checked: no request is sent to the Gemini API.
+"""
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+from google.api_core import exceptions as google_exceptions
+
+from config import gemini
+from config.gemini import GeminiClient
+
+
+def test_model_reuse():
+    """GenerativeModel objects are built once per configuration and reused"""
+    print("=" * 70)
+    print("TEST 1: Model reuse")
+    print("=" * 70)
+
+    os.environ.setdefault("GEMINI_API_KEY", "test-key")
+    client = GeminiClient()
+    config = {"response_mime_type": "application/json", "temperature": 0.2}
+
+    first = client.model("gemini-2.5-flash", "지시문", config)
+    # generation config는 키 순서와 무관하게 같은 설정으로 취급
+    assert client.model("gemini-2.5-flash", "지시문", dict(reversed(config.items()))) is first
+    assert client.model("gemini-2.5-flash", "지시문", config) is first
+
+    assert client.model("gemini-2.5-flash", "다른 지시문", config) is not first
+    assert client.model("gemini-2.5-pro", "지시문", config) is not first
+    assert client.model("gemini-2.5-flash", "지시문") is not first
+    assert len(client._models) == 4
+    print("✅ Model reuse verified")
+
+
+class FakeCachedContent:
+    """caching.CachedContent.create 대체: 정해진 순서대로 오류를 내거나 캐시를 반환"""
+
+    def __init__(self, outcomes: list):
+        self.outcomes = outcomes
+        self.creates = 0
+
+    def create(self, **kwargs):
+        self.creates += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(name=outcome)
+
+
+def _context_cache(client: GeminiClient, fake: FakeCachedContent):
+    original = gemini.caching
+    gemini.caching = SimpleNamespace(CachedContent=fake)
+    try:
+        return asyncio.run(client._context_cache("gemini-2.5-flash", "지시문"))
+    finally:
+        gemini.caching = original
+
+
+def test_context_cache_errors():
+    """Transient cache creation errors back off and retry; permanent ones disable caching"""
+    print("=" * 70)
+    print("TEST 2: Context cache errors")
+    print("=" * 70)
+
+    client = GeminiClient()
+    key = client._instruction_key("gemini-2.5-flash", "지시문")
+    fake = FakeCachedContent([google_exceptions.ServiceUnavailable("busy"), "cachedContents/1"])
+
+    assert _context_cache(client, fake) is None
+    # 백오프 동안은 생성을 다시 시도하지 않음
+    assert _context_cache(client, fake) is None
+    assert fake.creates == 1 and key not in client._context_cache_unsupported
+
+    client._context_cache_retry_at[key] -= gemini._CONTEXT_CACHE_RETRY_BACKOFF
+    assert _context_cache(client, fake).name == "cachedContents/1"
+    assert fake.creates == 2 and key not in client._context_cache_retry_at
+
+    client = GeminiClient()
+    fake = FakeCachedContent([google_exceptions.InvalidArgument("Cached content is too small")])
+    assert _context_cache(client, fake) is None
+    assert key in client._context_cache_unsupported
+    assert _context_cache(client, fake) is None and fake.creates == 1
+    print("✅ Context cache errors verified")
+
+
+def test_breaker_ignores_request_errors():
+    """Non-retryable errors release the half-open probe without closing or opening the circuit"""
+    print("=" * 70)
+    print("TEST 3: Breaker and request errors")
+    print("=" * 70)
+
+    client = GeminiClient()
+    breaker = client._breaker("gemini-2.5-flash")
+
+    async def bad_request(model):
+        raise google_exceptions.InvalidArgument("bad argument")
+
+    def call():
+        deadline = time.monotonic() + 5
+        try:
+            asyncio.run(client._call_with_retry(bad_request, "gemini-2.5-flash", deadline, {}))
+            raise AssertionError("InvalidArgument expected")
+        except google_exceptions.InvalidArgument:
+            pass
+
+    # 닫힌 상태: 누적 실패 횟수를 초기화하지 않음
+    breaker.failures = 3
+    call()
+    assert breaker.state == "closed" and breaker.failures == 3
+
+    # 반열림 상태: 시험 호출만 반환하고 회로는 그대로 (다음 호출이 다시 시험 가능)
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+    call()
+    assert breaker.state == "half_open" and breaker.failures == 3
+    assert breaker.allow()
+    print("✅ Breaker and request errors verified")
+
+
+if __name__ == "__main__":
+    test_model_reuse()
+    test_context_cache_errors()
+    test_breaker_ignores_request_errors()
+    print("\n✅ ALL GEMINI CLIENT TESTS PASSED")
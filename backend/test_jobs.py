@@ -0,0 +1,190 @@
+"""
+Test JobManager scheduling (services/jobs.py).
+
+The scheduling test replaces `_execute` with an in-memory stand-in; the
+claim tests run the real worker path against the in-memory Firestore fake.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from fakes import FakeFirestore, patched
+from services import jobs
+from services.jobs import PRIORITY_LOW, PRIORITY_NORMAL, JobManager
+
+
+def test_low_priority_limit():
+    """Low-priority jobs never take more than low_priority_limit workers"""
+    print("=" * 70)
+    print("TEST 1: Low priority limit")
+    print("=" * 70)
+
+    async def run():
+        manager = JobManager(workers=3, low_priority_limit=1)
+        running = {'low': 0, 'max_low': 0}
+        order = []
+
+        async def execute(job_id):
+            low = job_id.startswith('low')
+            if low:
+                running['low'] += 1
+                running['max_low'] = max(running['max_low'], running['low'])
+            await asyncio.sleep(0.02)
+            order.append(job_id)
+            if low:
+                running['low'] -= 1
+
+        manager._execute = execute
+        manager._queue = asyncio.PriorityQueue()
+        manager._accepting = True
+        manager._worker_tasks = [asyncio.create_task(manager._worker_loop()) for _ in range(manager.workers)]
+
+        for i in range(4):
+            manager._enqueue(f"low{i}", PRIORITY_LOW)
+        await asyncio.sleep(0.005)
+        manager._enqueue("normal", PRIORITY_NORMAL)
+
+        while len(order) < 5:
+            await asyncio.sleep(0.01)
+        assert running['max_low'] == 1
+        # 낮은 우선순위 작업이 밀려 있어도 일반 작업은 바로 실행됨
+        assert order.index("normal") < 2, order
+        assert manager.stats()['lowPriority'] == {'limit': 1, 'running': 0, 'parked': 0}
+
+        await manager.shutdown()
+
+    asyncio.run(run())
+    print("✅ Low priority limit verified")
+
+
+def _queued_job(**overrides) -> dict:
+    return {"type": "count", "payload": {}, "priority": PRIORITY_NORMAL, "status": "queued",
+            "attempts": 0, "maxAttempts": 3, "cancelRequested": False, **overrides}
+
+
+def _counting_manager(runs: dict, duration: float = 0.02, **kwargs) -> JobManager:
+    manager = JobManager(workers=2, **kwargs)
+
+    async def handler(ctx):
+        runs[ctx.job_id] = runs.get(ctx.job_id, 0) + 1
+        await asyncio.sleep(duration)
+        return {"ok": True}
+
+    manager.register("count", handler)
+    return manager
+
+
+async def _wait_finished(db: FakeFirestore, count: int):
+    for _ in range(200):
+        done = [d for d in db.docs.get("jobs", {}).values() if d["status"] == "completed"]
+        if len(done) == count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"jobs not finished: {db.docs.get('jobs')}")
+
+
+def test_submit_during_recovery():
+    """A job submitted while _recover() is streaming is enqueued twice but runs once"""
+    print("=" * 70)
+    print("TEST 2: Submit during recovery")
+    print("=" * 70)
+
+    db = FakeFirestore({"jobs": {"old": _queued_job()}})
+    runs = {}
+    manager = _counting_manager(runs)
+
+    enqueued = []
+    enqueue, claim = manager._enqueue, manager._claim
+
+    def counting_enqueue(job_id, priority, delay=0):
+        enqueued.append(job_id)
+        enqueue(job_id, priority, delay)
+
+    async def slow_claim(job_id):
+        # 복구 쿼리가 끝나기 전에 선점되지 않도록 잠시 지연
+        await asyncio.sleep(0.05)
+        return await claim(job_id)
+
+    async def run():
+        submitted = []
+        loop = asyncio.get_running_loop()
+
+        def before_stream(query):
+            # 복구 쿼리가 실행되는 동안 새 작업이 제출됨 → 복구 결과에도 포함
+            submitted.append(asyncio.run_coroutine_threadsafe(manager.submit("count", {}), loop).result())
+
+        db.before_stream = before_stream
+        await manager.start()
+        await _wait_finished(db, 2)
+        await asyncio.sleep(0.1)
+        await manager.shutdown()
+        return submitted[0]
+
+    with patched(jobs, get_db=lambda: db, get_document=db.get_document), \
+            patched(manager, _enqueue=counting_enqueue, _claim=slow_claim):
+        new_id = asyncio.run(run())
+    assert enqueued.count(new_id) == 2
+    assert runs == {"old": 1, new_id: 1}
+    assert db.doc("jobs", new_id)["attempts"] == 1
+    print("✅ Submit during recovery verified")
+
+
+def test_multiple_instances():
+    """Two instances recovering the same jobs run each job exactly once"""
+    print("=" * 70)
+    print("TEST 3: Multiple instances")
+    print("=" * 70)
+
+    stale = datetime.now(timezone.utc) - timedelta(seconds=600)
+    db = FakeFirestore({"jobs": {
+        **{f"job{i}": _queued_job() for i in range(6)},
+        "orphan": _queued_job(status="running", attempts=1, updatedAt=stale),
+    }})
+    runs = {}
+    managers = [_counting_manager(runs), _counting_manager(runs)]
+
+    async def run():
+        await asyncio.gather(*(m.start() for m in managers))
+        await _wait_finished(db, 7)
+        await asyncio.gather(*(m.shutdown() for m in managers))
+
+    with patched(jobs, get_db=lambda: db, get_document=db.get_document):
+        asyncio.run(run())
+    assert runs == {**{f"job{i}": 1 for i in range(6)}, "orphan": 1}
+    print("✅ Multiple instances verified")
+
+
+def test_heartbeat_keeps_lease():
+    """A handler slower than the lease is not taken over by another instance's recovery"""
+    print("=" * 70)
+    print("TEST 4: Heartbeat keeps lease")
+    print("=" * 70)
+
+    db = FakeFirestore({"jobs": {"slow": _queued_job()}})
+    runs = {}
+    owner = _counting_manager(runs, duration=0.5, lease_seconds=0.15)
+    other = _counting_manager(runs, lease_seconds=0.15)
+
+    async def run():
+        await owner.start()
+        try:
+            started = time.monotonic()
+            while time.monotonic() - started < 0.4:
+                await asyncio.sleep(0.1)
+                assert await other._recover() == 0
+            await _wait_finished(db, 1)
+        finally:
+            await owner.shutdown()
+
+    with patched(jobs, get_db=lambda: db, get_document=db.get_document):
+        asyncio.run(run())
+    assert runs == {"slow": 1}
+    print("✅ Heartbeat keeps lease verified")
+
+
+if __name__ == "__main__":
+    test_low_priority_limit()
+    test_submit_during_recovery()
+    test_multiple_instances()
+    test_heartbeat_keeps_lease()
+    print("\n✅ ALL JOB TESTS PASSED")
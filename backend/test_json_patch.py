@@ -0,0 +1,116 @@
+"""
+Test RFC 6902 JSON Patch support (utils/json_patch.py).
+
+Checks that diff → apply round-trips and that common jdData edits produce
+small patches.
+"""
+from utils.json_patch import JsonPatchError, apply_patch, diff
+
+
+BASE = {
+    "title": "백엔드 개발자",
+    "requirements": ["Python 3년 이상"],
+    "techStacks": [{"name": "Python", "level": 3}],
+    "a/b": "escaped",
+}
+
+
+def test_round_trip():
+    """apply_patch(old, diff(old, new)) == new, without mutating old"""
+    print("=" * 70)
+    print("TEST 1: Round trip")
+    print("=" * 70)
+
+    targets = [
+        {**BASE, "requirements": ["Python 3년 이상", "Django 경험", "AWS 운영 경험"]},
+        {**BASE, "techStacks": [{"name": "Python", "level": 4}], "benefits": ["재택"]},
+        {k: v for k, v in BASE.items() if k != "a/b"},
+        {**BASE, "requirements": ["Go 2년 이상"], "title": 1},
+        BASE,
+    ]
+    for target in targets:
+        snapshot = repr(BASE)
+        patch = diff(BASE, target)
+        assert apply_patch(BASE, patch) == target, patch
+        assert repr(BASE) == snapshot
+    assert diff(BASE, BASE) == []
+    print("✅ Round trip verified")
+
+
+def test_small_patches():
+    """Appends become `add /path/-` and nested edits touch only the changed value"""
+    print("=" * 70)
+    print("TEST 2: Small patches")
+    print("=" * 70)
+
+    patch = diff(BASE, {**BASE, "requirements": ["Python 3년 이상", "Django 경험"]})
+    assert patch == [{"op": "add", "path": "/requirements/-", "value": "Django 경험"}]
+
+    patch = diff(BASE, {**BASE, "techStacks": [{"name": "Python", "level": 5}]})
+    assert patch == [{"op": "replace", "path": "/techStacks/0/level", "value": 5}]
+
+    patch = diff(BASE, {**BASE, "a/b": "changed"})
+    assert patch == [{"op": "replace", "path": "/a~1b", "value": "changed"}]
+    print("✅ Small patches verified")
+
+
+def test_invalid_patch():
+    """Bad paths and failed tests raise JsonPatchError"""
+    print("=" * 70)
+    print("TEST 3: Invalid patch")
+    print("=" * 70)
+
+    for patch in (
+        [{"op": "replace", "path": "/missing", "value": 1}],
+        [{"op": "remove", "path": "/requirements/5"}],
+        [{"op": "test", "path": "/title", "value": "다른 제목"}],
+    ):
+        try:
+            apply_patch(BASE, patch)
+            raise AssertionError(f"JsonPatchError expected for {patch}")
+        except JsonPatchError:
+            pass
+    print("✅ Invalid patch verified")
+
+
+def test_escaped_keys_and_arrays():
+    """diff → apply_patch round-trips `~`/`/` keys and nested array edits"""
+    print("=" * 70)
+    print("TEST 4: Escaped keys and arrays")
+    print("=" * 70)
+
+    old = {
+        "x~y": ["a", "b"],
+        "~1": "literal",
+        "sections": [{"a/b": [1, 2, 3], "~": {"k/~": "v"}}, ["n", ["m"]]],
+    }
+    new = {
+        "x~y": ["a", "b", "c"],
+        "~1": "changed",
+        "sections": [{"a/b": [1], "~": {"k/~": "w", "~0": 0}}, ["n", ["m", "o"]]],
+        "new/key~": [],
+    }
+    shrunk = {**old, "sections": [["n"]]}
+    for before, after in ((old, new), (new, old), (old, shrunk), (shrunk, new)):
+        snapshot = repr(before)
+        patch = diff(before, after)
+        assert apply_patch(before, patch) == after, patch
+        assert repr(before) == snapshot
+
+    paths = {op["path"] for op in diff(old, new)}
+    assert "/x~0y/-" in paths
+    assert "/~01" in paths
+    assert "/sections/0/~0/k~1~0" in paths
+    assert "/sections/0/~0/~00" in paths
+    assert "/sections/0/a~1b" in paths
+    assert "/sections/1/1/-" in paths
+    assert "/new~1key~0" in paths
+    print("✅ Escaped keys and arrays verified")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_small_patches()
+    test_invalid_patch()
+    test_escaped_keys_and_arrays()
+    print("\n✅ ALL JSON PATCH TESTS PASSED")
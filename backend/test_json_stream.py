@@ -0,0 +1,87 @@
+"""
+Test the incremental JSON parser for streamed chat output (utils/json_stream.py).
+
+Checks chunk-independent results, partial aiResponse text, completed jdData
+paths and repair of truncated output.
+"""
+import json
+
+from utils.json_stream import StreamingJSONParser
+
+
+RESPONSE = {
+    "aiResponse": "안녕하세요 \"팀\"\n반가워요 😀",
+    "options": ["개발", "디자인"],
+    "multiSelect": True,
+    "jdData": {"title": "백엔드 개발자", "headcount": 2, "skills": ["Python"], "deadline": None},
+}
+
+
+def test_chunked_parsing():
+    """Any chunking gives the same result; aiResponse text only grows"""
+    print("=" * 70)
+    print("TEST 1: Chunked parsing")
+    print("=" * 70)
+
+    raw = "```json\n" + json.dumps(RESPONSE, ensure_ascii=True) + "\n```"
+    for size in (1, 5, 64):
+        parser = StreamingJSONParser()
+        previous = ""
+        completed = []
+        for i in range(0, len(raw), size):
+            parser.feed(raw[i:i + size])
+            text = parser.string_at(("aiResponse",))
+            assert text.startswith(previous), (previous, text)
+            previous = text
+            completed += parser.pop_completed()
+
+        assert parser.finish() == RESPONSE
+        assert not parser.repaired
+        fields = [path[1] for path in completed if len(path) == 2 and path[0] == "jdData"]
+        assert fields == ["title", "headcount", "skills", "deadline"], fields
+    print("✅ Chunked parsing verified")
+
+
+def test_repair_truncated_output():
+    """Truncated strings, literals, keys and containers are repaired"""
+    print("=" * 70)
+    print("TEST 2: Truncation repair")
+    print("=" * 70)
+
+    cases = {
+        '{"aiResponse": "안녕': {"aiResponse": "안녕"},
+        '{"aiResponse": "hi", "options": ["a", "b': {"aiResponse": "hi", "options": ["a", "b"]},
+        '{"aiResponse": "hi", "multiSelect": fal': {"aiResponse": "hi", "multiSelect": False},
+        '{"aiResponse": "hi", "jdData": {"headcount": 3': {"aiResponse": "hi", "jdData": {"headcount": 3}},
+        '{"aiResponse": "hi", "jdData": {"title"': {"aiResponse": "hi", "jdData": {}},
+        '{"aiResponse": "hi\\u00': {"aiResponse": "hi"},
+    }
+    for raw, expected in cases.items():
+        parser = StreamingJSONParser()
+        parser.feed(raw)
+        assert parser.finish() == expected, (raw, parser.root)
+        assert parser.repaired
+    print("✅ Truncation repair verified")
+
+
+def test_lenient_input():
+    """Raw newlines in strings and trailing commas are accepted; no JSON returns None"""
+    print("=" * 70)
+    print("TEST 3: Lenient input")
+    print("=" * 70)
+
+    parser = StreamingJSONParser()
+    parser.feed('{"aiResponse": "첫 줄\n둘째 줄", "options": [],}')
+    assert parser.finish() == {"aiResponse": "첫 줄\n둘째 줄", "options": []}
+
+    parser = StreamingJSONParser()
+    parser.feed("죄송합니다. 다시 시도해주세요.")
+    assert parser.finish() is None
+    print("✅ Lenient input verified")
+
+
+if __name__ == "__main__":
+    test_chunked_parsing()
+    test_repair_truncated_output()
+    test_lenient_input()
+    print("\n✅ ALL JSON STREAM TESTS PASSED")
@@ -0,0 +1,76 @@
+"""
+Test Google login profile sync (routes/auth.py).
+
+Firestore is replaced with an in-memory fake that records writes (restored
+after each test), so the write-avoiding path can be checked without external
+services.
+"""
+import asyncio
+import contextlib
+from datetime import datetime, timedelta, timezone
+
+from fakes import FakeFirestore, patched
+from routes import auth
+
+
+USER = {"uid": "user-1", "email": "user@example.com", "name": "User", "picture": "https://img/a.png"}
+
+
+@contextlib.contextmanager
+def _fakes(stored=None):
+    db = FakeFirestore({"users": {"user-1": stored}} if stored is not None else None)
+    auth._profile_cache.clear()
+    try:
+        with patched(auth, get_db=lambda: db, get_document=db.get_document):
+            yield db
+    finally:
+        auth._profile_cache.clear()
+
+
+def _login(times: int = 1):
+    for _ in range(times):
+        result = asyncio.run(auth.google_login(dict(USER)))
+        assert result["uid"] == "user-1"
+
+
+def test_unchanged_login_skips_write():
+    """A recent login with an unchanged photo performs no Firestore write"""
+    print("=" * 70)
+    print("TEST 1: Unchanged login skips write")
+    print("=" * 70)
+
+    recent = datetime.now(timezone.utc) - timedelta(minutes=5)
+    with _fakes({"email": USER["email"], "photoURL": USER["picture"], "lastLoginAt": recent}) as db:
+        _login(3)
+    assert db.writes == []
+    # 첫 조회 이후에는 캐시에서 프로필을 읽음
+    assert db.reads == 1
+    print("✅ Unchanged login skips write verified")
+
+
+def test_changed_login_writes():
+    """New users, changed photos and stale lastLoginAt values are written"""
+    print("=" * 70)
+    print("TEST 2: Changed login writes")
+    print("=" * 70)
+
+    with _fakes(None) as db:
+        _login(2)
+    assert [w[0] for w in db.writes] == ["set"]
+
+    recent = datetime.now(timezone.utc) - timedelta(minutes=5)
+    with _fakes({"photoURL": "https://img/old.png", "lastLoginAt": recent}) as db:
+        _login()
+    assert db.writes[0][0] == "update" and db.writes[0][3]["photoURL"] == USER["picture"]
+
+    stale = datetime.now(timezone.utc) - timedelta(hours=2)
+    with _fakes({"photoURL": USER["picture"], "lastLoginAt": stale}) as db:
+        _login(2)
+    assert [w[0] for w in db.writes] == ["update"]
+    print("✅ Changed login writes verified")
+
+
+if __name__ == "__main__":
+    test_unchanged_login_skips_write()
+    test_changed_login_writes()
+    print("\n✅ ALL LOGIN SYNC TESTS PASSED")
@@ -0,0 +1,86 @@
+"""
+Test Gemini call metrics (utils/metrics.py).
+
+Checks histogram quantiles and per-endpoint / per-user attribution.
+"""
+import asyncio
+import os
+
+from fakes import patched
+from routes import metrics as metrics_routes
+from utils.metrics import Histogram, LLMMetrics, llm_call_context
+
+
+def test_histogram_quantiles():
+    """Quantiles are reported as bucket upper bounds"""
+    print("=" * 70)
+    print("TEST 1: Histogram quantiles")
+    print("=" * 70)
+
+    hist = Histogram((100, 500, 1000))
+    for value in (50, 80, 300, 700, 5000):
+        hist.observe(value)
+
+    snapshot = hist.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["p50"] == 500
+    assert snapshot["p95"] == float("inf")
+    assert snapshot["buckets"] == {"le_100": 2, "le_500": 1, "le_1000": 1, "le_inf": 1}
+    print("✅ Histogram verified")
+
+
+def test_attribution():
+    """Calls are attributed to the endpoint/user of the surrounding context"""
+    print("=" * 70)
+    print("TEST 2: Attribution")
+    print("=" * 70)
+
+    metrics = LLMMetrics(user_rollups=True)
+    with llm_call_context("gemini_chat", "u1"):
+        metrics.record_call("m", "ok", 1200, prompt_tokens=1000, cached_tokens=800, output_tokens=50)
+        metrics.record_parse(retried=True)
+    metrics.record_call("m", "ResourceExhausted", 30)
+
+    snapshot = metrics.snapshot()
+    chat = snapshot["endpoints"]["gemini_chat"]
+    assert chat["tokens"]["cached_ratio"] == 0.8
+    assert chat["parse"]["retries"] == 1
+    assert snapshot["endpoints"]["unknown"]["outcomes"] == {"ResourceExhausted": 1}
+    assert list(metrics.user_daily("u1").values())[0]["prompt_tokens"] == 1000
+    print("✅ Attribution verified")
+
+
+def test_gemini_metrics_admin_only():
+    """Global metrics are limited to admins; other users only see their own daily usage"""
+    print("=" * 70)
+    print("TEST 3: Admin-only global metrics")
+    print("=" * 70)
+
+    metrics = LLMMetrics(user_rollups=True)
+    for uid in ("u1", "u2"):
+        with llm_call_context("gemini_chat", uid):
+            metrics.record_call("m", "ok", 100, prompt_tokens=10, output_tokens=5)
+
+    original = os.environ.get("METRICS_ADMIN_UIDS")
+    os.environ["METRICS_ADMIN_UIDS"] = "admin"
+    try:
+        with patched(metrics_routes, get_llm_metrics=lambda: metrics):
+            own = asyncio.run(metrics_routes.gemini_metrics({"uid": "u1"}))
+            assert own == metrics.user_daily("u1")
+            assert not {"client", "admission", "routing"} & set(own)
+
+            full = asyncio.run(metrics_routes.gemini_metrics({"uid": "admin"}))
+            assert {"client", "admission", "routing"} <= set(full)
+    finally:
+        if original is None:
+            os.environ.pop("METRICS_ADMIN_UIDS", None)
+        else:
+            os.environ["METRICS_ADMIN_UIDS"] = original
+    print("✅ Admin-only global metrics verified")
+
+
+if __name__ == "__main__":
+    test_histogram_quantiles()
+    test_attribution()
+    test_gemini_metrics_admin_only()
+    print("\n✅ ALL METRICS TESTS PASSED")
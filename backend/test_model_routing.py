@@ -0,0 +1,74 @@
+"""
+Test tiered model routing (config/model_routing.py).
+
+Checks which chat turns go to the fast model and that decisions are recorded
+per endpoint in the LLM metrics.
+"""
+from config import model_routing
+from config.model_routing import TIER_FAST, TIER_STRONG, classify_chat, route_chat, route_task
+from utils.metrics import get_llm_metrics, llm_call_context
+
+HISTORY = [{"role": "user", "text": "백엔드 개발자 공고"}, {"role": "model", "text": "회사 이름을 알려주세요."}]
+
+
+def test_chat_tiers():
+    """Draft/first/long turns stay strong; short, option and follow-up turns go fast"""
+    print("=" * 70)
+    print("TEST 1: Chat tiers")
+    print("=" * 70)
+
+    cases = [
+        ("[이미 입력된 정보: 회사 이름: 뉴JD] [초안 생성 요청] 회사 이름: 뉴JD", HISTORY, TIER_STRONG, "draft"),
+        ('[섹션 포커스: "혜택"] 사용자 메시지: 재택 추가', HISTORY, TIER_STRONG, "section_edit"),
+        ("백엔드 개발자 채용공고를 만들고 싶어요", [], TIER_STRONG, "first_turn"),
+        ("[이미 입력된 정보: 회사 이름: 뉴JD, 분야/직무: 백엔드] 스타트업", HISTORY, TIER_FAST, "short"),
+        ("Python 백엔드 개발, AWS 인프라 운영, 데이터 파이프라인 구축", HISTORY, TIER_FAST, "option_pick"),
+        ("주 2회 재택이 가능하고, 점심 식대를 지원하며 매년 교육비도 제공합니다.", HISTORY, TIER_FAST, "follow_up"),
+        ("저희 팀은 " + "대규모 트래픽을 처리하는 결제 시스템을 운영하고 있습니다. " * 3, HISTORY, TIER_STRONG, "long_turn"),
+    ]
+    for message, history, tier, reason in cases:
+        decision = classify_chat(message, history)
+        assert (decision.tier, decision.reason) == (tier, reason), (message, decision)
+        assert decision.model == (model_routing.FAST_MODEL if tier == TIER_FAST else model_routing.STRONG_MODEL)
+
+    assert route_task("applicant_analysis").tier == TIER_STRONG
+    assert route_task("pdf_vision").tier == TIER_STRONG
+    print("✅ Chat tiers verified")
+
+
+def test_routing_metrics():
+    """Decisions are counted under the current endpoint"""
+    print("=" * 70)
+    print("TEST 2: Routing metrics")
+    print("=" * 70)
+
+    with llm_call_context("routing_test", "u1"):
+        route_chat("네", HISTORY)
+        route_chat("[초안 생성 요청] 작성해주세요", HISTORY)
+        route_task("applicant_analysis")
+
+    routing = get_llm_metrics().snapshot()['endpoints']['routing_test']['routing']
+    assert routing['tiers'] == {TIER_FAST: 1, TIER_STRONG: 2}
+    assert routing['reasons'] == {"fast:short": 1, "strong:draft": 1, "strong:applicant_analysis": 1}
+    print("✅ Routing metrics verified")
+
+
+def test_task_tier_overrides():
+    """GEMINI_TASK_TIERS overrides per-task tiers and ignores bad entries"""
+    print("=" * 70)
+    print("TEST 3: Task tier overrides")
+    print("=" * 70)
+
+    tiers = model_routing._parse_task_tiers("applicant_query=fast, pdf_text = strong, broken=medium")
+    assert tiers["applicant_query"] == TIER_FAST
+    assert tiers["pdf_text"] == TIER_STRONG
+    assert "broken" not in tiers
+    assert tiers["applicant_analysis"] == TIER_STRONG
+    print("✅ Task tier overrides verified")
+
+
+if __name__ == "__main__":
+    test_chat_tiers()
+    test_routing_metrics()
+    test_task_tier_overrides()
+    print("\n✅ ALL MODEL ROUTING TESTS PASSED")
@@ -0,0 +1,109 @@
+"""
+Test map-reduce PDF extraction (services/pdf_extraction.py).
+
+The Gemini client is replaced with a fake that answers per chunk, so chunking,
+the concurrency cap and the merge can be checked without API calls.
+"""
+import asyncio
+import json
+
+from fakes import patched
+from services import pdf_extraction
+from services.pdf_extraction import chunk_pages, merge_job_data
+
+
+def test_chunk_pages():
+    """Pages are packed in order under the size limit; long pages are split"""
+    print("=" * 70)
+    print("TEST 1: Chunk pages")
+    print("=" * 70)
+
+    pages = ["a" * 40, "b" * 40, "", "c" * 40, ("d" * 30 + "\n") * 5]
+    chunks = chunk_pages(pages, max_chars=100)
+    assert [r for _, r in chunks] == ["1-2", "4", "5", "5"]
+    assert "".join(t for t, _ in chunks).replace("\n", "") == "".join(pages).replace("\n", "")
+    assert all(len(t) <= 100 for t, _ in chunks)
+    assert chunk_pages(["", "  "]) == []
+    print("✅ Chunk pages verified")
+
+
+def test_merge_job_data():
+    """First non-empty scalar wins, lists are concatenated and de-duplicated"""
+    print("=" * 70)
+    print("TEST 2: Merge job data")
+    print("=" * 70)
+
+    parts = [
+        {"title": "", "company": "뉴JD", "requirements": ["Python 3년 이상"],
+         "techStacks": [{"name": "Python", "level": 3}]},
+        {"title": "백엔드/프론트엔드 채용", "company": "다른 회사",
+         "requirements": ["python  3년 이상", "React 경험"],
+         "techStacks": [{"name": "python", "level": 4}, {"name": "React", "level": 3}]},
+        {"benefits": ["재택"], "requirements": []},
+    ]
+    merged = merge_job_data(parts)
+    assert merged["title"] == "백엔드/프론트엔드 채용"
+    assert merged["company"] == "뉴JD"
+    assert merged["requirements"] == ["Python 3년 이상", "React 경험"]
+    assert merged["techStacks"] == [{"name": "Python", "level": 4}, {"name": "React", "level": 3}]
+    assert merged["benefits"] == ["재택"]
+    assert merge_job_data(parts) == merged
+    print("✅ Merge job data verified")
+
+
+def test_parallel_extraction():
+    """Every chunk is extracted, never more than PDF_CHUNK_CONCURRENCY at once"""
+    print("=" * 70)
+    print("TEST 3: Parallel extraction")
+    print("=" * 70)
+
+    state = {"active": 0, "peak": 0, "calls": 0}
+
+    class FakeClient:
+        async def generate_text(self, prompt, model_name=None, **kwargs):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            state["calls"] += 1
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            role = next(line for line in prompt.splitlines() if line.startswith("ROLE-"))
+            return json.dumps({"title": "멀티 포지션 공고", "responsibilities": [role]})
+
+    pages = [f"ROLE-{i}\n" + "설명 " * 2000 for i in range(6)]
+    with patched(pdf_extraction, get_gemini_client=lambda: FakeClient(), PDF_CHUNK_CONCURRENCY=2):
+        job_data, coverage = asyncio.run(pdf_extraction.extract_job_data_from_text(pages))
+    assert coverage["chunks"] == state["calls"] == 6
+    assert state["peak"] == 2
+    assert job_data["responsibilities"] == [f"ROLE-{i}" for i in range(6)]
+    assert coverage == {"chunks": 6, "truncated": False, "totalPages": 6, "pagesCovered": 6, "failedChunks": []}
+    print("✅ Parallel extraction verified")
+
+
+def test_coverage_report():
+    """Truncated documents and failed chunks are reported instead of dropped silently"""
+    print("=" * 70)
+    print("TEST 4: Coverage report")
+    print("=" * 70)
+
+    class FakeClient:
+        async def generate_text(self, prompt, model_name=None, **kwargs):
+            role = next(line for line in prompt.splitlines() if line.startswith("ROLE-"))
+            if role == "ROLE-1":
+                return "JSON이 아닌 응답"
+            return json.dumps({"responsibilities": [role]})
+
+    pages = [f"ROLE-{i}\n" + "설명 " * 2000 for i in range(5)]
+    with patched(pdf_extraction, get_gemini_client=lambda: FakeClient(), PDF_MAX_CHUNKS=3):
+        job_data, coverage = asyncio.run(pdf_extraction.extract_job_data_from_text(pages))
+
+    assert job_data["responsibilities"] == ["ROLE-0", "ROLE-2"]
+    assert coverage == {"chunks": 3, "truncated": True, "totalPages": 5, "pagesCovered": 3, "failedChunks": ["2"]}
+    print("✅ Coverage report verified")
+
+
+if __name__ == "__main__":
+    test_chunk_pages()
+    test_merge_job_data()
+    test_parallel_extraction()
+    test_coverage_report()
+    print("\n✅ ALL PDF EXTRACTION TESTS PASSED")
@@ -0,0 +1,147 @@
+"""
+Test admission control for AI endpoints (dependencies/rate_limit.py).
+
+Checks fair slot hand-off, fast 429s when saturated and per-user token buckets.
+"""
+import asyncio
+
+from fastapi import HTTPException
+
+from dependencies.rate_limit import AdmissionController
+
+
+def test_fair_queue():
+    """A freed slot goes to the waiting user with the fewest requests in flight"""
+    print("=" * 70)
+    print("TEST 1: Fair queue")
+    print("=" * 70)
+
+    async def run():
+        controller = AdmissionController(
+            max_concurrency=2, max_queue=2, queue_timeout=1,
+            user_max_concurrency=2, user_rate_per_minute=600, user_burst=10,
+        )
+        await controller.acquire("a")
+        await controller.acquire("a")
+
+        order = []
+
+        async def wait(uid):
+            await controller.acquire(uid)
+            order.append(uid)
+
+        waiters = [asyncio.create_task(wait("a")), asyncio.create_task(wait("b"))]
+        await asyncio.sleep(0.01)
+        controller.release("a")
+        await asyncio.sleep(0.01)
+        assert order == ["b"], order
+
+        controller.release("a")
+        await asyncio.gather(*waiters)
+        assert order == ["b", "a"]
+        assert controller.stats()["active"] == 2
+
+    asyncio.run(run())
+    print("✅ Fair queue verified")
+
+
+def test_saturation_rejects_quickly():
+    """Full queue and queue timeout both return 429 with Retry-After"""
+    print("=" * 70)
+    print("TEST 2: Saturation")
+    print("=" * 70)
+
+    async def run():
+        controller = AdmissionController(
+            max_concurrency=1, max_queue=1, queue_timeout=0.05,
+            user_max_concurrency=1, user_rate_per_minute=600, user_burst=10,
+        )
+        await controller.acquire("a")
+        waiter = asyncio.create_task(controller.acquire("b"))
+        await asyncio.sleep(0.01)
+
+        try:
+            await controller.acquire("c")
+            raise AssertionError("queue_full expected")
+        except HTTPException as e:
+            assert e.status_code == 429 and "Retry-After" in e.headers
+
+        try:
+            await waiter
+            raise AssertionError("queue_timeout expected")
+        except HTTPException as e:
+            assert e.status_code == 429
+
+        stats = controller.stats()
+        assert stats["waiting"] == 0 and stats["active"] == 1
+        assert stats["rejected"] == {"queue_full": 1, "queue_timeout": 1}
+
+    asyncio.run(run())
+    print("✅ Saturation verified")
+
+
+def test_token_bucket():
+    """Requests beyond the burst are rejected until tokens refill"""
+    print("=" * 70)
+    print("TEST 3: Token bucket")
+    print("=" * 70)
+
+    async def run():
+        controller = AdmissionController(user_rate_per_minute=6, user_burst=2)
+        for _ in range(2):
+            await controller.acquire("u")
+            controller.release("u")
+        try:
+            await controller.acquire("u")
+            raise AssertionError("rate limit expected")
+        except HTTPException as e:
+            assert e.status_code == 429
+            assert int(e.headers["Retry-After"]) == 10
+
+        # 다른 사용자는 영향 없음
+        await controller.acquire("v")
+        controller.release("v")
+
+    asyncio.run(run())
+    print("✅ Token bucket verified")
+
+
+def test_bucket_pruning():
+    """Only idle, refilled buckets are dropped when the bucket table is full"""
+    print("=" * 70)
+    print("TEST 4: Bucket pruning")
+    print("=" * 70)
+
+    async def run():
+        controller = AdmissionController(user_rate_per_minute=6, user_burst=2, max_buckets=3)
+        for _ in range(2):
+            await controller.acquire("busy")
+            controller.release("busy")
+        await controller.acquire("idle")
+        controller.release("idle")
+        # idle 버킷은 다시 가득 찬 상태로 만듦
+        controller._buckets["idle"].updated_at -= 60
+
+        for uid in ("x", "y", "z"):
+            await controller.acquire(uid)
+            controller.release(uid)
+        assert "idle" not in controller._buckets
+        assert "busy" in controller._buckets
+
+        # 사용 중인 버킷은 유지되므로 버스트가 초기화되지 않음
+        try:
+            await controller.acquire("busy")
+            raise AssertionError("rate limit expected")
+        except HTTPException as e:
+            assert e.status_code == 429
+
+    asyncio.run(run())
+    print("✅ Bucket pruning verified")
+
+
+if __name__ == "__main__":
+    test_fair_queue()
+    test_saturation_rejects_quickly()
+    test_token_bucket()
+    test_bucket_pruning()
+    print("\n✅ ALL RATE LIMIT TESTS PASSED")
@@ -0,0 +1,90 @@
+"""
+Test server-side applicant search (services/search.py).
+
+Checks tokenization, that PII is not indexed, ranking quality and that
+scoring 5,000 applicants stays fast.
+"""
+
+import time
+from services.search import SearchIndex, application_search_text, hashed_term_counts, tokenize
+
+
+def _app(detail: str, skills=None) -> dict:
+    return {
+        "applicantName": "홍길동",
+        "university": "서울대학교",
+        "requirementAnswers": [{"question": "협업 경험", "checked": True, "detail": detail, "answer": "Y"}],
+        "selectedSkills": {"개발": skills or []},
+    }
+
+
+def test_tokenize():
+    """Korean words become syllable bigrams, latin words stay whole"""
+    print("=" * 70)
+    print("TEST 1: Tokenize")
+    print("=" * 70)
+
+    assert tokenize("React 경험을") == ["react", "경험", "험을"]
+    assert tokenize("C++ node.js") == ["c++", "node.js"]
+    print("✅ Tokenizer verified")
+
+
+def test_pii_not_indexed():
+    """Encrypted personal fields never reach the search text"""
+    print("=" * 70)
+    print("TEST 2: PII not indexed")
+    print("=" * 70)
+
+    text = application_search_text(_app("React 3년", ["TypeScript"]))
+    assert "홍길동" not in text and "서울대학교" not in text
+    assert "React 3년" in text and "TypeScript" in text
+    print("✅ PII excluded")
+
+
+def test_ranking():
+    """The applicant matching the query ranks first"""
+    print("=" * 70)
+    print("TEST 3: Ranking")
+    print("=" * 70)
+
+    apps = {
+        "a": _app("디자인 툴 사용 경험", ["Figma"]),
+        "b": _app("React와 TypeScript로 대시보드를 개발했습니다", ["React"]),
+        "c": _app("데이터 분석 프로젝트 진행", ["Python"]),
+    }
+    index = SearchIndex(list(apps), [hashed_term_counts(application_search_text(a)) for a in apps.values()])
+
+    results = index.search("리액트 React 개발 경험", top_k=3)
+    assert results[0][0] == "b"
+    assert index.search("존재하지않는단어", top_k=3) == []
+    print(f"✅ Ranking verified: {results}")
+
+
+def test_large_index_speed():
+    """Scoring 5,000 applicants takes milliseconds"""
+    print("=" * 70)
+    print("TEST 4: 5,000 applicants")
+    print("=" * 70)
+
+    words = ["React", "Python", "Figma", "리더십", "데이터", "마케팅", "협업", "디자인", "서버", "분석"]
+    term_counts = [
+        hashed_term_counts(" ".join(words[(i + j) % len(words)] for j in range(i % 7 + 3)) + f" 프로젝트{i}")
+        for i in range(5000)
+    ]
+    index = SearchIndex([str(i) for i in range(5000)], term_counts)
+
+    start = time.perf_counter()
+    for _ in range(10):
+        results = index.search("Python 데이터 분석", top_k=20)
+    elapsed_ms = (time.perf_counter() - start) * 100
+    assert len(results) == 20
+    assert elapsed_ms < 50
+    print(f"✅ {elapsed_ms:.2f} ms per query")
+
+
+if __name__ == "__main__":
+    test_tokenize()
+    test_pii_not_indexed()
+    test_ranking()
+    test_large_index_speed()
+    print("\n✅ ALL SEARCH TESTS PASSED")
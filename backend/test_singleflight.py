@@ -0,0 +1,98 @@
+"""
+Test single-flight request coalescing (utils/singleflight.py).
+"""
+import asyncio
+
+from utils.singleflight import SingleFlight
+
+
+def test_coalescing():
+    """Concurrent callers with the same key share one execution"""
+    print("=" * 70)
+    print("TEST 1: Coalescing")
+    print("=" * 70)
+
+    async def run():
+        flight = SingleFlight()
+        calls = {"a": 0, "b": 0}
+
+        def work(key):
+            async def _fn():
+                calls[key] += 1
+                await asyncio.sleep(0.01)
+                return f"result-{key}"
+            return _fn
+
+        results = await asyncio.gather(
+            *(flight.do("a", work("a")) for _ in range(5)),
+            flight.do("b", work("b")),
+        )
+        assert results == ["result-a"] * 5 + ["result-b"]
+        assert calls == {"a": 1, "b": 1}
+        assert flight.stats() == {"inflight": 0, "executions": 2, "shared": 4}
+
+        # 결과는 캐싱되지 않음: 끝난 뒤 다시 호출하면 새로 실행
+        await flight.do("a", work("a"))
+        assert calls["a"] == 2
+
+    asyncio.run(run())
+    print("✅ Coalescing verified")
+
+
+def test_error_propagation():
+    """An exception reaches every waiter and the key is released afterwards"""
+    print("=" * 70)
+    print("TEST 2: Error propagation")
+    print("=" * 70)
+
+    async def run():
+        flight = SingleFlight()
+        calls = {"count": 0}
+
+        async def failing():
+            calls["count"] += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+        assert calls["count"] == 1
+        assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+        assert flight.stats()["inflight"] == 0
+
+        async def succeeding():
+            return "ok"
+
+        assert await flight.do("k", succeeding) == "ok"
+
+    asyncio.run(run())
+    print("✅ Error propagation verified")
+
+
+def test_waiter_cancellation():
+    """A cancelled waiter does not cancel the shared work"""
+    print("=" * 70)
+    print("TEST 3: Waiter cancellation")
+    print("=" * 70)
+
+    async def run():
+        flight = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "done"
+
+    asyncio.run(run())
+    print("✅ Waiter cancellation verified")
+
+
+if __name__ == "__main__":
+    test_coalescing()
+    test_error_propagation()
+    test_waiter_cancellation()
+    print("\n✅ ALL SINGLEFLIGHT TESTS PASSED")
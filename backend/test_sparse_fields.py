@@ -0,0 +1,67 @@
+"""
+Test sparse fieldsets for application reads (?fields=, routes/applications.py).
+
+Checks field parsing and that only requested sensitive fields are decrypted.
+Requires ENCRYPTION_KEY to be set (same as the other encryption tests).
+"""
+from fastapi import HTTPException
+
+from models.schemas import SENSITIVE_FIELDS
+from routes.applications import _parse_fields, _serialize_application
+from utils.security_utils import get_encryptor
+
+
+def test_parse_fields():
+    """Field names are trimmed, de-duplicated and validated"""
+    print("=" * 70)
+    print("TEST 1: Parse fields")
+    print("=" * 70)
+
+    assert _parse_fields(None) is None
+    assert _parse_fields(" , ") is None
+    assert _parse_fields("applicantName, status,applicantName") == ["applicantName", "status"]
+    try:
+        _parse_fields("status,a.b")
+        raise AssertionError("400 expected")
+    except HTTPException as e:
+        assert e.status_code == 400
+    print("✅ Parse fields verified")
+
+
+def test_lazy_decryption():
+    """Only the requested sensitive fields are projected and decrypted"""
+    print("=" * 70)
+    print("TEST 2: Lazy decryption")
+    print("=" * 70)
+
+    encryptor = get_encryptor()
+    plain = {field: f"{field}-value" for field in SENSITIVE_FIELDS}
+    stored = {**{k: encryptor.encrypt(v) for k, v in plain.items()}, "status": "pending", "jdId": "jd1"}
+
+    decrypted = []
+    original = encryptor.decrypt
+
+    def counting_decrypt(value):
+        decrypted.append(value)
+        return original(value)
+
+    encryptor.decrypt = counting_decrypt
+    try:
+        view = _serialize_application("app1", dict(stored), ["applicantName", "status"])
+    finally:
+        encryptor.decrypt = original
+
+    assert view == {
+        "applicantName": plain["applicantName"],
+        "status": "pending",
+        "id": "app1",
+        "applicationId": "app1",
+    }
+    assert len(decrypted) == 1
+    print("✅ Lazy decryption verified")
+
+
+if __name__ == "__main__":
+    test_parse_fields()
+    test_lazy_decryption()
+    print("\n✅ ALL SPARSE FIELD TESTS PASSED")
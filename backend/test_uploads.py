@@ -0,0 +1,88 @@
+"""
+Test streaming upload handling (utils/uploads.py).
+"""
+import asyncio
+import hashlib
+import io
+
+from fastapi import HTTPException, UploadFile
+
+from utils import uploads
+from utils.uploads import receive_upload, spooled_upload
+
+
+class CountingStream(io.BytesIO):
+    """읽은 바이트 수를 세는 스트림"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_spooled_upload():
+    """Content is hashed in place and the upload's own file is handed back without a copy"""
+    print("=" * 70)
+    print("TEST 1: Spooled upload")
+    print("=" * 70)
+
+    data = b"%PDF-1.4 " + bytes(range(256)) * 1000
+
+    async def run():
+        stream = CountingStream(data)
+        file = UploadFile(stream, size=len(data), filename="jd.pdf")
+        async with spooled_upload(file, len(data)) as upload:
+            # 두 번째 임시 파일 없이 UploadFile.file을 되감아 그대로 사용
+            assert upload.file is stream
+            assert upload.size == len(data)
+            assert upload.sha256 == hashlib.sha256(data).hexdigest()
+            assert stream.bytes_read == len(data)
+            assert upload.file.read() == data
+            assert upload.read_bytes() == data
+        # 파일은 UploadFile의 것이라 닫지 않고 처음으로 되감아 둠
+        assert not stream.closed and stream.tell() == 0
+
+    asyncio.run(run())
+    print("✅ Spooled upload verified")
+
+
+def test_early_rejection():
+    """Oversized uploads are rejected without reading past the limit"""
+    print("=" * 70)
+    print("TEST 2: Early rejection")
+    print("=" * 70)
+
+    limit = 4 * uploads.UPLOAD_CHUNK_SIZE
+    data = b"x" * (limit * 10)
+
+    async def run():
+        # 크기를 모르는 경우: 한도를 넘는 청크까지만 읽음
+        stream = CountingStream(data)
+        try:
+            await receive_upload(UploadFile(stream, filename="big.pdf"), limit, "too big")
+            raise AssertionError("HTTPException expected")
+        except HTTPException as e:
+            assert e.status_code == 400 and e.detail == "too big"
+        assert stream.bytes_read <= limit + uploads.UPLOAD_CHUNK_SIZE
+
+        # 크기를 아는 경우: 전혀 읽지 않음
+        stream = CountingStream(data)
+        try:
+            await receive_upload(UploadFile(stream, size=len(data), filename="big.pdf"), limit)
+            raise AssertionError("HTTPException expected")
+        except HTTPException as e:
+            assert "MB" in e.detail
+        assert stream.bytes_read == 0
+
+    asyncio.run(run())
+    print("✅ Early rejection verified")
+
+
+if __name__ == "__main__":
+    test_spooled_upload()
+    test_early_rejection()
+    print("\n✅ ALL UPLOAD TESTS PASSED")
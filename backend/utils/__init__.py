@@ -1,5 +1,6 @@
 """Utility modules for the backend application."""
 
 from .security_utils import DataEncryption, get_encryptor
+from .cache import TTLCache, get_cache, cache_namespace
 
-__all__ = ['DataEncryption', 'get_encryptor']
+__all__ = ['DataEncryption', 'get_encryptor', 'TTLCache', 'get_cache', 'cache_namespace']
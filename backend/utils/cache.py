@@ -0,0 +1,235 @@
+"""
+Bounded in-memory cache with LRU + TTL eviction.
+Entries live under namespaces so unrelated callers cannot collide,
+and hit/miss/eviction counters are kept per namespace.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def _estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate memory footprint of a cached value in bytes."""
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _estimate_size(k, _depth + 1) + _estimate_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += _estimate_size(item, _depth + 1)
+    return size
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'size')
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and an entry/byte budget.
+
+    Usage:
+        cache = TTLCache(max_entries=1000, max_bytes=8 * 1024 * 1024)
+        cache.set("users", uid, profile, ttl_seconds=600)
+        profile = cache.get("users", uid)
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, default_ttl: int = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        self._entries: "OrderedDict[Tuple[str, Hashable], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._sweeper_task: Optional[asyncio.Task] = None
+
+    # ---------- counters ----------
+    def _count(self, namespace: str, counter: str, amount: int = 1):
+        ns_stats = self._stats.get(namespace)
+        if ns_stats is None:
+            ns_stats = self._stats[namespace] = {
+                'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0
+            }
+        ns_stats[counter] += amount
+
+    # ---------- internal removal ----------
+    def _remove(self, full_key: Tuple[str, Hashable]) -> Optional[_Entry]:
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _enforce_budget(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            full_key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._count(full_key[0], 'evictions')
+
+    # ---------- public API ----------
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        full_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                self._count(namespace, 'misses')
+                return default
+            if entry.expires_at <= time.monotonic():
+                self._remove(full_key)
+                self._count(namespace, 'expirations')
+                self._count(namespace, 'misses')
+                return default
+            self._entries.move_to_end(full_key)
+            self._count(namespace, 'hits')
+            return entry.value
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.default_ttl if ttl_seconds is None else ttl_seconds
+        full_key = (namespace, key)
+        size = _estimate_size(value)
+        with self._lock:
+            self._remove(full_key)
+            if ttl <= 0 or size > self.max_bytes:
+                return
+            self._entries[full_key] = _Entry(value, time.monotonic() + ttl, size)
+            self._bytes += size
+            self._count(namespace, 'sets')
+            self._enforce_budget()
+
+    def delete(self, namespace: str, key: Hashable) -> bool:
+        with self._lock:
+            return self._remove((namespace, key)) is not None
+
+    def clear(self, namespace: Optional[str] = None):
+        """Clear one namespace, or everything when namespace is None."""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            for full_key in [k for k in self._entries if k[0] == namespace]:
+                self._remove(full_key)
+
+    def sweep(self) -> int:
+        """Drop every expired entry. Returns the number of entries removed."""
+        now = time.monotonic()
+        removed = 0
+        with self._lock:
+            for full_key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+                self._remove(full_key)
+                self._count(full_key[0], 'expirations')
+                removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            namespaces = {name: dict(counters) for name, counters in self._stats.items()}
+            for name in namespaces:
+                namespaces[name]['entries'] = 0
+            for namespace, _ in self._entries:
+                namespaces.setdefault(namespace, {'entries': 0})
+                namespaces[namespace]['entries'] += 1
+
+            totals = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0}
+            for counters in self._stats.values():
+                for counter in totals:
+                    totals[counter] += counters[counter]
+
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                **totals,
+                'namespaces': namespaces,
+            }
+
+    # ---------- background sweeper ----------
+    async def _sweep_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️ Cache sweep failed: {e}")
+
+    def start_sweeper(self, interval: float = 60):
+        """Start periodic expiry sweeping on the running event loop."""
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.create_task(self._sweep_loop(interval))
+
+    def stop_sweeper(self):
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            self._sweeper_task = None
+
+
+class CacheNamespace:
+    """View of a TTLCache bound to a single namespace."""
+
+    def __init__(self, cache: TTLCache, namespace: str, default_ttl: Optional[float] = None):
+        self.cache = cache
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self.cache.get(self.namespace, key, default)
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.default_ttl if ttl_seconds is None else ttl_seconds
+        self.cache.set(self.namespace, key, value, ttl)
+
+    def delete(self, key: Hashable) -> bool:
+        return self.cache.delete(self.namespace, key)
+
+    def clear(self):
+        self.cache.clear(self.namespace)
+
+
+# Singleton instance for application-wide use
+_cache_instance = None
+
+
+def get_cache() -> TTLCache:
+    """
+    Get singleton instance of the shared TTLCache.
+
+    Budget is configurable with CACHE_MAX_ENTRIES / CACHE_MAX_BYTES.
+    """
+    global _cache_instance
+
+    if _cache_instance is None:
+        _cache_instance = TTLCache(
+            max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+            max_bytes=int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        )
+
+    return _cache_instance
+
+
+def cache_namespace(name: str, default_ttl: Optional[float] = None) -> CacheNamespace:
+    """
+    Get a namespaced view of the shared cache.
+
+    Usage:
+        from utils.cache import cache_namespace
+
+        token_cache = cache_namespace("token_verify", default_ttl=300)
+        token_cache.set(token_hash, claims)
+    """
+    return CacheNamespace(get_cache(), name, default_ttl)
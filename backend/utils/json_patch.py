@@ -0,0 +1,159 @@
+"""
+Minimal RFC 6902 JSON Patch support.
+`diff` produces add/remove/replace operations between two JSON documents
+(appends to arrays become `add /path/-`), and `apply_patch` applies
+add/remove/replace/move/copy/test operations without mutating the input.
+
+Usage:
+    from utils.json_patch import apply_patch, diff
+
+    patch = diff(old_jd, new_jd)
+    assert apply_patch(old_jd, patch) == new_jd
+"""
+import copy
+from typing import Any, Dict, List, Tuple
+
+
+class JsonPatchError(ValueError):
+    """패치를 적용할 수 없음 (잘못된 경로, test 실패 등)"""
+
+
+def escape_token(token: Any) -> str:
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape_token(token: str) -> str:
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def _pointer(path: Tuple[Any, ...]) -> str:
+    return "".join(f"/{escape_token(p)}" for p in path)
+
+
+def _diff(old: Any, new: Any, path: Tuple[Any, ...], ops: List[Dict[str, Any]]):
+    if type(old) is not type(new):
+        # bool/int/float 구분, dict ↔ list 등 타입이 바뀌면 통째로 교체
+        ops.append({"op": "replace", "path": _pointer(path), "value": new})
+        return
+
+    if isinstance(old, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": _pointer(path + (key,))})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer(path + (key,)), "value": value})
+            elif old[key] != value:
+                _diff(old[key], value, path + (key,), ops)
+        return
+
+    if isinstance(old, list):
+        if new[:len(old)] == old:
+            # 뒤에 항목이 추가된 경우 (가장 흔한 변경)
+            for value in new[len(old):]:
+                ops.append({"op": "add", "path": _pointer(path + ('-',)), "value": value})
+        elif len(old) == len(new):
+            for i, (a, b) in enumerate(zip(old, new)):
+                if a != b:
+                    _diff(a, b, path + (i,), ops)
+        else:
+            ops.append({"op": "replace", "path": _pointer(path), "value": new})
+        return
+
+    if old != new:
+        ops.append({"op": "replace", "path": _pointer(path), "value": new})
+
+
+def diff(old: Any, new: Any) -> List[Dict[str, Any]]:
+    """old → new 로 바꾸는 패치 연산 목록 (같으면 빈 목록)"""
+    ops: List[Dict[str, Any]] = []
+    if old != new:
+        _diff(old, new, (), ops)
+    return ops
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith('/'):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer}")
+    return [_unescape_token(t) for t in pointer[1:].split('/')]
+
+
+def _list_index(container: list, token: str, allow_end: bool) -> int:
+    if token == '-' and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token[0] == '0'):
+        raise JsonPatchError(f"Invalid array index: {token}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {token}")
+    return index
+
+
+def _resolve(doc: Any, tokens: List[str]) -> Any:
+    node = doc
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_list_index(node, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return node
+
+
+def _add(doc: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve(doc, tokens[:-1])
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, tokens[-1], allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to /{'/'.join(tokens)}")
+    return doc
+
+
+def _remove(doc: Any, tokens: List[str]) -> Tuple[Any, Any]:
+    if not tokens:
+        raise JsonPatchError("Cannot remove the document root")
+    parent = _resolve(doc, tokens[:-1])
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        return doc, parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return doc, parent.pop(_list_index(parent, tokens[-1], allow_end=False))
+    raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def apply_patch(doc: Any, patch: List[Dict[str, Any]]) -> Any:
+    """패치를 적용한 새 문서 반환 (원본은 변경하지 않음). 실패 시 JsonPatchError"""
+    result = copy.deepcopy(doc)
+    for op in patch:
+        name = op.get('op')
+        tokens = _parse_pointer(op.get('path', ''))
+        if name == 'add':
+            result = _add(result, tokens, copy.deepcopy(op['value']))
+        elif name == 'remove':
+            result, _ = _remove(result, tokens)
+        elif name == 'replace':
+            _resolve(result, tokens)
+            if tokens:
+                result, _ = _remove(result, tokens)
+            result = _add(result, tokens, copy.deepcopy(op['value']))
+        elif name == 'move':
+            result, value = _remove(result, _parse_pointer(op['from']))
+            result = _add(result, tokens, value)
+        elif name == 'copy':
+            result = _add(result, tokens, copy.deepcopy(_resolve(result, _parse_pointer(op['from']))))
+        elif name == 'test':
+            if _resolve(result, tokens) != op.get('value'):
+                raise JsonPatchError(f"Test failed at {op.get('path')}")
+        else:
+            raise JsonPatchError(f"Unknown patch op: {name}")
+    return result
@@ -0,0 +1,296 @@
+"""
+Incremental JSON parser for streamed model output.
+Consumes the response chunk by chunk (each character is read once), keeps a
+live partial object tree, exposes in-progress string values and the paths of
+values as they complete, and repairs common truncations (open strings,
+dangling keys, partial literals, unclosed containers) when the stream ends.
+
+Usage:
+    from utils.json_stream import StreamingJSONParser
+
+    parser = StreamingJSONParser()
+    async for chunk in chunks:
+        parser.feed(chunk)
+        text = parser.string_at(('aiResponse',))
+        for path in parser.pop_completed():
+            ...
+    result = parser.finish()
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+Path = Tuple[Any, ...]
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_WHITESPACE = ' \t\r\n'
+_LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+def _join(chars: List[str], final: bool) -> str:
+    """\\u 이스케이프로 들어온 서로게이트 쌍을 합침 (진행 중이면 짝 없는 상위 서로게이트는 보류)"""
+    text = "".join(chars)
+    if not any('\ud800' <= ch <= '\udfff' for ch in text):
+        return text
+    if not final and '\ud800' <= text[-1] <= '\udbff':
+        text = text[:-1]
+    return text.encode('utf-16', 'surrogatepass').decode('utf-16', 'replace')
+
+
+def _parse_literal(token: str, final: bool) -> Tuple[bool, Any]:
+    """true/false/null/숫자 토큰 해석. final이면 잘린 토큰도 최대한 복구"""
+    if token in _LITERALS:
+        return True, _LITERALS[token]
+    try:
+        return True, json.loads(token)
+    except ValueError:
+        pass
+    if final:
+        for literal, value in _LITERALS.items():
+            if literal.startswith(token):
+                return True, value
+        trimmed = token.rstrip('.eE+-')
+        if trimmed and trimmed != '-':
+            try:
+                return True, json.loads(trimmed)
+            except ValueError:
+                pass
+    return False, None
+
+
+class _Frame:
+    __slots__ = ('container', 'path', 'key', 'expect')
+
+    def __init__(self, container, path: Path, expect: str):
+        self.container = container
+        self.path = path
+        self.key = None
+        self.expect = expect
+
+
+class StreamingJSONParser:
+    """
+    관대한 증분 JSON 파서.
+
+    - 루트 값 앞의 텍스트(```json 코드 펜스 등)와 루트 값 뒤의 텍스트는 무시
+    - 문자열 안의 raw 줄바꿈, 끝의 쉼표(trailing comma)는 허용
+    - finish()에서 잘린 출력을 복구하고, 복구가 필요했으면 repaired=True
+    """
+
+    def __init__(self):
+        self.root: Any = None
+        self.done = False
+        self.repaired = False
+        self._stack: List[_Frame] = []
+        self._completed: List[Path] = []
+        # 진행 중인 문자열 / 리터럴
+        self._str: Optional[List[str]] = None
+        self._str_is_key = False
+        self._escape: Optional[str] = None
+        self._literal: Optional[str] = None
+
+    # ── 조회 ────────────────────────────────────────────────
+
+    @property
+    def started(self) -> bool:
+        return self.root is not None
+
+    def _current_path(self) -> Optional[Path]:
+        if not self._stack:
+            return None
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            return frame.path + (frame.key,)
+        return frame.path + (len(frame.container),)
+
+    def get(self, path: Path, default: Any = None) -> Any:
+        """완성된(또는 열려 있는 컨테이너) 값 조회"""
+        node = self.root
+        for part in path:
+            try:
+                node = node[part]
+            except (KeyError, IndexError, TypeError):
+                return default
+        return node
+
+    def string_at(self, path: Path) -> str:
+        """path의 문자열 값. 아직 도착 중이면 지금까지 디코딩된 부분"""
+        if self._str is not None and not self._str_is_key and self._current_path() == path:
+            return _join(self._str, final=False)
+        value = self.get(path)
+        return value if isinstance(value, str) else ""
+
+    def pop_completed(self) -> List[Path]:
+        """마지막 호출 이후 완성된 값들의 경로 (완성 순서)"""
+        completed, self._completed = self._completed, []
+        return completed
+
+    # ── 파싱 ────────────────────────────────────────────────
+
+    def _emit(self, value: Any):
+        """완성된 값을 부모 컨테이너에 넣음"""
+        if not self._stack:
+            self.root = value
+            self.done = True
+            self._completed.append(())
+            return
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict):
+            path = frame.path + (frame.key,)
+            frame.container[frame.key] = value
+            frame.key = None
+        else:
+            path = frame.path + (len(frame.container),)
+            frame.container.append(value)
+        frame.expect = 'comma'
+        self._completed.append(path)
+
+    def _open(self, container):
+        if not self._stack:
+            self.root = container
+            path: Path = ()
+        else:
+            # 열린 컨테이너도 부모에 바로 연결해 부분 트리로 조회 가능하게 함
+            frame = self._stack[-1]
+            if isinstance(frame.container, dict):
+                path = frame.path + (frame.key,)
+                frame.container[frame.key] = container
+            else:
+                path = frame.path + (len(frame.container),)
+                frame.container.append(container)
+        self._stack.append(_Frame(container, path, 'key' if isinstance(container, dict) else 'value'))
+
+    def _close(self):
+        frame = self._stack.pop()
+        if not self._stack:
+            self.done = True
+            self._completed.append(())
+            return
+        parent = self._stack[-1]
+        if isinstance(parent.container, dict):
+            parent.key = None
+        parent.expect = 'comma'
+        self._completed.append(frame.path)
+
+    def _finish_literal(self, final: bool = False) -> bool:
+        ok, value = _parse_literal(self._literal, final)
+        self._literal = None
+        if ok:
+            self._emit(value)
+        else:
+            self.repaired = True
+            if self._stack and isinstance(self._stack[-1].container, dict):
+                self._stack[-1].key = None
+            if self._stack:
+                self._stack[-1].expect = 'comma'
+        return ok
+
+    def _string_char(self, ch: str):
+        if self._escape is not None:
+            self._escape += ch
+            if self._escape[0] == 'u':
+                if len(self._escape) < 5:
+                    return
+                try:
+                    self._str.append(chr(int(self._escape[1:], 16)))
+                except ValueError:
+                    self._str.append(self._escape)
+                    self.repaired = True
+            else:
+                self._str.append(_ESCAPES.get(self._escape, self._escape))
+            self._escape = None
+        elif ch == '\\':
+            self._escape = ''
+        elif ch == '"':
+            text = _join(self._str, final=True)
+            self._str = None
+            if self._str_is_key:
+                self._stack[-1].key = text
+                self._stack[-1].expect = 'colon'
+            else:
+                self._emit(text)
+        else:
+            self._str.append(ch)
+
+    def _start_value(self, ch: str):
+        if ch == '{':
+            self._open({})
+        elif ch == '[':
+            self._open([])
+        elif ch == '"':
+            self._str, self._str_is_key = [], False
+        elif ch in '-0123456789tfn':
+            self._literal = ch
+        else:
+            self.repaired = True
+
+    def feed(self, chunk: str):
+        """새로 도착한 텍스트를 이어서 파싱"""
+        for ch in chunk:
+            if self.done:
+                return
+            if self._str is not None:
+                self._string_char(ch)
+                continue
+            if self._literal is not None:
+                if ch not in _WHITESPACE and ch not in ',]}':
+                    self._literal += ch
+                    continue
+                self._finish_literal()
+
+            if not self._stack:
+                # 루트 값 시작 전: 코드 펜스나 설명 텍스트는 건너뜀
+                if ch in '{[':
+                    self._start_value(ch)
+                continue
+            if ch in _WHITESPACE:
+                continue
+
+            frame = self._stack[-1]
+            if frame.expect == 'key':
+                if ch == '"':
+                    self._str, self._str_is_key = [], True
+                elif ch == '}':
+                    self._close()
+                else:
+                    self.repaired = True
+            elif frame.expect == 'colon':
+                if ch == ':':
+                    frame.expect = 'value'
+                else:
+                    self.repaired = True
+            elif frame.expect == 'value':
+                if ch == ']' and isinstance(frame.container, list):
+                    self._close()
+                else:
+                    self._start_value(ch)
+            else:  # comma
+                if ch == ',':
+                    frame.expect = 'key' if isinstance(frame.container, dict) else 'value'
+                elif ch in ']}':
+                    self._close()
+                else:
+                    self.repaired = True
+
+    def finish(self) -> Any:
+        """스트림 종료: 잘린 값을 복구하고 열린 컨테이너를 닫아 루트 값을 반환 (루트가 없으면 None)"""
+        if self.done:
+            return self.root
+        if self._str is not None:
+            self.repaired = True
+            self._escape = None
+            text = _join(self._str, final=True)
+            self._str = None
+            if self._str_is_key:
+                self._stack[-1].key = None
+            else:
+                self._emit(text)
+        if self._literal is not None:
+            self._finish_literal(final=True)
+        while self._stack:
+            self.repaired = True
+            frame = self._stack[-1]
+            if isinstance(frame.container, dict) and frame.key is not None:
+                # 값이 없는 키는 버림
+                frame.key = None
+            self._close()
+        return self.root
@@ -0,0 +1,239 @@
+"""
+In-process metrics for Gemini calls.
+Every call made through GeminiClient is attributed to the endpoint/user set
+with `llm_call_context`, and aggregated into per-endpoint histograms
+(latency, time-to-first-token, tokens) plus optional per-user daily rollups.
+
+Usage:
+    from utils.metrics import llm_call_context
+
+    with llm_call_context("gemini_chat", user_data['uid']):
+        response = await get_gemini_client().send_message(...)
+"""
+import bisect
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 5000, 10000, 20000, 30000, 60000)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+USER_ROLLUPS_ENABLED = os.getenv("GEMINI_USER_ROLLUPS", "true").lower() == "true"
+_ROLLUP_DAYS = 7
+
+# (endpoint, user_id) — 현재 Gemini 호출이 어느 흐름에서 발생했는지
+_call_context: ContextVar[Tuple[str, Optional[str]]] = ContextVar("llm_call_context", default=("unknown", None))
+
+
+@contextmanager
+def llm_call_context(endpoint: str, user_id: Optional[str] = None):
+    """이 블록(및 여기서 생성된 태스크)에서 발생한 Gemini 호출을 endpoint/user로 집계"""
+    token = _call_context.set((endpoint, user_id))
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+def current_call_context() -> Tuple[str, Optional[str]]:
+    return _call_context.get()
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (버킷 상한 기준 누적이 아닌 구간별 카운트)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """버킷 상한으로 근사한 분위수 (마지막 버킷은 +Inf)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{b}" for b in self.buckets] + ["le_inf"]
+        return {
+            'count': self.count,
+            'avg': round(self.sum / self.count, 2) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.outcomes: Counter = Counter()
+        self.models: Counter = Counter()
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+        self.parse_retries = 0
+        self.parse_failures = 0
+        self.retries = 0
+        self.fallbacks = 0
+        self.routes: Counter = Counter()          # 티어별 라우팅 횟수
+        self.route_reasons: Counter = Counter()   # "tier:reason"별 횟수
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.ttft_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.prompt_token_hist = Histogram(TOKEN_BUCKETS)
+        self.output_token_hist = Histogram(TOKEN_BUCKETS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'outcomes': dict(self.outcomes),
+            'models': dict(self.models),
+            'tokens': {
+                'prompt': self.prompt_tokens,
+                'cached': self.cached_tokens,
+                'output': self.output_tokens,
+                'cached_ratio': round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0,
+            },
+            'parse': {'retries': self.parse_retries, 'failures': self.parse_failures},
+            'retries': self.retries,
+            'fallbacks': self.fallbacks,
+            'routing': {'tiers': dict(self.routes), 'reasons': dict(self.route_reasons)},
+            'latency_ms': self.latency_ms.snapshot(),
+            'ttft_ms': self.ttft_ms.snapshot(),
+            'prompt_tokens': self.prompt_token_hist.snapshot(),
+            'output_tokens': self.output_token_hist.snapshot(),
+        }
+
+
+class LLMMetrics:
+    """엔드포인트별 Gemini 호출 지표 + 사용자별 일간 합계"""
+
+    def __init__(self, user_rollups: bool = USER_ROLLUPS_ENABLED):
+        self.user_rollups = user_rollups
+        self.started_at = datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._daily: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    def _endpoint(self, endpoint: str) -> _EndpointStats:
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = _EndpointStats()
+        return stats
+
+    def _rollup(self, user_id: Optional[str]) -> Optional[Dict[str, int]]:
+        if not self.user_rollups or not user_id:
+            return None
+        day = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        if day not in self._daily:
+            self._daily[day] = {}
+            # 최근 N일만 보관
+            for old in sorted(self._daily)[:-_ROLLUP_DAYS]:
+                del self._daily[old]
+        users = self._daily[day]
+        if user_id not in users:
+            users[user_id] = {'calls': 0, 'errors': 0, 'prompt_tokens': 0, 'cached_tokens': 0, 'output_tokens': 0, 'latency_ms': 0}
+        return users[user_id]
+
+    def record_call(
+        self,
+        model: str,
+        outcome: str,
+        latency_ms: float,
+        ttft_ms: Optional[float] = None,
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        output_tokens: int = 0,
+        retries: int = 0,
+        fallback: bool = False,
+    ):
+        endpoint, user_id = current_call_context()
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.calls += 1
+            stats.outcomes[outcome] += 1
+            stats.models[model] += 1
+            stats.prompt_tokens += prompt_tokens
+            stats.cached_tokens += cached_tokens
+            stats.output_tokens += output_tokens
+            stats.retries += retries
+            stats.fallbacks += fallback
+            stats.latency_ms.observe(latency_ms)
+            if ttft_ms is not None:
+                stats.ttft_ms.observe(ttft_ms)
+            if outcome == 'ok':
+                stats.prompt_token_hist.observe(prompt_tokens)
+                stats.output_token_hist.observe(output_tokens)
+
+            rollup = self._rollup(user_id)
+            if rollup is not None:
+                rollup['calls'] += 1
+                rollup['errors'] += outcome != 'ok'
+                rollup['prompt_tokens'] += prompt_tokens
+                rollup['cached_tokens'] += cached_tokens
+                rollup['output_tokens'] += output_tokens
+                rollup['latency_ms'] += int(latency_ms)
+
+    def record_parse(self, retried: bool = False, failed: bool = False):
+        """JSON 응답 파싱 재시도/실패 기록"""
+        endpoint, _ = current_call_context()
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.parse_retries += retried
+            stats.parse_failures += failed
+
+    def record_route(self, tier: str, reason: str):
+        """모델 라우팅 결정 기록"""
+        endpoint, _ = current_call_context()
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.routes[tier] += 1
+            stats.route_reasons[f"{tier}:{reason}"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {name: stats.snapshot() for name, stats in self._endpoints.items()}
+        totals = {
+            'calls': sum(e['calls'] for e in endpoints.values()),
+            'prompt_tokens': sum(e['tokens']['prompt'] for e in endpoints.values()),
+            'cached_tokens': sum(e['tokens']['cached'] for e in endpoints.values()),
+            'output_tokens': sum(e['tokens']['output'] for e in endpoints.values()),
+        }
+        return {'since': self.started_at.isoformat(), 'totals': totals, 'endpoints': endpoints}
+
+    def user_daily(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """일자별 사용자 합계 (user_id를 주면 해당 사용자만)"""
+        with self._lock:
+            if user_id is None:
+                return {day: {uid: dict(v) for uid, v in users.items()} for day, users in self._daily.items()}
+            return {day: dict(users[user_id]) for day, users in self._daily.items() if user_id in users}
+
+
+# Singleton instance for application-wide use
+_metrics_instance = None
+
+
+def get_llm_metrics() -> LLMMetrics:
+    """LLMMetrics 싱글톤 반환"""
+    global _metrics_instance
+
+    if _metrics_instance is None:
+        _metrics_instance = LLMMetrics()
+
+    return _metrics_instance
@@ -0,0 +1,53 @@
+"""
+Single-flight request coalescing.
+Concurrent callers asking for the same key share one in-flight execution
+instead of repeating identical work (token checks, document reads, LLM calls).
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    Collapse duplicate concurrent work onto one asyncio task per key.
+
+    Usage:
+        flight = SingleFlight()
+        doc = await flight.do(("applications", app_id), lambda: fetch(app_id))
+
+    The work runs as its own task, so a caller that disconnects does not
+    cancel the result other waiters are sharing. Results are not cached:
+    once the task finishes, the next call for the key runs again.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 대기자가 취소된 경우에도 "exception was never retrieved" 경고 방지
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'inflight': len(self._inflight),
+            'executions': self.executions,
+            'shared': self.shared,
+        }
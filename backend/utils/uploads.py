@@ -0,0 +1,88 @@
+"""
+Upload validation.
+Starlette already spools multipart files into a SpooledTemporaryFile (memory
+up to its spool size, disk beyond that), so the upload is validated in place:
+the declared size is checked before reading, the content is hashed chunk by
+chunk (rejecting it as soon as it crosses the size limit when the size is
+unknown), and the same file object is rewound and handed back. No second
+copy is made, so the memory cost per upload stays constant regardless of
+file size.
+
+Usage:
+    from utils.uploads import MAX_PDF_BYTES, spooled_upload
+
+    async with spooled_upload(file, MAX_PDF_BYTES) as upload:
+        blob.upload_from_file(upload.file, size=upload.size, content_type=upload.content_type)
+        print(upload.sha256)
+"""
+import hashlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile
+
+MAX_PDF_BYTES = 10 * 1024 * 1024     # 10MB
+MAX_IMAGE_BYTES = 5 * 1024 * 1024    # 5MB
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class SpooledUpload:
+    """검증을 마친 업로드 (파일 위치는 항상 처음으로 되감겨 있음)"""
+
+    def __init__(self, file: BinaryIO, size: int, sha256: str, filename: Optional[str], content_type: Optional[str]):
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+        self.filename = filename
+        self.content_type = content_type
+
+    def read_bytes(self) -> bytes:
+        """전체 내용을 bytes로 (작은 파일이나 bytes가 꼭 필요한 API에만 사용)"""
+        self.file.seek(0)
+        data = self.file.read()
+        self.file.seek(0)
+        return data
+
+
+def _too_large(max_bytes: int, detail: Optional[str]) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=detail or f"파일 크기는 {max_bytes // (1024 * 1024)}MB 이하여야 합니다.",
+    )
+
+
+async def receive_upload(file: UploadFile, max_bytes: int, detail: Optional[str] = None) -> SpooledUpload:
+    """
+    UploadFile을 복사하지 않고 그 자리에서 검증.
+    크기를 이미 알면 읽기 전에, 모르면 한도를 넘는 순간 400으로 거절하고,
+    청크 단위로 SHA-256을 계산한 뒤 UploadFile.file을 처음으로 되감아 그대로 반환합니다.
+    파일은 UploadFile의 것이므로 요청이 끝날 때 Starlette가 닫습니다.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes, detail)
+
+    digest = hashlib.sha256()
+    size = 0
+    await file.seek(0)
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise _too_large(max_bytes, detail)
+        digest.update(chunk)
+    await file.seek(0)
+    return SpooledUpload(file.file, size, digest.hexdigest(), file.filename, file.content_type)
+
+
+@asynccontextmanager
+async def spooled_upload(file: UploadFile, max_bytes: int, detail: Optional[str] = None) -> AsyncIterator[SpooledUpload]:
+    """receive_upload + 블록이 끝나면 파일 위치를 다시 처음으로 (파일은 Starlette가 닫음)"""
+    upload = await receive_upload(file, max_bytes, detail)
+    try:
+        yield upload
+    finally:
+        if not upload.file.closed:
+            upload.file.seek(0)
@@ -1,6 +1,7 @@
 import { ChevronRight, MessageSquare, X, FileText, ArrowRight, CheckCircle2, MousePointerClick } from 'lucide-react';
 import { useState, useEffect, useRef } from 'react';
 import { maskSensitiveData } from '../../utils/security';
+import { applyPatch } from '../../utils/jsonPatch';
 import { auth } from '../../config/firebase';
 import { jdAPI, geminiAPI, pdfAPI } from '@/services/api';
 import { useDemoMode, DEMO_AI_JD_RESPONSE } from '@/components/onboarding/DemoModeContext';
@@ -161,6 +162,15 @@ export const ChatInterface = ({ onNavigate }: ChatInterfaceProps) => {
     const [typingText, setTypingText] = useState<{ [key: string]: string }>({});
     const [isTypingAI, setIsTypingAI] = useState(false); // AI 응답 타이핑 중 상태
     const chatEndRef = useRef<HTMLDivElement>(null);
+    // 서버 채팅 세션: 한 번 만들면 초기화/되돌리기 전까지 메시지만 보냄
+    // (서버는 히스토리를 최대 길이로 자르므로 메시지 수로 동기화 여부를 판단하지 않음)
+    const chatSessionRef = useRef<{ id: string } | null>(null);
+    // 서버 세션이 보관 중인 공고 데이터 (로컬에서 수정하지 않았으면 jdData를 다시 보내지 않음)
+    const serverJDRef = useRef<CurrentJD | null>(null);
+    const resetChatSession = () => {
+        chatSessionRef.current = null;
+        serverJDRef.current = null;
+    };
     const [isEditMode, setIsEditMode] = useState(false);
     const [editedJD, setEditedJD] = useState<CurrentJD>(currentJD);
 
@@ -494,6 +504,8 @@ export const ChatInterface = ({ onNavigate }: ChatInterfaceProps) => {
         const newHistory = messageHistory.slice(0, -1);
         setMessageHistory(newHistory);
         setMessages(newHistory[newHistory.length - 1]);
+        // 서버 세션에는 되돌린 턴이 남아 있으므로 다음 메시지에서 현재 대화로 새 세션 생성
+        resetChatSession();
     };
 
     // 편집 모드 시작
@@ -656,6 +668,7 @@ export const ChatInterface = ({ onNavigate }: ChatInterfaceProps) => {
         setJdType('club');
         setMessages([]);
         setMessageHistory([[]]);
+        resetChatSession();
         localStorage.removeItem('currentJD');
         localStorage.removeItem('chatMessages');
         setRequiredCheckCount(0);
@@ -845,6 +858,7 @@ export const ChatInterface = ({ onNavigate }: ChatInterfaceProps) => {
             
             // 채팅 내역 초기화
             setMessages([]);
+            resetChatSession();
             
             // localStorage 초기화
             localStorage.removeItem('currentJD');
@@ -932,7 +946,35 @@ export const ChatInterface = ({ onNavigate }: ChatInterfaceProps) => {
                 const sectionLabel = SECTION_META[focusedSection]?.label || focusedSection;
                 finalMessage = `[섹션 포커스: "${sectionLabel}"] 사용자가 "${sectionLabel}" 섹션을 선택한 상태입니다. 해당 섹션의 내용만 집중적으로 수정해주세요. 사용자 메시지: ${sanitizedMessage}`;
             }
-            const response = await geminiAPI.chat(finalMessage, conversationHistory, jdType);
+            // 세션이 없을 때(첫 메시지, 초기화/되돌리기 후)만 현재 대화로 세션 생성, 이후에는 메시지만 전송
+            let sessionId: string | undefined;
+            try {
+                if (!chatSessionRef.current) {
+                    const session = await geminiAPI.createChatSession(jdType, conversationHistory, currentJD);
+                    chatSessionRef.current = { id: session.sessionId };
+                    serverJDRef.current = currentJD;
+                }
+                sessionId = chatSessionRef.current.id;
+            } catch (sessionError) {
+                console.warn('Chat session unavailable, sending full history:', sessionError);
+                resetChatSession();
+            }
+
+            // 세션 모드에서는 로컬에서 공고를 수정한 경우에만 jdData 전송 (아니면 서버 세션의 jdData 사용)
+            const jdChanged = !serverJDRef.current || JSON.stringify(serverJDRef.current) !== JSON.stringify(currentJD);
+            let response;
+            try {
+                response = await geminiAPI.chat(finalMessage, conversationHistory, jdType, sessionId && !jdChanged ? undefined : currentJD, sessionId, 'patch');
+            } catch (chatError) {
+                if (!sessionId || !(chatError instanceof Error && chatError.message.startsWith('Chat session'))) throw chatError;
+                // 세션 만료/삭제 → 전체 히스토리로 한 번 재시도
+                resetChatSession();
+                response = await geminiAPI.chat(finalMessage, conversationHistory, jdType, currentJD, undefined, 'patch');
+            }
+            if (response?.sessionId) {
+                chatSessionRef.current = { id: response.sessionId };
+                serverJDRef.current = currentJD;
+            }
             
             // 응답 검증
             if (!response || typeof response !== 'object') {
@@ -982,8 +1024,20 @@ export const ChatInterface = ({ onNavigate }: ChatInterfaceProps) => {
             // 2. 미리보기 업데이트: 공고 데이터가 있으면 기존 상태와 병합
             // 핵심 원칙: AI 응답에 해당 필드가 명시적으로 있고 비어있지 않을 때만 업데이트
             // 빈 문자열/빈 배열은 "아직 안 채웠다"이므로 기존 값 유지
-            if (response.jdData && typeof response.jdData === 'object') {
-                const rd = response.jdData; // 축약
+            // patch 모드: currentJD(= 서버 세션의 jdData)에 변경분(jdPatch)을 적용해 전체 공고 데이터로 복원
+            let responseJD = response.jdData;
+            if (Array.isArray(response.jdPatch)) {
+                try {
+                    responseJD = applyPatch(currentJD, response.jdPatch);
+                } catch (patchError) {
+                    console.warn('jdPatch 적용 실패:', patchError);
+                    responseJD = undefined;
+                    // 다음 턴에 전체 jdData를 보내 서버 세션과 다시 맞춤
+                    serverJDRef.current = null;
+                }
+            }
+            if (responseJD && typeof responseJD === 'object') {
+                const rd = responseJD; // 축약
                 const mergeStr = (newVal: string | undefined, oldVal: string) => 
                     (newVal && newVal.trim().length > 0) ? newVal : oldVal;
                 const mergeArr = (newVal: any[] | undefined, oldVal: any[]) =>
@@ -1015,30 +1069,34 @@ export const ChatInterface = ({ onNavigate }: ChatInterfaceProps) => {
                 };
                 
                 // 타이핑 애니메이션 적용 - 새로운 값이 있을 때만
-                if (response.jdData.title && response.jdData.title !== currentJD.title) {
-                    typeText('title', response.jdData.title);
+                if (rd.title && rd.title !== currentJD.title) {
+                    typeText('title', rd.title);
                 }
-                if (response.jdData.companyName && response.jdData.companyName !== currentJD.companyName) {
-                    typeText('companyName', response.jdData.companyName, 20);
+                if (rd.companyName && rd.companyName !== currentJD.companyName) {
+                    typeText('companyName', rd.companyName, 20);
                 }
-                if (response.jdData.description && response.jdData.description !== currentJD.description) {
-                    typeText('description', response.jdData.description, 20);
+                if (rd.description && rd.description !== currentJD.description) {
+                    typeText('description', rd.description, 20);
                 }
-                if (response.jdData.vision && response.jdData.vision !== currentJD.vision) {
-                    typeText('vision', response.jdData.vision, 20);
+                if (rd.vision && rd.vision !== currentJD.vision) {
+                    typeText('vision', rd.vision, 20);
                 }
-                if (response.jdData.mission && response.jdData.mission !== currentJD.mission) {
-                    typeText('mission', response.jdData.mission, 20);
+                if (rd.mission && rd.mission !== currentJD.mission) {
+                    typeText('mission', rd.mission, 20);
                 }
-                if (response.jdData.location && response.jdData.location !== currentJD.location) {
-                    typeText('location', response.jdData.location, 15);
+                if (rd.location && rd.location !== currentJD.location) {
+                    typeText('location', rd.location, 15);
                 }
-                if (response.jdData.scale && response.jdData.scale !== currentJD.scale) {
-                    typeText('scale', response.jdData.scale, 15);
+                if (rd.scale && rd.scale !== currentJD.scale) {
+                    typeText('scale', rd.scale, 15);
                 }
                 
                 console.log('공고 업데이트:', newJD);
                 setCurrentJD(prev => ({ ...prev, ...newJD }));
+                if (serverJDRef.current) {
+                    // 서버 세션도 같은 규칙(빈 값은 덮어쓰지 않음)으로 병합했으므로 동기화된 상태
+                    serverJDRef.current = { ...currentJD, ...newJD };
+                }
                 
                 // 배열 필드들도 즉시 반영되도록 보장
                 setTimeout(() => {
@@ -2064,6 +2122,7 @@ export const ChatInterface = ({ onNavigate }: ChatInterfaceProps) => {
                                 setBasicInfoStep(0);
                                 setMessages([]);
                                 setMessageHistory([[]]);
+                                resetChatSession();
                                 localStorage.removeItem('currentJD');
                                 localStorage.removeItem('chatMessages');
                             }}
@@ -55,6 +55,7 @@ interface JDData {
         skillOptions?: { category: string; skills: string[] }[];
     };
     sectionOrder?: string[];
+    autoAnalyze?: boolean;  // 지원서 제출 시 AI 분석 자동 실행
 }
 
 type SectionType = 'description' | 'recruitment' | 'visionMission' | 'requirements' | 'preferred' | 'benefits' | 'skills' | 'applicationForm';
@@ -1438,6 +1439,17 @@ export const JDDetail = ({ jdId, onNavigate }: JDDetailProps) => {
                                     {jdData.title || '제목 없음'}
                                 </h1>
                             )}
+                            {isEditing && (
+                                <label className="flex items-center gap-2 text-[12px] text-gray-600 cursor-pointer select-none">
+                                    <input
+                                        type="checkbox"
+                                        checked={!!editedData?.autoAnalyze}
+                                        onChange={(e) => updateEditedField('autoAnalyze', e.target.checked)}
+                                        className="w-4 h-4 accent-blue-600"
+                                    />
+                                    지원서가 제출되면 AI 분석을 자동으로 실행
+                                </label>
+                            )}
                         </div>
 
                         {/* 섹션 팔레트 */}
@@ -187,6 +187,19 @@ export const jdAPI = {
     return result;
   },
 
+  // 공고의 모든 지원자 AI 일괄 분석 시작 (jobId 반환)
+  analyzeAll: async (jdId: string, force: boolean = false) => {
+    return await apiRequest(`/api/jds/${jdId}/analyze-all`, {
+      method: 'POST',
+      body: JSON.stringify({ force }),
+    });
+  },
+
+  // 일괄 분석 진행 상황 조회
+  getAnalyzeAllStatus: async (jdId: string, jobId: string) => {
+    return await apiRequest(`/api/jds/${jdId}/analyze-all/${jobId}`);
+  },
+
   // 이미지 압축 후 base64 변환
   compressImage: (file: File, maxWidth: number = 800, quality: number = 0.7): Promise<string> => {
     return new Promise((resolve, reject) => {
@@ -293,10 +306,11 @@ export const applicationAPI = {
     return result;
   },
 
-  analyze: async (applicantData: any) => {
+  // force=true면 서버에 저장된 분석이 있어도 새로 생성
+  analyze: async (applicantData: any, force: boolean = false) => {
     return await apiRequest('/api/applications/analyze', {
       method: 'POST',
-      body: JSON.stringify({ applicantData }),
+      body: JSON.stringify({ applicantData, force }),
     });
   },
 
@@ -345,26 +359,39 @@ export const applicationAPI = {
 
 // ==================== Gemini API ====================
 export const geminiAPI = {
-  chat: async (message: string, chatHistory: any[] = [], type: string = 'club') => {
+  // sessionId가 있으면 히스토리는 서버 세션에 있으므로 보내지 않음
+  // (jdData도 로컬에서 수정한 경우에만 전달, 생략하면 서버 세션의 jdData 사용)
+  // responseMode 'patch': jdData 대신 이전 상태(보낸 jdData 또는 서버 세션 jdData) 대비 변경분(jdPatch, RFC 6902)만 받음
+  chat: async (message: string, chatHistory: any[] = [], type: string = 'club', jdData?: any, sessionId?: string, responseMode: 'full' | 'patch' = 'full') => {
     return await apiRequest('/api/gemini/chat', {
       method: 'POST',
-      body: JSON.stringify({ message, chatHistory, type }),
+      body: JSON.stringify(sessionId
+        ? { message, sessionId, type, jdData, responseMode }
+        : { message, chatHistory, type, jdData, responseMode }),
+    });
+  },
+  
+  // 서버 채팅 세션 생성 (기존 대화가 있으면 한 번만 업로드)
+  createChatSession: async (type: string = 'club', chatHistory: any[] = [], jdData?: any) => {
+    return await apiRequest('/api/gemini/sessions', {
+      method: 'POST',
+      body: JSON.stringify({ type, chatHistory, jdData }),
     });
   },
   
-  // 시맨틱 지원자 검색
-  semanticSearch: async (query: string, applications: any[]) => {
+  // 시맨틱 지원자 검색 (서버 측 인덱스 사용, 결과는 지원서 ID + 점수)
+  semanticSearch: async (jdId: string, query: string, topK: number = 20) => {
     return await apiRequest('/api/gemini/semantic-search', {
       method: 'POST',
-      body: JSON.stringify({ query, applications }),
+      body: JSON.stringify({ jdId, query, topK }),
     });
   },
   
-  // 대화형 지원자 데이터 질의
-  queryApplicants: async (question: string, applications: any[], chatHistory: any[] = []) => {
+  // 대화형 지원자 데이터 질의 (집계 질문은 서버에서 바로 답변, 자유 질문은 관련 지원자만 AI에 전달)
+  queryApplicants: async (jdId: string, question: string, chatHistory: any[] = []) => {
     return await apiRequest('/api/gemini/query-applicants', {
       method: 'POST',
-      body: JSON.stringify({ question, applications, chatHistory }),
+      body: JSON.stringify({ jdId, question, chatHistory }),
     });
   },
 };
@@ -0,0 +1,80 @@
+// RFC 6902 JSON Patch 적용 (서버 /api/gemini/chat responseMode=patch 응답의 jdPatch용)
+export interface PatchOperation {
+  op: 'add' | 'remove' | 'replace' | 'move' | 'copy' | 'test';
+  path: string;
+  value?: any;
+  from?: string;
+}
+
+const parsePointer = (pointer: string): string[] => {
+  if (pointer === '') return [];
+  if (!pointer.startsWith('/')) throw new Error(`Invalid JSON pointer: ${pointer}`);
+  return pointer.slice(1).split('/').map(t => t.replace(/~1/g, '/').replace(/~0/g, '~'));
+};
+
+const resolve = (doc: any, tokens: string[]): any => {
+  let node = doc;
+  for (const token of tokens) {
+    if (node === null || typeof node !== 'object' || !(token in node)) {
+      throw new Error(`Path not found: /${tokens.join('/')}`);
+    }
+    node = node[Array.isArray(node) ? Number(token) : token];
+  }
+  return node;
+};
+
+const add = (doc: any, tokens: string[], value: any): any => {
+  if (tokens.length === 0) return value;
+  const parent = resolve(doc, tokens.slice(0, -1));
+  const last = tokens[tokens.length - 1];
+  if (Array.isArray(parent)) {
+    parent.splice(last === '-' ? parent.length : Number(last), 0, value);
+  } else {
+    parent[last] = value;
+  }
+  return doc;
+};
+
+const remove = (doc: any, tokens: string[]): any => {
+  const parent = resolve(doc, tokens.slice(0, -1));
+  const last = tokens[tokens.length - 1];
+  const value = resolve(doc, tokens);
+  if (Array.isArray(parent)) {
+    parent.splice(Number(last), 1);
+  } else {
+    delete parent[last];
+  }
+  return value;
+};
+
+// 원본을 변경하지 않고 패치를 적용한 새 객체 반환 (실패 시 Error)
+export const applyPatch = <T>(doc: T, patch: PatchOperation[]): T => {
+  let result: any = JSON.parse(JSON.stringify(doc ?? {}));
+  for (const op of patch) {
+    const tokens = parsePointer(op.path);
+    switch (op.op) {
+      case 'add':
+        result = add(result, tokens, op.value);
+        break;
+      case 'remove':
+        remove(result, tokens);
+        break;
+      case 'replace':
+        if (tokens.length) remove(result, tokens);
+        result = add(result, tokens, op.value);
+        break;
+      case 'move':
+        result = add(result, tokens, remove(result, parsePointer(op.from || '')));
+        break;
+      case 'copy':
+        result = add(result, tokens, JSON.parse(JSON.stringify(resolve(result, parsePointer(op.from || '')))));
+        break;
+      case 'test':
+        if (JSON.stringify(resolve(result, tokens)) !== JSON.stringify(op.value)) {
+          throw new Error(`Test failed at ${op.path}`);
+        }
+        break;
+    }
+  }
+  return result;
+};